@@ -0,0 +1,86 @@
+# ----------------------------------------------
+# batch_main.py
+# Headless batch runner: apply a saved cleaning recipe
+# (Save Recipe in the Data Analysis screen) to every CSV / Excel
+# file in a directory, one file per worker process.
+#
+#   python batch_main.py recipe.json data/ out/ --workers 8
+# ----------------------------------------------
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from data_engine import DATA_EXTENSIONS, Recipe, load_dataset
+
+
+def process_file(recipe_path, path, out_dir):
+    # Runs in a worker process; returns a summary dict
+    started = time.perf_counter()
+    recipe = Recipe.load(recipe_path)
+    df, _ = load_dataset(path)
+    rows_in = len(df)
+    df = recipe.apply(df)
+
+    name = os.path.splitext(os.path.basename(path))[0]
+    out_path = os.path.join(out_dir, name + ".csv")
+    df.to_csv(out_path, index=False)
+
+    agg_path = None
+    aggregated = recipe.aggregate_frame(df)
+    if aggregated is not None:
+        agg_path = os.path.join(out_dir, name + "_agg.csv")
+        aggregated.to_csv(agg_path, index=False)
+
+    return {"input": path, "output": out_path, "aggregate": agg_path,
+            "rows_in": rows_in, "rows_out": len(df),
+            "seconds": time.perf_counter() - started}
+
+
+def find_inputs(in_dir):
+    return sorted(
+        os.path.join(in_dir, name) for name in os.listdir(in_dir)
+        if name.lower().endswith(DATA_EXTENSIONS)
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply a cleaning recipe to a directory of data files.")
+    parser.add_argument("recipe", help="recipe JSON saved from the Data Analysis screen")
+    parser.add_argument("input_dir", help="directory with .csv / .xlsx / .xls files")
+    parser.add_argument("output_dir", help="directory for the cleaned CSV files")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    # Fail fast on a bad recipe before starting any workers
+    Recipe.load(args.recipe)
+    inputs = find_inputs(args.input_dir)
+    if not inputs:
+        print(f"No data files found in {args.input_dir}")
+        return 1
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=max(1, min(args.workers, len(inputs)))) as pool:
+        futures = {pool.submit(process_file, args.recipe, path, args.output_dir): path
+                   for path in inputs}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                res = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"FAILED {path}: {e}")
+                continue
+            print(f"{os.path.basename(path)}: {res['rows_in']} -> {res['rows_out']} rows "
+                  f"in {res['seconds']:.1f}s -> {res['output']}")
+
+    print(f"Done: {len(inputs) - failed} of {len(inputs)} file(s) processed.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,356 @@
+# ----------------------------------------------
+# benchmark_main.py
+# Benchmarks for the Data Analysis engine on generated datasets.
+# Times (wall and CPU) and traces peak memory of both loaders, every
+# cleaning tool, Filter Rows, the date filter, each chart type,
+# serial and parallel aggregation and undo / redo, through the same
+# engine code the screen runs in its background jobs. Results are
+# written as JSON; --compare prints the change against an earlier run.
+#
+#   python benchmark_main.py --rows 100k,1M,10M --out bench.json
+#   python benchmark_main.py --rows 1M --compare bench.json
+# ----------------------------------------------
+
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from data_aggregate import PARALLEL_MIN_ROWS, group_aggregate, value_counts, worker_count
+from data_cache import DatasetCache
+from data_chart import draw_chart
+from data_dateindex import DateIndex
+from data_dedupe import RowFingerprints, duplicated
+from data_dtypes import format_bytes
+from data_engine import prepare_chart_data
+from data_export import export_frame
+from data_history import History, select_rows
+from data_loader import read_csv_chunked, read_excel_compact
+from data_plan import (Plan, apply_step, ConvertType, DropDuplicates, DropEmptyColumns,
+                       DropEmptyRows, DropNA, FillNA, OptimizeMemory, Query, Rename, TrimText)
+from data_profile import DatasetProfile
+from data_sketch import SampleProfile
+
+DEFAULT_ROWS = "100k,1M"
+EXCEL_ROWS = 20_000
+DUPLICATE_SHARE = 0.02
+EMPTY_ROW_SHARE = 0.005
+NAN_SHARE = 0.05
+
+CLEANING_STEPS = [
+    DropEmptyRows(),
+    DropEmptyColumns(),
+    DropNA(),
+    FillNA("0"),
+    DropDuplicates(),
+    TrimText(),
+    OptimizeMemory(),
+    ConvertType("Quantity", "float64"),
+    Rename({"Sales": "Revenue"}),
+    Query("Sales > 50 and Quantity >= 3"),
+]
+
+# (chart type, column, group, agg) as picked in the screen
+CHARTS = [
+    ("bar", "Sales", "Region", "mean"),
+    ("line", "Sales", None, "sum"),
+    ("line", "Sales", "Date", "sum"),
+    ("pie", "Region", None, "count"),
+    ("hist", "Sales", None, "count"),
+    ("box", "Sales", None, "count"),
+    ("heatmap", None, None, "sum"),
+    ("pairs", None, None, "sum"),
+]
+
+
+# ==========================================================
+# Synthetic data
+# ==========================================================
+def parse_rows(text):
+    sizes = []
+    for part in text.split(","):
+        part = part.strip().lower()
+        scale = {"k": 1_000, "m": 1_000_000}.get(part[-1:], 1)
+        sizes.append(int(float(part.rstrip("km")) * scale))
+    return sizes
+
+
+def make_dataset(rows, seed=0):
+    # Mixed dtypes with missing values, duplicate rows, fully empty rows,
+    # an all-empty column and an unsorted Date column
+    rng = np.random.default_rng(seed)
+    regions = np.array(["North", "South", "East", "West", "Central", "Online", "Export", "Other"],
+                       dtype=object)
+    products = np.array([f"P-{i:04d}" for i in range(2000)], dtype=object)
+    notes = np.array([f"  note {i} " if i % 3 else f"note {i}" for i in range(50)], dtype=object)
+
+    # Duplicates: some rows are copies of others
+    source = np.arange(rows)
+    dup = rng.choice(rows, int(rows * DUPLICATE_SHARE), replace=False)
+    source[dup] = rng.integers(0, rows, len(dup))
+
+    def missing(values, share=NAN_SHARE):
+        values = values.astype(float) if values.dtype.kind in "iub" else values
+        values[rng.random(rows) < share] = np.nan if values.dtype.kind == "f" else None
+        return values
+
+    start = np.datetime64("2015-01-01T00:00", "m")
+    df = pd.DataFrame({
+        "Date": start + rng.integers(0, 10 * 365 * 24 * 60, rows).astype("timedelta64[m]"),
+        "Region": regions[rng.integers(0, len(regions), rows)],
+        "Product": products[rng.integers(0, len(products), rows)],
+        "Customer": pd.Series(rng.integers(0, max(rows // 5, 1), rows)).map("C{:07d}".format).to_numpy(),
+        "Sales": missing(rng.lognormal(4, 1, rows)),
+        "Quantity": rng.integers(1, 10, rows),
+        "Discount": missing(rng.random(rows) * 0.3, 0.3),
+        "Flag": rng.random(rows) < 0.2,
+        "Notes": missing(notes[rng.integers(0, len(notes), rows)], 0.4),
+        "Empty": np.full(rows, np.nan),
+    })
+    df = df.take(source).reset_index(drop=True)
+
+    empty = rng.random(rows) < EMPTY_ROW_SHARE
+    if empty.any():
+        df = df.astype({"Quantity": "float64", "Flag": "object"})
+        df.loc[empty, :] = np.nan
+    return df
+
+
+def write_inputs(df, directory, rows, seed, excel_rows):
+    os.makedirs(directory, exist_ok=True)
+    csv_path = os.path.join(directory, f"bench_{rows}_{seed}.csv")
+    if not os.path.exists(csv_path):
+        export_frame(df, csv_path)
+    xlsx_path = os.path.join(directory, f"bench_{min(rows, excel_rows)}_{seed}.xlsx")
+    if excel_rows and not os.path.exists(xlsx_path):
+        df.head(excel_rows).to_excel(xlsx_path, index=False)
+    return csv_path, xlsx_path if excel_rows else None
+
+
+# ==========================================================
+# Measuring
+# ==========================================================
+class Bench:
+
+    def __init__(self, rows, repeat=1, trace=True, skip=()):
+        self.rows = rows
+        self.repeat = repeat
+        self.trace = trace
+        self.skip = tuple(skip)
+        self.results = []
+
+    def run(self, op, fn, reset=None, **extra):
+        # Returns fn's result from the last repeat, or None when skipped.
+        # reset(result) runs untimed after each repeat, to put state back.
+        if self.skip and op.startswith(self.skip):
+            return None
+        seconds, cpu, peak = [], [], 0
+        result = None
+        for _ in range(self.repeat):
+            result = None
+            gc.collect()
+            if self.trace:
+                tracemalloc.start()
+            t0, c0 = time.perf_counter(), time.process_time()
+            result = fn()
+            seconds.append(time.perf_counter() - t0)
+            cpu.append(time.process_time() - c0)
+            if self.trace:
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+            if reset:
+                reset(result)
+        entry = {"op": op, "rows": self.rows, "seconds": min(seconds),
+                 "seconds_all": seconds, "cpu_seconds": min(cpu)}
+        if self.trace:
+            entry["peak_bytes"] = peak
+        entry.update(extra)
+        self.results.append(entry)
+        print(f"  {op:<32} {min(seconds):8.3f}s"
+              + (f"  peak {format_bytes(peak):>10}" if self.trace else ""), flush=True)
+        return result
+
+
+def render(spec):
+    fig = Figure(figsize=(10, 5))
+    FigureCanvasAgg(fig)
+    draw_chart(fig.add_subplot(), spec)
+    fig.canvas.draw()
+    return fig
+
+
+# ==========================================================
+# Suite
+# ==========================================================
+def run_suite(rows, args, workdir):
+    bench = Bench(rows, args.repeat, not args.no_trace, args.skip)
+    print(f"{rows:,} rows")
+    df = bench.run("generate", lambda: make_dataset(rows, args.seed))
+    csv_path, xlsx_path = write_inputs(df, workdir, rows, args.seed, args.excel_rows)
+    del df
+
+    # ---------------- loading ----------------
+    loaded = bench.run("load_csv.pyarrow", lambda: read_csv_chunked(csv_path, engine="pyarrow"))
+    bench.run("load_csv.c", lambda: read_csv_chunked(csv_path, engine="c"))
+    if loaded is None:
+        loaded = read_csv_chunked(csv_path)
+    df = loaded[0]
+    if xlsx_path:
+        bench.run("load_excel", lambda: read_excel_compact(xlsx_path),
+                  excel_rows=min(rows, args.excel_rows))
+    cache = DatasetCache(os.path.join(workdir, "cache"))
+    bench.run("cache.put", lambda: cache.put(csv_path, df))
+    bench.run("cache.get", lambda: cache.get(csv_path))
+    bench.run("profile.build", lambda: DatasetProfile(df))
+    bench.run("profile.sample", lambda: SampleProfile.from_frame(df))
+
+    # ---------------- cleaning + undo ----------------
+    for step in CLEANING_STEPS:
+        out = bench.run(f"clean.{step.op}", lambda: apply_step(df, step), rows_in=len(df))
+        if out is None:
+            continue
+        new_df, delta = out
+        bench.results[-1]["rows_out"] = len(new_df)
+        # Through History, as the Undo / Redo buttons do
+        history = History()
+        history.push(delta)
+        restored = bench.run(f"undo.{step.op}", lambda: history.undo(new_df),
+                             reset=lambda r: history.redo(r))
+        if restored is None:
+            restored = df
+        history.undo(new_df)
+        bench.run(f"redo.{step.op}", lambda: history.redo(restored),
+                  reset=lambda r: history.undo(r))
+
+    # Both predicates were evaluated by clean.filter_rows; only the OR runs
+    bench.run("query.reuse", lambda: Query("Sales > 50 or Quantity >= 3").mask(df))
+
+    # clean.remove_duplicates reuses the frame's cached fingerprints after
+    # its first repeat; hashing them is timed on its own here
+    keys = ["Region", "Customer"]
+    bench.run("dedupe.fingerprint", lambda: RowFingerprints.compute(df, keys))
+    bench.run("dedupe.keys", lambda: duplicated(df, keys, "last"))
+
+    plan = Plan([TrimText(), DropEmptyRows(), Query("Sales > 50"), DropDuplicates(), FillNA("0")])
+    bench.run("plan.execute", lambda: plan.execute(df))
+    bench.run("plan.preview", lambda: plan.preview(df, 60))
+
+    # ---------------- date filter ----------------
+    index = bench.run("date_filter.index", lambda: DateIndex(df["Date"]))
+    if index is not None:
+        lo, hi = pd.Timestamp("2017-01-01"), pd.Timestamp("2019-12-31")
+        out = bench.run("date_filter.select",
+                        lambda: select_rows(df, index.positions(lo, hi)), rows_in=len(df))
+        if out is not None:
+            filtered, delta = out
+            bench.results[-1]["rows_out"] = len(filtered)
+            bench.run("undo.date_filter", lambda: delta.undo(filtered))
+        bench.run("date_filter.refine",
+                  lambda: select_rows(df, index.positions(lo, pd.Timestamp("2018-06-30"))))
+
+    # ---------------- charts ----------------
+    for ctype, col, group, agg in CHARTS:
+        name = f"chart.{ctype}" + (f".by_{group}" if group else "")
+        spec = bench.run(f"{name}.prepare",
+                         lambda: prepare_chart_data(df, ctype, col, group, agg))
+        if spec is not None:
+            bench.run(f"{name}.draw", lambda: render(spec))
+
+    # Serial against partitioned process-pool aggregation (the pool is
+    # started outside the timing; charts pick one by frame size)
+    warm = df.head(PARALLEL_MIN_ROWS // 100)
+    bench.run("aggregate.pool_start", lambda: group_aggregate(warm, "Sales", "Region", "sum", parallel=True))
+    for mode, parallel in (("serial", False), ("parallel", True)):
+        bench.run(f"aggregate.group_mean.{mode}",
+                  lambda: group_aggregate(df, "Sales", "Region", "mean", parallel=parallel),
+                  workers=worker_count() if parallel else 1)
+        bench.run(f"aggregate.value_counts.{mode}",
+                  lambda: value_counts(df, "Customer", parallel=parallel),
+                  workers=worker_count() if parallel else 1)
+
+    # ---------------- export ----------------
+    for ext in ("csv", "parquet", "feather"):
+        path = os.path.join(workdir, f"export_{rows}.{ext}")
+        bench.run(f"export.{ext}", lambda: export_frame(df, path))
+        if os.path.exists(path):
+            os.remove(path)
+    return bench.results
+
+
+def compare(old, new):
+    before = {(r["op"], r["rows"]): r["seconds"] for r in old["results"]}
+    print(f"\n{'op':<34}{'rows':>12}{'before':>10}{'after':>10}{'change':>9}")
+    for r in new["results"]:
+        prev = before.get((r["op"], r["rows"]))
+        if prev is None:
+            continue
+        change = (r["seconds"] / prev - 1) * 100 if prev else 0.0
+        print(f"{r['op']:<34}{r['rows']:>12,}{prev:>10.3f}{r['seconds']:>10.3f}{change:>+8.0f}%")
+
+
+def environment():
+    versions = {"python": platform.python_version(), "numpy": np.__version__,
+                "pandas": pd.__version__, "matplotlib": matplotlib.__version__}
+    try:
+        import pyarrow
+        versions["pyarrow"] = pyarrow.__version__
+    except ImportError:
+        versions["pyarrow"] = None
+    return {"platform": platform.platform(), "cpus": os.cpu_count(), **versions}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Data Analysis engine.")
+    parser.add_argument("--rows", default=DEFAULT_ROWS,
+                        help="comma separated dataset sizes, e.g. 100k,1M,10M,50M (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per op; the fastest is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--excel-rows", type=int, default=EXCEL_ROWS,
+                        help="rows written to the Excel input (0 skips Excel; default: %(default)s)")
+    parser.add_argument("--data-dir", help="keep generated inputs here and reuse them between runs")
+    parser.add_argument("--skip", action="append", default=[],
+                        help="skip ops starting with this prefix (repeatable), e.g. --skip load_csv.c")
+    parser.add_argument("--no-trace", action="store_true",
+                        help="do not trace memory (tracemalloc slows Python-heavy ops)")
+    parser.add_argument("--out", default="benchmark_results.json", help="JSON results file")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    workdir = args.data_dir or tempfile.mkdtemp(prefix="data_bench_")
+    started = time.strftime("%Y-%m-%dT%H:%M:%S")
+    results = []
+    try:
+        for rows in parse_rows(args.rows):
+            results.extend(run_suite(rows, args, workdir))
+    finally:
+        if not args.data_dir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {"started": started, "environment": environment(),
+              "settings": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+              "results": results}
+    with open(args.out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"Wrote {len(results)} results to {args.out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            compare(json.load(fh), report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
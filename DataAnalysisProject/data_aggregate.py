@@ -0,0 +1,172 @@
+# ----------------------------------------------
+# data_aggregate.py
+# Chart aggregations with a memo cache keyed on the dataset revision.
+# The screen bumps the revision on every change to the frame, so cached
+# results are only reused while the data they came from is unchanged.
+# Large frames are aggregated in parallel: row partitions go to a
+# process pool, each returns partial sums and counts (or value counts),
+# and the partials are merged; mean is sum / count of the merged totals.
+# ----------------------------------------------
+
+import atexit
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+MAX_ENTRIES = 64
+PARALLEL_MIN_ROWS = 2_000_000  # below this a single groupby beats shipping partitions
+PARTITIONS_PER_WORKER = 2
+
+
+# ==========================================================
+# Aggregations
+# ==========================================================
+def group_aggregate(df, col, group, agg, parallel=None, progress=None):
+    # parallel: None decides from the frame size, True / False forces it
+    if agg in ("sum", "mean", "count") and _use_pool(df, parallel) \
+            and (agg == "count" or pd.api.types.is_numeric_dtype(df[col])):
+        # Partials carry only what the merge needs: a count never sums the
+        # column, so text columns are safe to count in parallel
+        aggs = ("count",) if agg == "count" else ("sum", "count")
+        totals = _run_partitions(df[[group, col]], _partial_group, (col, group, aggs),
+                                 progress, "Aggregating")
+        if totals is not None:
+            totals = totals.groupby(level=0, observed=True).sum()
+            if agg == "mean":
+                out = totals["sum"] / totals["count"].where(totals["count"] > 0)
+            else:
+                out = totals[agg]
+            out.name = col
+            return out
+    return getattr(df.groupby(group, observed=True)[col], agg)()
+
+
+def value_counts(df, col, parallel=None, progress=None):
+    if _use_pool(df, parallel):
+        totals = _run_partitions(df[[col]], _partial_counts, (col,), progress, "Counting")
+        if totals is not None:
+            # observed=False keeps unused categories at 0, as value_counts does
+            out = totals.groupby(level=0, observed=False).sum()
+            return out.sort_values(ascending=False, kind="stable")
+    return df[col].value_counts()
+
+
+# ==========================================================
+# Process pool
+# ==========================================================
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def worker_count():
+    return os.cpu_count() or 1
+
+
+def _use_pool(df, parallel):
+    if parallel is None:
+        parallel = len(df) >= PARALLEL_MIN_ROWS and worker_count() > 1
+    # Batch runner workers are processes already; they aggregate serially
+    return parallel and multiprocessing.parent_process() is None
+
+
+def _get_pool():
+    # Started on first use and kept warm. Spawned rather than forked:
+    # the screen forks from a worker thread while Tk is running.
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=worker_count(),
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(shutdown_pool)
+
+
+def _partial_group(part, col, group, aggs):
+    return part.groupby(group, observed=True, sort=False)[col].agg(list(aggs))
+
+
+def _partial_counts(part, col):
+    return part[col].value_counts(sort=False)
+
+
+def _run_partitions(df, partial, args, progress, label):
+    # Concatenated partials in partition order, or None if the pool broke
+    # (the caller then aggregates serially)
+    n = worker_count() * PARTITIONS_PER_WORKER
+    size = -(-len(df) // n)
+    pool = _get_pool()
+    try:
+        futures = {pool.submit(partial, df.iloc[start:start + size], *args): i
+                   for i, start in enumerate(range(0, len(df), size))}
+    except BrokenProcessPool:
+        shutdown_pool()
+        return None
+    parts = [None] * len(futures)
+    try:
+        for done, future in enumerate(as_completed(futures), 1):
+            parts[futures[future]] = future.result()
+            if progress:
+                progress(done / len(futures), f"{label}... {done} / {len(futures)} partitions")
+    except BrokenProcessPool:
+        shutdown_pool()
+        return None
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
+    return pd.concat(parts)
+
+
+# ==========================================================
+# Memo cache
+# ==========================================================
+class AggregateCache:
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.revision = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def bump(self):
+        # Call whenever the frame changes; returns the new revision
+        with self._lock:
+            self.revision += 1
+            self._entries.clear()
+            return self.revision
+
+    def get_or_compute(self, revision, key, compute):
+        full_key = (revision,) + tuple(key)
+        with self._lock:
+            if full_key in self._entries:
+                self._entries.move_to_end(full_key)
+                self.hits += 1
+                return self._entries[full_key]
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            # A result computed from a frame that has since changed is not kept
+            if revision == self.revision:
+                self._entries[full_key] = value
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
@@ -0,0 +1,121 @@
+# ----------------------------------------------
+# data_cache.py
+# On-disk Feather cache for parsed datasets.
+# Entries are keyed on path + size + mtime, read back memory-mapped,
+# and evicted least-recently-used once the cache grows past its limit.
+# Parquet spools of out-of-core CSVs live under spool/ with the same keys
+# and count towards the same limit.
+# Disabled (every lookup misses) when pyarrow is not installed.
+# ----------------------------------------------
+
+import hashlib
+import os
+
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+# Bump when the loader changes what it produces (dtypes etc.)
+CACHE_VERSION = 4
+DEFAULT_MAX_BYTES = 4 * 1024 * 1024 * 1024
+SPOOL_SUBDIR = "spool"
+DEFAULT_DIR = os.environ.get(
+    "DATA_ANALYSIS_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "data_analysis_toolkit"),
+)
+
+
+class DatasetCache:
+
+    def __init__(self, directory=DEFAULT_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @property
+    def enabled(self):
+        return feather is not None
+
+    def key(self, path, variant=""):
+        st = os.stat(path)
+        raw = f"{CACHE_VERSION}|{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}|{variant}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _entry(self, key):
+        return os.path.join(self.directory, key + ".feather")
+
+    def spool_path(self, path):
+        # Where the Parquet spool of `path` goes; a changed file gets a new one
+        return os.path.join(self.directory, SPOOL_SUBDIR, self.key(path) + ".parquet")
+
+    def get(self, path, variant=""):
+        if not self.enabled:
+            return None
+        entry = self._entry(self.key(path, variant))
+        if not os.path.exists(entry):
+            return None
+        try:
+            table = feather.read_table(entry, memory_map=True)
+            df = table.to_pandas(split_blocks=True)
+        except Exception:
+            self._remove(entry)
+            return None
+        # Touch so eviction sees this entry as recently used
+        os.utime(entry, None)
+        return df
+
+    def put(self, path, df, variant=""):
+        if not self.enabled:
+            return False
+        os.makedirs(self.directory, exist_ok=True)
+        entry = self._entry(self.key(path, variant))
+        tmp = entry + ".tmp"
+        try:
+            feather.write_feather(df, tmp, compression="uncompressed")
+            os.replace(tmp, entry)
+        except Exception:
+            # Mixed-type object columns or non-string names cannot be stored
+            self._remove(tmp)
+            return False
+        self.evict()
+        return True
+
+    def clear(self):
+        for name, _, _ in self._entries():
+            self._remove(os.path.join(self.directory, name))
+
+    def size_bytes(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, keep=None):
+        # keep: a file still being read, never removed (e.g. the spool just written)
+        keep = keep and os.path.relpath(keep, self.directory)
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        entries = sorted((e for e in entries if e[0] != keep), key=lambda e: e[2])
+        while entries and total > self.max_bytes:
+            name, size, _ = entries.pop(0)
+            self._remove(os.path.join(self.directory, name))
+            total -= size
+
+    def _entries(self):
+        if not os.path.isdir(self.directory):
+            return []
+        names = [n for n in os.listdir(self.directory) if n.endswith(".feather")]
+        spool = os.path.join(self.directory, SPOOL_SUBDIR)
+        if os.path.isdir(spool):
+            names += [os.path.join(SPOOL_SUBDIR, n) for n in os.listdir(spool) if n.endswith(".parquet")]
+        out = []
+        for name in names:
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            out.append((name, st.st_size, st.st_mtime))
+        return out
+
+    def _remove(self, entry):
+        try:
+            os.remove(entry)
+        except OSError:
+            pass
@@ -0,0 +1,143 @@
+# ----------------------------------------------
+# data_chart.py
+# Persistent matplotlib surfaces for the Data Analysis screen, and
+# draw_chart, which renders a chart spec onto any axes.
+# The embedded figure and its Tk canvas are built once and redrawn in
+# place; popup figures are plain Figure objects (not registered with
+# pyplot) and are released when their window closes. Neither pyplot nor
+# seaborn is imported up front: the style is applied when the first
+# surface is built and seaborn loads with the first annotated heatmap.
+# ----------------------------------------------
+
+import tkinter as tk
+
+import matplotlib.style
+from matplotlib.artist import setp
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.ticker import MaxNLocator
+
+from data_corr import TICK_LIMIT
+from data_downsample import MARKER_LIMIT, MAX_BAR_CATEGORIES
+
+
+CHART_STYLES = ("seaborn-v0_8-darkgrid", "seaborn-darkgrid", "ggplot")
+_styled = False
+
+
+def apply_style():
+    # First style this matplotlib knows (the seaborn names changed in 3.6)
+    global _styled
+    if _styled:
+        return
+    _styled = True
+    for style in CHART_STYLES:
+        try:
+            matplotlib.style.use(style)
+            return
+        except OSError:
+            continue
+
+
+class ChartSurface:
+
+    def __init__(self, master, figsize=(10, 5)):
+        apply_style()
+        self.figure = Figure(figsize=figsize)
+        self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.ax = self.figure.add_subplot()
+
+    def render(self, draw, idle=True):
+        # clf also drops extra axes such as a heatmap colorbar. idle=False
+        # rasterises now instead of on the next idle cycle.
+        self.figure.clf()
+        self.ax = self.figure.add_subplot()
+        try:
+            draw(self.ax)
+        except Exception:
+            self.clear()
+            raise
+        if idle:
+            self.canvas.draw_idle()
+        else:
+            self.canvas.draw()
+
+    def clear(self):
+        self.figure.clf()
+        self.ax = self.figure.add_subplot()
+        self.canvas.draw_idle()
+
+    def close(self):
+        self.figure.clf()
+        try:
+            self.canvas.get_tk_widget().destroy()
+        except tk.TclError:
+            pass
+
+
+def open_chart_popup(root, draw, geometry="1000x700"):
+    popup = tk.Toplevel(root)
+    popup.geometry(geometry)
+    surface = ChartSurface(popup)
+
+    def on_close():
+        surface.close()
+        popup.destroy()
+
+    popup.protocol("WM_DELETE_WINDOW", on_close)
+    try:
+        surface.render(draw)
+    except Exception:
+        on_close()
+        raise
+    return popup
+
+
+# ==========================================================
+# Chart drawing (specs come from data_engine.prepare_chart_data)
+# ==========================================================
+def draw_chart(ax, spec):
+    data = spec["data"]
+    kind = spec["plot"]
+    if kind == "pie":
+        ax.pie(data.values, labels=data.index, autopct="%1.1f%%")
+    elif kind == "bar":
+        ax.bar(data.index.astype(str), data.values)
+        setp(ax.get_xticklabels(), rotation=40, ha="right")
+    elif kind == "line_grouped":
+        x, y = data
+        ax.plot(x, y, marker="o" if len(y) <= MARKER_LIMIT else None)
+        if len(x) > MAX_BAR_CATEGORIES:
+            ax.xaxis.set_major_locator(MaxNLocator(MAX_BAR_CATEGORIES))
+        setp(ax.get_xticklabels(), rotation=40, ha="right")
+    elif kind == "line":
+        x, y = data
+        ax.plot(x, y, marker="o" if len(y) <= MARKER_LIMIT else None)
+    elif kind == "hist_binned":
+        counts, edges = data
+        ax.hist(edges[:-1], bins=edges, weights=counts)
+    elif kind == "hist":
+        ax.hist(data, bins=20)
+    elif kind == "box":
+        ax.bxp(data)
+    elif kind == "heatmap":
+        import seaborn as sns  # only this chart needs it
+        sns.heatmap(data, annot=True, fmt=".2f", cmap="Blues", ax=ax)
+    elif kind == "heatmap_image":
+        # One image instead of a patch and a label per cell
+        im = ax.imshow(data.to_numpy(), cmap="RdBu_r", vmin=-1, vmax=1,
+                       interpolation="nearest", aspect="auto")
+        ax.figure.colorbar(im, ax=ax)
+        ax.grid(False)
+        if data.shape[1] <= TICK_LIMIT:
+            ax.set_xticks(range(data.shape[1]), data.columns.astype(str), rotation=90, fontsize=7)
+            ax.set_yticks(range(data.shape[0]), data.index.astype(str), fontsize=7)
+        else:
+            ax.set_xticks([])
+            ax.set_yticks([])
+    elif kind == "corr_pairs":
+        ax.barh(data.index, data.values, color=["tab:red" if v < 0 else "tab:blue" for v in data.values])
+        ax.axvline(0, color="gray", linewidth=0.8)
+        ax.set_xlim(-1, 1)
+    ax.set_title(spec["title"])
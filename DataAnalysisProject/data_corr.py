@@ -0,0 +1,122 @@
+# ----------------------------------------------
+# data_corr.py
+# Correlation engine for the heatmap on wide numeric tables.
+# Pairwise-complete Pearson correlation from centred float32 row blocks:
+# each block adds a few matrix products to float64 accumulators, so the
+# work is BLAS-bound and memory stays at one block. Large frames can be
+# correlated on a row sample. Also top-k strongest pairs and a
+# clustered column order for large matrices.
+# ----------------------------------------------
+
+import numpy as np
+import pandas as pd
+
+BLOCK_ROWS = 65_536
+CORR_SAMPLE_ROWS = 1_000_000
+ANNOTATE_LIMIT = 20  # above this many columns: no cell labels, clustered order
+TICK_LIMIT = 60
+TOP_PAIRS = 20
+
+
+def numeric_frame(df):
+    return df.select_dtypes(include="number")
+
+
+def correlation_matrix(df, sample_rows=None, block_rows=BLOCK_ROWS, seed=0):
+    num = numeric_frame(df)
+    if sample_rows and len(num) > sample_rows:
+        positions = np.sort(np.random.default_rng(seed).choice(len(num), sample_rows, replace=False))
+        num = num.take(positions)
+    columns = num.columns
+    p = len(columns)
+    means = num.mean().to_numpy(dtype=np.float32)
+
+    # Sums over rows where both columns are present:
+    # n = M'M, s = X'M (x summed where y present), ss = (X*X)'M, xy = X'X,
+    # with X centred on the column means and zero where missing
+    n = np.zeros((p, p))
+    s = np.zeros((p, p))
+    ss = np.zeros((p, p))
+    xy = np.zeros((p, p))
+    for start in range(0, len(num), block_rows):
+        block = num.iloc[start:start + block_rows].to_numpy(dtype=np.float32, na_value=np.nan) - means
+        mask = ~np.isnan(block)
+        if mask.all():
+            rows = len(block)
+            n += rows
+            col_sum = block.sum(axis=0, dtype=np.float64)
+            s += col_sum[:, None]
+            ss += (block * block).sum(axis=0, dtype=np.float64)[:, None]
+        else:
+            np.nan_to_num(block, copy=False)
+            m = mask.astype(np.float32)
+            n += m.T @ m
+            s += block.T @ m
+            ss += (block * block).T @ m
+        xy += block.T @ block
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = n * xy - s * s.T
+        var = n * ss - s * s
+        corr = cov / np.sqrt(var * var.T)
+    corr = np.clip(corr, -1, 1)
+    np.fill_diagonal(corr, np.where(np.diag(var) > 0, 1.0, np.nan))
+    return pd.DataFrame(corr, index=columns, columns=columns)
+
+
+def top_pairs(corr, k=TOP_PAIRS):
+    # The k pairs with the largest |r|, strongest first
+    values = corr.to_numpy()
+    i, j = np.triu_indices(len(values), k=1)
+    r = values[i, j]
+    strength = np.nan_to_num(np.abs(r), nan=-1.0)
+    k = min(k, len(r))
+    if k == 0:
+        return pd.DataFrame(columns=["a", "b", "r"])
+    top = np.argpartition(-strength, k - 1)[:k]
+    top = top[np.argsort(-strength[top], kind="stable")]
+    top = top[strength[top] >= 0]
+    return pd.DataFrame({"a": corr.index[i[top]], "b": corr.columns[j[top]], "r": r[top]})
+
+
+def cluster_order(corr):
+    # Average-linkage clustering on 1 - |r|; leaves are laid out so that
+    # the two ends brought together at each merge are the closest pair
+    p = len(corr)
+    if p < 3:
+        return np.arange(p)
+    base = 1 - np.nan_to_num(np.abs(corr.to_numpy()), nan=0.0)
+    dist = base.copy()
+    np.fill_diagonal(dist, np.inf)
+    members = {i: [i] for i in range(p)}
+    while len(members) > 1:
+        a, b = np.unravel_index(np.argmin(dist), dist.shape)
+        left, right = members.pop(a), members.pop(b)
+        options = [(left, right), (left, right[::-1]), (left[::-1], right), (left[::-1], right[::-1])]
+        first, second = min(options, key=lambda o: base[o[0][-1], o[1][0]])
+        na, nb = len(left), len(right)
+        merged = (na * dist[a] + nb * dist[b]) / (na + nb)
+        dist[a], dist[:, a] = merged, merged
+        dist[b], dist[:, b] = np.inf, np.inf
+        dist[a, a] = np.inf
+        members[a] = first + second
+    return np.asarray(next(iter(members.values())))
+
+
+def prepare_heatmap(corr, sample_note=""):
+    # Spec for draw_chart: small matrices keep their order and cell labels,
+    # large ones are clustered and drawn as a plain image
+    large = corr.shape[1] > ANNOTATE_LIMIT
+    if large:
+        order = cluster_order(corr)
+        corr = corr.iloc[order, order]
+    title = "Correlation Heatmap" + (" (clustered)" if large else "") + sample_note
+    return {"plot": "heatmap_image" if large else "heatmap", "data": corr, "title": title}
+
+
+def prepare_pairs(corr, k=TOP_PAIRS, sample_note=""):
+    pairs = top_pairs(corr, k)
+    labels = [f"{a} / {b}" for a, b in zip(pairs["a"], pairs["b"])]
+    data = pd.Series(pairs["r"].to_numpy(), index=labels)
+    return {"plot": "corr_pairs", "data": data[::-1],
+            "title": f"Top {len(data)} Correlated Pairs" + sample_note}
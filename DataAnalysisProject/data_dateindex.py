@@ -0,0 +1,47 @@
+# ----------------------------------------------
+# data_dateindex.py
+# Sorted index over a datetime column for fast range filters.
+# The column is parsed once; each range lookup is two searchsorted
+# calls on the sorted values, so narrowing or widening the range never
+# reparses or rescans the column.
+# ----------------------------------------------
+
+import numpy as np
+import pandas as pd
+
+
+def parse_dates(values):
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    return pd.to_datetime(values, errors="coerce")
+
+
+class DateIndex:
+
+    def __init__(self, values):
+        self.values = parse_dates(values)
+        naive = self.values
+        if getattr(naive.dt, "tz", None) is not None:
+            naive = naive.dt.tz_localize(None)
+        arr = naive.to_numpy()
+        valid = np.flatnonzero(~np.isnat(arr))
+        # order maps sorted slots back to row positions; NaT rows never match
+        self.order = valid[np.argsort(arr[valid], kind="stable")]
+        self.sorted = arr[self.order]
+
+    def __len__(self):
+        return len(self.values)
+
+    def _key(self, ts):
+        return pd.Timestamp(ts).tz_localize(None).to_datetime64().astype(self.sorted.dtype)
+
+    def bounds(self):
+        if not len(self.sorted):
+            return None, None
+        return pd.Timestamp(self.sorted[0]), pd.Timestamp(self.sorted[-1])
+
+    def positions(self, start, end):
+        # Rows with start <= date <= end, in their original order
+        lo = np.searchsorted(self.sorted, self._key(start), side="left")
+        hi = np.searchsorted(self.sorted, self._key(end), side="right")
+        return np.sort(self.order[lo:hi])
@@ -0,0 +1,257 @@
+# ----------------------------------------------
+# data_dedupe.py
+# Duplicate detection on cached 64-bit row fingerprints.
+# A fingerprint XORs per-column hashes weighted by the column name, for
+# every column or a chosen key subset. Fingerprints are cached per frame
+# and carried to the next frame through the history delta (rows kept,
+# restored, selected; columns changed, dropped, renamed) as a short
+# log of cheap operations, so filters and edits never rehash the whole
+# table. The first time a frame's fingerprints are used, every row that
+# shares one is checked against the first row with it, so a hash
+# collision can never drop a distinct row.
+# ----------------------------------------------
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data_history import (ColumnsChanged, ColumnsDropped, FrameCache, Renamed,
+                          RowsRemoved, RowsSelected)
+
+MAX_CHAIN = 8  # pending operations before fingerprints are resolved eagerly
+MAX_KEYS = 4  # key subsets cached per frame
+
+KEEP_OPTIONS = ("first", "last")
+NA_HASH = np.uint64(0x9E3779B97F4A7C15)
+
+
+def column_hash(s):
+    if s.dtype.kind in "fc":
+        # -0.0 equals 0.0 but its bits hash differently
+        s = s + 0.0
+    if s.dtype.kind not in "OSU":
+        return pd.util.hash_pandas_object(s, index=False).to_numpy()
+    # Text is hashed once per distinct value
+    codes, uniques = pd.factorize(s)
+    hashes = pd.util.hash_array(np.asarray(uniques, dtype=object))
+    return np.append(hashes, NA_HASH)[codes]
+
+
+def _weight(name):
+    # Odd, so multiplying keeps every bit of the column hash
+    h = int(pd.util.hash_array(np.array([str(name)], dtype=object))[0])
+    return np.uint64(h | 1)
+
+
+def hash_rows(df, columns):
+    out = np.zeros(len(df), dtype=np.uint64)
+    for col in columns:
+        out ^= column_hash(df[col]) * _weight(col)
+    return out
+
+
+# ==========================================================
+# Fingerprints with a lazy operation log
+# ==========================================================
+class RowFingerprints:
+
+    def __init__(self, subset, columns, values=None, base=None, op=None):
+        self.subset = subset  # tuple of key columns, or None for every column
+        self.columns = list(columns)
+        self._values = values
+        self._base = base
+        self._op = op
+        self.depth = 0 if values is not None else base.depth + 1
+        self.verified = None  # True once checked free of collisions
+        self._lock = threading.Lock()
+
+    @classmethod
+    def compute(cls, df, subset=None):
+        columns = list(df.columns) if subset is None else list(subset)
+        return cls(subset, columns, hash_rows(df, columns))
+
+    @property
+    def values(self):
+        with self._lock:
+            if self._values is None:
+                base = self._base.values
+                self._values = base if self._op is None else self._op(base)
+                self._base = self._op = None
+            return self._values
+
+    def _derive(self, columns, op=None, subset=None, rows_only=False):
+        out = RowFingerprints(self.subset if subset is None else subset, columns, base=self, op=op)
+        if rows_only:
+            # A subset of the rows cannot collide where the whole did not
+            out.verified = self.verified
+        if out.depth > MAX_CHAIN:
+            out.values
+        return out
+
+    def _swap(self, pairs):
+        # pairs: [(name, old Series or None, new Series or None)]
+        def op(values):
+            out = values.copy()
+            for name, old, new in pairs:
+                w = _weight(name)
+                if old is not None:
+                    out ^= column_hash(old) * w
+                if new is not None:
+                    out ^= column_hash(new) * w
+            return out
+        return op
+
+    # ---------------- incremental updates ----------------
+    def after(self, df, delta, undo=False):
+        # Fingerprints for df, the frame delta.undo / delta.redo produced;
+        # None when they cannot be derived (the caller rehashes on demand)
+        key = set(self.columns)
+        if isinstance(delta, RowsRemoved):
+            if not undo:
+                keep = delta.keep
+                return self._derive(self.columns, lambda v: v[keep], rows_only=True)
+            keep, removed, columns = delta.keep, delta.removed, self.columns
+
+            def restore(values):
+                out = np.empty(len(keep), dtype=np.uint64)
+                out[keep] = values
+                out[~keep] = hash_rows(removed, columns)
+                return out
+            return self._derive(self.columns, restore)
+
+        if isinstance(delta, RowsSelected) and not undo:
+            # self belongs to delta.source; parsed columns replace the text ones
+            positions = delta.positions
+            pairs = [(col, delta.source[col], pd.Series(values))
+                     for col, values in delta.replaced.items() if col in key]
+            if not pairs:
+                return self._derive(self.columns, lambda v: v[positions], rows_only=True)
+            swap = self._swap(pairs)
+            return self._derive(self.columns, lambda v: swap(v)[positions])
+
+        if isinstance(delta, ColumnsChanged):
+            # delta.saved holds the columns of the frame before this change
+            pairs = [(col, old, df[col]) for col, old in delta.saved.items() if col in key]
+            return self._derive(self.columns, self._swap(pairs) if pairs else None)
+
+        if isinstance(delta, ColumnsDropped):
+            if self.subset is not None:
+                # A key that loses a column is gone; restored ones are not in it
+                if any(col in key for col in delta.saved):
+                    return None
+                return self._derive(self.columns)
+            if undo:
+                pairs = [(col, None, df[col]) for col in delta.saved]
+            else:
+                pairs = [(col, old, None) for col, old in delta.saved.items()]
+            return self._derive(list(df.columns), self._swap(pairs))
+
+        if isinstance(delta, Renamed):
+            mapping = delta.mapping
+            if undo:
+                mapping = {new: old for old, new in mapping.items()}
+            moved = [(old, new) for old, new in mapping.items() if old in key]
+            columns = [mapping.get(col, col) for col in self.columns]
+            subset = None if self.subset is None else tuple(columns)
+            if not moved:
+                return self._derive(columns, subset=subset)
+            pairs = []
+            for old, new in moved:
+                s = df[new]
+                pairs += [(old, s, None), (new, None, s)]
+            return self._derive(columns, self._swap(pairs), subset=subset)
+        return None
+
+    def extend(self, rows):
+        # Fingerprints after rows are appended: only the new rows are hashed
+        columns = self.columns
+        return self._derive(columns, lambda v: np.concatenate([v, hash_rows(rows, columns)]))
+
+
+# ==========================================================
+# Per-frame cache
+# ==========================================================
+_cache = FrameCache(MAX_KEYS)  # {subset: RowFingerprints} per frame
+
+
+def fingerprints(df, subset=None):
+    subset = None if subset is None else tuple(subset)
+    fp = _cache.get(df, subset)
+    if fp is None:
+        fp = RowFingerprints.compute(df, subset)
+        _cache.put(df, subset, fp)
+    return fp
+
+
+def carry_fingerprints(old, new, delta, undo=False):
+    # Derive the cached fingerprints of `new` from those of the frame it
+    # came from. Undoing a selection or a plan returns a frame that still
+    # has its own entries, so there is nothing to do then.
+    if isinstance(delta, RowsSelected):
+        if undo:
+            return
+        old = delta.source
+    if old is None or new is None or old is new:
+        return
+    for _, fp in _cache.items(old):
+        derived = fp.after(new, delta, undo)
+        if derived is not None:
+            _cache.put(new, derived.subset, derived)
+
+
+def appended(old, new, rows):
+    # new is old with rows appended at the end
+    for subset, fp in _cache.items(old):
+        _cache.put(new, subset, fp.extend(rows))
+
+
+# ==========================================================
+# Duplicates
+# ==========================================================
+def duplicated(df, subset=None, keep="first", positions=None):
+    # Boolean mask over the rows (or over `positions`): True for repeats
+    # of an earlier row (keep="first"), a later one ("last"), or for every
+    # member of a repeated group (keep=False)
+    fp = fingerprints(df, subset)
+    if fp.verified is None:
+        fp.verified = _verify(df, fp)
+    if not fp.verified:
+        # Two different rows share a fingerprint: compare the values
+        key = df[fp.columns] if positions is None else df[fp.columns].take(positions)
+        return key.duplicated(keep=keep).to_numpy()
+    values = fp.values if positions is None else fp.values[np.asarray(positions, dtype=np.intp)]
+    return pd.Series(values, copy=False).duplicated(keep=keep).to_numpy()
+
+
+def _verify(df, fp):
+    # Every row sharing a fingerprint must equal the first row with it
+    codes, uniques = pd.factorize(fp.values)
+    order = np.arange(len(codes))
+    first = np.empty(len(uniques), dtype=np.intp)
+    first[codes[::-1]] = order[::-1]
+    rows = np.flatnonzero(first[codes] != order)
+    return bool(_rows_equal(df, fp.columns, rows, first[codes[rows]]).all())
+
+
+def _rows_equal(df, columns, a, b):
+    same = np.ones(len(a), dtype=bool)
+    for col in columns:
+        s = df[col]
+        if isinstance(s.dtype, np.dtype) and s.dtype.kind in "biufcmM":
+            values = s.to_numpy()
+            x, y = values[a], values[b]
+            same &= (x == y) | (pd.isna(x) & pd.isna(y))
+            continue
+        x = s.take(a).reset_index(drop=True)
+        y = s.take(b).reset_index(drop=True)
+        same &= (x.eq(y).fillna(False) | (x.isna() & y.isna())).to_numpy(dtype=bool)
+    return same
+
+
+def find_duplicates(df, subset=None):
+    # (rows that repeat an earlier row, groups with more than one row)
+    fp = fingerprints(df, subset)
+    repeats = duplicated(df, subset)
+    groups = len(pd.unique(fp.values[repeats])) if repeats.any() else 0
+    return int(repeats.sum()), groups
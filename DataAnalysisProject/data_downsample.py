@@ -0,0 +1,115 @@
+# ----------------------------------------------
+# data_downsample.py
+# Visual downsampling for charts on large data.
+# Lines are reduced to about the plot's pixel width (LTTB or min/max per
+# bucket), bar/pie categories are capped with an "Other" bucket, and
+# histogram / box statistics are computed up front so matplotlib never
+# sees the raw column.
+# ----------------------------------------------
+
+import numpy as np
+import pandas as pd
+from matplotlib import cbook
+
+DEFAULT_WIDTH = 1000
+MAX_BAR_CATEGORIES = 40
+MAX_PIE_CATEGORIES = 12
+MAX_FLIERS = 1000
+MARKER_LIMIT = 200
+OTHER_LABEL = "Other"
+
+
+# ==========================================================
+# Lines
+# ==========================================================
+def lttb(y, n_out):
+    # Largest-triangle-three-buckets; returns (positions, values)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n), y
+
+    every = (n - 2) / (n_out - 2)
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0] = 0
+    idx[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = (end + next_end - 1) / 2.0
+        avg_y = y[end:next_end].mean()
+        xs = np.arange(start, end)
+        area = np.abs((a - avg_x) * (y[start:end] - y[a]) - (a - xs) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx, y[idx]
+
+
+def minmax(y, n_buckets):
+    # Keeps the min and max of each bucket, in their original order
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if 2 * n_buckets >= n or n_buckets < 1:
+        return np.arange(n), y
+
+    size = -(-n // n_buckets)
+    padded = np.full(size * n_buckets, np.nan)
+    padded[:n] = y
+    buckets = padded.reshape(n_buckets, size)
+    valid = ~np.isnan(buckets).all(axis=1)
+    base = np.arange(n_buckets)[valid] * size
+    lo = base + np.nanargmin(buckets[valid], axis=1)
+    hi = base + np.nanargmax(buckets[valid], axis=1)
+    idx = np.unique(np.concatenate([lo, hi]))
+    return idx, y[idx]
+
+
+def downsample_line(values, width=DEFAULT_WIDTH, method="lttb"):
+    values = np.asarray(values)
+    if not np.issubdtype(values.dtype, np.number) or len(values) <= width:
+        return np.arange(len(values)), values
+    if method == "minmax":
+        return minmax(values, width // 2)
+    return lttb(values, width)
+
+
+# ==========================================================
+# Categories
+# ==========================================================
+def cap_categories(series, max_categories, how="sum"):
+    # The largest max_categories - 1 entries keep their original order;
+    # everything else is folded into one "Other" entry
+    if len(series) <= max_categories:
+        return series
+    keep_n = max_categories - 1
+    values = series.to_numpy(dtype=float)
+    magnitude = np.nan_to_num(np.abs(values), nan=-1.0)
+    top = np.sort(np.argpartition(-magnitude, keep_n - 1)[:keep_n])
+    rest = np.ones(len(values), dtype=bool)
+    rest[top] = False
+    other = np.nanmean(values[rest]) if how == "mean" else np.nansum(values[rest])
+    kept = series.iloc[top]
+    return pd.Series(np.append(kept.to_numpy(dtype=float), other),
+                     index=list(kept.index.astype(str)) + [OTHER_LABEL])
+
+
+# ==========================================================
+# Distributions
+# ==========================================================
+def histogram(values, bins=20):
+    counts, edges = np.histogram(np.asarray(values, dtype=float), bins=bins)
+    return counts, edges
+
+
+def box_stats(values, max_fliers=MAX_FLIERS, seed=0):
+    stats = cbook.boxplot_stats(np.asarray(values, dtype=float))
+    for s in stats:
+        fliers = s["fliers"]
+        if len(fliers) > max_fliers:
+            # Keep the extremes, sample the rest
+            rng = np.random.default_rng(seed)
+            keep = rng.choice(len(fliers), max_fliers - 2, replace=False)
+            s["fliers"] = np.concatenate([[fliers.min(), fliers.max()], fliers[keep]])
+    return stats
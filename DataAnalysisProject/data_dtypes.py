@@ -0,0 +1,124 @@
+# ----------------------------------------------
+# data_dtypes.py
+# Memory-compact dtypes for loaded frames:
+# downcast numbers (int8/16/32, float32) and turn
+# low-cardinality strings into categories. The opt-in
+# memory optimizer also moves the remaining Python-object
+# string columns to Arrow-backed strings.
+# ----------------------------------------------
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# A string column becomes a category when at most this share of values is unique
+CATEGORY_RATIO = 0.5
+
+try:
+    ARROW_STRING = pd.StringDtype("pyarrow")
+except ImportError:
+    ARROW_STRING = None
+
+
+def memory_bytes(obj):
+    usage = obj.memory_usage(deep=True)
+    return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+
+
+def format_bytes(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(n) < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def is_text(s):
+    return s.dtype == object or isinstance(s.dtype, pd.StringDtype)
+
+
+def compact_series(s, category_ratio=CATEGORY_RATIO, arrow_strings=False):
+    if pd.api.types.is_bool_dtype(s):
+        return s
+    if pd.api.types.is_integer_dtype(s):
+        return pd.to_numeric(s, downcast="integer")
+    if pd.api.types.is_float_dtype(s):
+        # Whole-number floats without NaN go back to the smallest int
+        non_na = s.dropna()
+        if len(non_na) == len(s) and len(s) and (non_na % 1 == 0).all():
+            return pd.to_numeric(s, downcast="integer")
+        return pd.to_numeric(s, downcast="float")
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return s
+    if s.dtype == object or pd.api.types.is_string_dtype(s):
+        if s.dtype == object and pd.api.types.infer_dtype(s, skipna=True) != "string":
+            return s  # mixed objects stay as they are
+        if len(s) and s.nunique(dropna=True) <= category_ratio * len(s):
+            return s.astype("category")
+        if arrow_strings and s.dtype == object and ARROW_STRING is not None:
+            return s.astype(ARROW_STRING)
+    return s
+
+
+def optimize_dtypes(df, category_ratio=CATEGORY_RATIO):
+    return pd.DataFrame(
+        {col: compact_series(df[col], category_ratio) for col in df.columns},
+        index=df.index,
+    )
+
+
+def optimize_memory(df, category_ratio=CATEGORY_RATIO):
+    # Columns whose dtype the optimizer would change: {name: new series}
+    changed = {}
+    for col in df.columns:
+        s = df[col]
+        new = compact_series(s, category_ratio, arrow_strings=True)
+        if new.dtype != s.dtype:
+            changed[col] = new
+    return changed
+
+
+def strip_text(s):
+    # Vectorised strip that leaves missing values and non-strings alone
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        cats = s.cat.categories
+        if pd.api.types.infer_dtype(cats, skipna=True) != "string":
+            return s
+        # Strip the categories, not the rows; merge ones that become equal
+        stripped = cats.str.strip()
+        unique = pd.Index(stripped.unique())
+        remap = unique.get_indexer(stripped)
+        codes = s.cat.codes.to_numpy()
+        codes = np.where(codes >= 0, remap[codes], -1)
+        return pd.Series(pd.Categorical.from_codes(codes, categories=unique),
+                         index=s.index, name=s.name)
+    if s.dtype == object and pd.api.types.infer_dtype(s, skipna=True) not in ("string", "mixed", "empty"):
+        return s  # no strings to strip (e.g. booleans with missing values)
+    stripped = s.str.strip()
+    if s.dtype == object:
+        # .str gives NaN for numbers and other objects; keep those
+        stripped = stripped.where(stripped.notna(), s)
+    return stripped
+
+
+def concat_compact(chunks, category_ratio=CATEGORY_RATIO):
+    # Join per-chunk compacted frames column by column. Categories are
+    # unioned so they survive the concat instead of decaying to object.
+    if not chunks:
+        return pd.DataFrame()
+    if len(chunks) == 1:
+        return chunks[0].reset_index(drop=True)
+
+    columns = {}
+    for col in chunks[0].columns:
+        parts = [c[col] for c in chunks]
+        if all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts):
+            merged = pd.Series(union_categoricals(parts, ignore_order=True), name=col)
+        else:
+            parts = [p.astype(object) if isinstance(p.dtype, pd.CategoricalDtype) else p
+                     for p in parts]
+            merged = pd.concat(parts, ignore_index=True)
+            if merged.dtype == object:
+                # A chunk with only missing values comes back as object
+                merged = merged.infer_objects()
+        columns[col] = compact_series(merged, category_ratio)
+    return pd.DataFrame(columns)
@@ -0,0 +1,143 @@
+# ----------------------------------------------
+# data_engine.py
+# GUI-free core of the Data Analysis toolkit:
+# dataset loading, cleaning recipes and chart aggregation.
+# Used by the Tk screen and by the headless batch runner.
+# ----------------------------------------------
+
+import json
+import os
+
+import pandas as pd
+
+from data_aggregate import group_aggregate, value_counts
+from data_corr import CORR_SAMPLE_ROWS, correlation_matrix, prepare_heatmap, prepare_pairs
+from data_downsample import (DEFAULT_WIDTH, MAX_BAR_CATEGORIES, MAX_PIE_CATEGORIES,
+                             box_stats, cap_categories, downsample_line, histogram)
+from data_loader import read_csv_chunked, read_excel_compact
+from data_plan import Plan, step_from_dict
+
+RECIPE_VERSION = 1
+EXCEL_EXTENSIONS = (".xlsx", ".xlsm", ".xls")
+DATA_EXTENSIONS = (".csv",) + EXCEL_EXTENSIONS
+
+
+# ==========================================================
+# Loading
+# ==========================================================
+def load_dataset(path, progress=None, sheet=None, cell_range=None):
+    # Returns (df, report) for a CSV or Excel file; sheet / cell_range are Excel only
+    if os.path.splitext(path)[1].lower() in EXCEL_EXTENSIONS:
+        return read_excel_compact(path, progress=progress, sheet=sheet, cell_range=cell_range)
+    return read_csv_chunked(path, progress=progress)
+
+
+# ==========================================================
+# Recipes (cleaning steps recorded from a UI session)
+# ==========================================================
+class Recipe:
+
+    def __init__(self, steps=None, aggregate=None):
+        self.steps = list(steps or [])
+        # Optional {"column": ..., "group": ..., "agg": ...}
+        self.aggregate = aggregate
+
+    def apply(self, df, progress=None):
+        return Plan(self.steps).execute(df, progress=progress)
+
+    def aggregate_frame(self, df):
+        if not self.aggregate:
+            return None
+        spec = self.aggregate
+        result = group_aggregate(df, spec["column"], spec["group"], spec.get("agg", "sum"))
+        return result.reset_index()
+
+    def to_dict(self):
+        data = {"version": RECIPE_VERSION, "steps": [s.to_dict() for s in self.steps]}
+        if self.aggregate:
+            data["aggregate"] = dict(self.aggregate)
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version", RECIPE_VERSION) > RECIPE_VERSION:
+            raise ValueError("Recipe was written by a newer version of the toolkit.")
+        return cls([step_from_dict(s) for s in data.get("steps", [])], data.get("aggregate"))
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.to_dict(), fh, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as fh:
+            return cls.from_dict(json.load(fh))
+
+
+# ==========================================================
+# Chart data (runs on a worker thread, no Tk / matplotlib calls)
+# ==========================================================
+def prepare_chart_data(df, ctype, col, group, agg, cache=None, revision=0,
+                       width=DEFAULT_WIDTH, progress=None):
+    def memo(key, compute):
+        if cache is None:
+            return compute()
+        return cache.get_or_compute(revision, key, compute)
+
+    def grouped():
+        return memo(("group", col, group, agg),
+                    lambda: group_aggregate(df, col, group, agg, progress=progress))
+
+    def counts():
+        return memo(("counts", col), lambda: value_counts(df, col, progress=progress))
+
+    def values():
+        return memo(("values", col), lambda: df[col].dropna())
+
+    numeric = pd.api.types.is_numeric_dtype(df[col]) if col else False
+    grouped_how = "mean" if agg == "mean" else "sum"
+
+    if ctype == "pie":
+        if numeric and group:
+            data = cap_categories(grouped(), MAX_PIE_CATEGORIES, grouped_how)
+            return {"plot": "pie", "data": data,
+                    "title": f"{agg.capitalize()} of {col} by {group}"}
+        data = cap_categories(counts(), MAX_PIE_CATEGORIES)
+        return {"plot": "pie", "data": data, "title": f"Distribution of {col}"}
+
+    if ctype == "bar":
+        if group:
+            data = cap_categories(grouped(), MAX_BAR_CATEGORIES, grouped_how)
+        else:
+            data = cap_categories(counts(), MAX_BAR_CATEGORIES)
+        return {"plot": "bar", "data": data, "title": f"Bar Chart - {col}"}
+
+    if ctype == "line":
+        if group:
+            data = grouped()
+            pos, y = downsample_line(data.values, width)
+            return {"plot": "line_grouped", "data": (data.index[pos].astype(str), y),
+                    "title": f"{agg.capitalize()} of {col} by {group}"}
+        pos, y = memo(("line", col, width), lambda: downsample_line(values().values, width))
+        return {"plot": "line", "data": (pos, y), "title": f"Line Chart - {col}"}
+
+    if ctype == "hist":
+        if numeric:
+            data = memo(("hist", col), lambda: histogram(values(), bins=20))
+            return {"plot": "hist_binned", "data": data, "title": f"Histogram - {col}"}
+        return {"plot": "hist", "data": values(), "title": f"Histogram - {col}"}
+
+    if ctype == "box":
+        data = memo(("box", col), lambda: box_stats(values()))
+        return {"plot": "box", "data": data, "title": f"Box Plot - {col}"}
+
+    if ctype in ("heatmap", "pairs"):
+        corr = memo(("corr",), lambda: correlation_matrix(df, sample_rows=CORR_SAMPLE_ROWS))
+        if corr.shape[1] < 2:
+            return None
+        note = f" ({CORR_SAMPLE_ROWS:,}-row sample)" if len(df) > CORR_SAMPLE_ROWS else ""
+        if ctype == "pairs":
+            return prepare_pairs(corr, sample_note=note)
+        return memo(("heatmap",), lambda: prepare_heatmap(corr, sample_note=note))
+
+    return None
@@ -0,0 +1,118 @@
+# ----------------------------------------------
+# data_export.py
+# Chunked export of a frame to CSV (plain, gzip, zstd), Parquet or
+# Feather with progress. Output goes to a temporary file that replaces
+# the target only when complete, so a cancelled or failed export never
+# leaves a truncated file behind.
+# ----------------------------------------------
+
+import gzip
+import io
+import os
+import time
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+EXPORT_CHUNK_ROWS = 200_000
+
+# Longest suffix first so ".csv.gz" is not taken for ".gz"
+EXPORT_FORMATS = [
+    (".csv.gz", "csv", "gzip"),
+    (".csv.zst", "csv", "zstd"),
+    (".csv", "csv", None),
+    (".parquet", "parquet", "zstd"),
+    (".feather", "feather", "lz4"),
+    (".arrow", "feather", "lz4"),
+]
+
+
+def export_format(path):
+    name = path.lower()
+    for suffix, fmt, compression in EXPORT_FORMATS:
+        if name.endswith(suffix):
+            return fmt, compression
+    raise ValueError(f"Unsupported export format: {os.path.basename(path)}")
+
+
+def _chunks(df, chunk_rows, progress, label):
+    total = len(df)
+    for start in range(0, max(total, 1), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+        if progress:
+            done = min(start + chunk_rows, total)
+            progress(done / total if total else 1.0, f"{label}... {done:,} / {total:,} rows")
+
+
+def _text_stream(tmp, compression):
+    if compression is None:
+        return open(tmp, "w", newline="", encoding="utf-8")
+    if compression == "gzip":
+        return gzip.open(tmp, "wt", newline="", encoding="utf-8", compresslevel=6)
+    if pa is None:
+        raise RuntimeError(f"pyarrow is required for {compression} compression.")
+    raw = pa.output_stream(tmp, compression=compression)
+    return io.TextIOWrapper(raw, newline="", encoding="utf-8")
+
+
+def _write_csv(df, tmp, compression, chunk_rows, progress):
+    with _text_stream(tmp, compression) as handle:
+        first = True
+        for chunk in _chunks(df, chunk_rows, progress, "Writing CSV"):
+            chunk.to_csv(handle, header=first, index=False)
+            first = False
+
+
+def _arrow_batches(df, chunk_rows, progress, label):
+    # One schema for the whole frame, so an all-missing first chunk cannot
+    # pin a column to the null type
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    batches = (pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False)
+               for chunk in _chunks(df, chunk_rows, progress, label))
+    return schema, batches
+
+
+def _write_parquet(df, tmp, compression, chunk_rows, progress):
+    if pa is None:
+        raise RuntimeError("pyarrow is required to write Parquet.")
+    schema, batches = _arrow_batches(df, chunk_rows, progress, "Writing Parquet")
+    with pq.ParquetWriter(tmp, schema, compression=compression) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+
+
+def _write_feather(df, tmp, compression, chunk_rows, progress):
+    # Feather v2 is the Arrow IPC file format
+    if pa is None:
+        raise RuntimeError("pyarrow is required to write Feather.")
+    schema, batches = _arrow_batches(df, chunk_rows, progress, "Writing Feather")
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, schema, options=options) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+
+
+WRITERS = {"csv": _write_csv, "parquet": _write_parquet, "feather": _write_feather}
+
+
+def export_frame(df, path, progress=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    # Returns a report dict; progress(fraction, message) may raise to cancel
+    fmt, compression = export_format(path)
+    started = time.perf_counter()
+    tmp = path + ".part"
+    try:
+        WRITERS[fmt](df, tmp, compression, chunk_rows, progress)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return {
+        "rows": len(df),
+        "format": fmt if compression is None else f"{fmt} ({compression})",
+        "bytes": os.path.getsize(path),
+        "seconds": time.perf_counter() - started,
+    }
@@ -0,0 +1,144 @@
+# ----------------------------------------------
+# data_grid.py
+# Paged preview grid for the Data Analysis screen.
+# Only the visible window of rows and columns is formatted, so moving
+# through a 10M-row frame costs the same as through a 60-row one. The
+# scrollbars map onto row and column offsets instead of scrolling text.
+# ----------------------------------------------
+
+import customtkinter as ctk
+
+PAGE_ROWS = 30
+PAGE_COLUMNS = 6
+WHEEL_ROWS = 3
+
+
+class PagedGrid:
+
+    def __init__(self, master, width=500, height=550, page_rows=PAGE_ROWS,
+                 page_columns=PAGE_COLUMNS, **textbox_kwargs):
+        self.page_rows = page_rows
+        self.page_columns = page_columns
+        self.df = None
+        self.note = ""
+        self.row = 0
+        self.col = 0
+        self._shown = None
+
+        self.frame = ctk.CTkFrame(master, fg_color="transparent")
+        body = ctk.CTkFrame(self.frame, fg_color="transparent")
+        body.pack(fill="both", expand=True)
+        self.box = ctk.CTkTextbox(body, width=width, height=height, wrap="none",
+                                  activate_scrollbars=False, **textbox_kwargs)
+        self.box.grid(row=0, column=0, sticky="nsew")
+        self.vbar = ctk.CTkScrollbar(body, orientation="vertical",
+                                     command=lambda *a: self._scroll("row", *a))
+        self.vbar.grid(row=0, column=1, sticky="ns")
+        self.hbar = ctk.CTkScrollbar(body, orientation="horizontal",
+                                     command=lambda *a: self._scroll("col", *a))
+        self.hbar.grid(row=1, column=0, sticky="ew")
+        body.grid_rowconfigure(0, weight=1)
+        body.grid_columnconfigure(0, weight=1)
+        self.status = ctk.CTkLabel(self.frame, text="", anchor="w", font=("Segoe UI", 11))
+        self.status.pack(fill="x", padx=4)
+
+        # Windows / macOS send MouseWheel events, X11 buttons 4 and 5
+        self.box.bind("<MouseWheel>", self._wheel)
+        self.box.bind("<Shift-MouseWheel>", lambda e: self._wheel(e, "col"))
+        self.box.bind("<Button-4>", lambda e: self._step("row", -WHEEL_ROWS))
+        self.box.bind("<Button-5>", lambda e: self._step("row", WHEEL_ROWS))
+        self.box.configure(state="disabled")
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    # ---------------- content ----------------
+    def show(self, df, note="", reset=False):
+        # Keeps the scroll position for a new version of the same data
+        if reset or self.df is None or df is None:
+            self.row = self.col = 0
+        self.df = df
+        self.note = note
+        self._shown = None
+        self.render()
+
+    def reset(self):
+        # Back to the top-left corner, e.g. for a newly loaded dataset
+        self.row = self.col = 0
+
+    def show_message(self, text):
+        self.df = None
+        self._shown = None
+        self._write(text)
+        self.status.configure(text="")
+        self.vbar.set(0, 1)
+        self.hbar.set(0, 1)
+
+    def render(self):
+        df = self.df
+        if df is None:
+            return
+        rows, cols = df.shape
+        self.row = max(0, min(self.row, rows - self.page_rows))
+        self.col = max(0, min(self.col, cols - self.page_columns))
+        view = (id(df), self.row, self.col)
+        if view == self._shown:
+            return
+        self._shown = view
+
+        page = df.iloc[self.row:self.row + self.page_rows, self.col:self.col + self.page_columns]
+        try:
+            text = page.to_string()
+        except Exception:
+            text = str(page)
+        self._write(text)
+
+        last_row = min(self.row + self.page_rows, rows)
+        last_col = min(self.col + self.page_columns, cols)
+        status = (f"Rows {self.row + 1 if rows else 0:,}-{last_row:,} of {rows:,}"
+                  f"  |  Columns {self.col + 1 if cols else 0}-{last_col} of {cols}")
+        self.status.configure(text=status + (f"  |  {self.note}" if self.note else ""))
+        self.vbar.set(*self._fraction(self.row, self.page_rows, rows))
+        self.hbar.set(*self._fraction(self.col, self.page_columns, cols))
+
+    def _write(self, text):
+        self.box.configure(state="normal")
+        self.box.delete("1.0", "end")
+        self.box.insert("end", text)
+        self.box.configure(state="disabled")
+
+    @staticmethod
+    def _fraction(start, page, total):
+        if total <= page:
+            return 0.0, 1.0
+        return start / total, min(start + page, total) / total
+
+    # ---------------- scrolling ----------------
+    def _scroll(self, axis, action, value, unit=None):
+        # Scrollbar protocol: ("moveto", fraction) or ("scroll", n, units|pages)
+        if self.df is None:
+            return
+        total = self.df.shape[0 if axis == "row" else 1]
+        page = self.page_rows if axis == "row" else self.page_columns
+        if action == "moveto":
+            self._set(axis, int(float(value) * total))
+        else:
+            self._step(axis, int(value) * (page if unit == "pages" else 1))
+
+    def _step(self, axis, n):
+        if self.df is None:
+            return "break"
+        self._set(axis, (self.row if axis == "row" else self.col) + n)
+        return "break"
+
+    def _set(self, axis, start):
+        if axis == "row":
+            self.row = start
+        else:
+            self.col = start
+        self.render()
+
+    def _wheel(self, event, axis="row"):
+        # Only the direction is used; delta units differ between platforms
+        step = WHEEL_ROWS if axis == "row" else 1
+        return self._step(axis, -step if event.delta > 0 else step)
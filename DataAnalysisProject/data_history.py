@@ -0,0 +1,346 @@
+# ----------------------------------------------
+# data_history.py
+# Undo / redo history built from small deltas instead of full copies.
+# Each cleaning op describes what it changed (removed rows, replaced
+# columns, dropped columns, renames); only that part is kept.
+# Unchanged columns are shared with the live frame, never copied.
+# FrameCache keeps data derived from a frame (row fingerprints, filter
+# masks) for as long as the frame lives, so it can follow the deltas.
+# ----------------------------------------------
+
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_BUDGET_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_STEPS = 50
+
+
+def _nbytes(obj):
+    usage = obj.memory_usage(deep=True)
+    return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+
+
+# ==========================================================
+# Deltas
+# undo(df) turns the frame after the op back into the frame before it;
+# redo(df) does the reverse.
+# ==========================================================
+class RowsRemoved:
+
+    def __init__(self, df, keep):
+        self.keep = np.asarray(keep, dtype=bool)
+        self.removed = df[~self.keep]
+        self.index = df.index
+        self.nbytes = self.keep.nbytes + _nbytes(self.removed)
+        if not isinstance(self.index, pd.RangeIndex):
+            self.nbytes += self.index.nbytes
+
+    def undo(self, df):
+        kept_pos = np.flatnonzero(self.keep)
+        removed_pos = np.flatnonzero(~self.keep)
+        # order[i] = row of the concatenated frame that belongs at position i
+        order = np.empty(len(self.keep), dtype=np.intp)
+        order[kept_pos] = np.arange(len(kept_pos))
+        order[removed_pos] = len(kept_pos) + np.arange(len(removed_pos))
+        both = pd.concat([df, self.removed], ignore_index=True)
+        out = both.take(order)
+        out.index = self.index
+        return out
+
+    def redo(self, df):
+        return df[self.keep].reset_index(drop=True)
+
+
+class ColumnsChanged:
+
+    def __init__(self, df, columns):
+        # Old column objects are only referenced: ops never mutate their input
+        self.saved = {col: df[col] for col in columns}
+        self.nbytes = sum(_nbytes(s) for s in self.saved.values())
+
+    def prepare(self, df, undo=False):
+        # Pure: the columns df loses are saved only when commit() runs,
+        # so a cancelled undo leaves this delta as it was
+        out = df.copy(deep=False)
+        current = {col: df[col] for col in self.saved}
+        for col, values in self.saved.items():
+            out[col] = values
+        return out, lambda: setattr(self, "saved", current)
+
+    def _swap(self, df):
+        out, commit = self.prepare(df)
+        commit()
+        return out
+
+    undo = _swap
+    redo = _swap
+
+
+class ColumnsDropped:
+
+    def __init__(self, df, columns):
+        self.order = list(df.columns)
+        self.saved = {col: df[col] for col in columns}
+        self.nbytes = sum(_nbytes(s) for s in self.saved.values())
+
+    def undo(self, df):
+        out = df.copy(deep=False)
+        for col, values in self.saved.items():
+            out[col] = values
+        return out[self.order]
+
+    def redo(self, df):
+        return df.drop(columns=list(self.saved))
+
+
+class Renamed:
+
+    def __init__(self, mapping):
+        self.mapping = dict(mapping)
+        self.nbytes = 0
+
+    def undo(self, df):
+        return df.rename(columns={new: old for old, new in self.mapping.items()})
+
+    def redo(self, df):
+        return df.rename(columns=self.mapping)
+
+
+class RowsSelected:
+
+    def __init__(self, source, positions, replaced=None):
+        # The source frame is kept by reference, so re-selecting a different
+        # set of rows from it (e.g. widening a date range) needs no copy
+        self.source = source
+        self.positions = np.asarray(positions, dtype=np.intp)
+        self.replaced = dict(replaced or {})
+        # The source is counted by History, once however many entries share it
+        self.source_nbytes = _nbytes(source)
+        self.nbytes = self.positions.nbytes + sum(_nbytes(pd.Series(v, copy=False))
+                                                  for v in self.replaced.values())
+
+    def undo(self, df):
+        return self.source
+
+    def redo(self, df):
+        out = self.source
+        if self.replaced:
+            out = out.copy(deep=False)
+            for col, values in self.replaced.items():
+                out[col] = values
+        return out.take(self.positions).reset_index(drop=True)
+
+
+class Steps:
+
+    def __init__(self, deltas):
+        self.deltas = list(deltas)
+        self.nbytes = sum(d.nbytes for d in self.deltas)
+
+    def prepare(self, df, undo=False):
+        commits = []
+        for delta in (reversed(self.deltas) if undo else self.deltas):
+            df, commit = apply_delta(delta, df, undo)
+            if commit is not None:
+                commits.append(commit)
+        if not commits:
+            return df, None
+        return df, lambda: [commit() for commit in commits]
+
+    def undo(self, df):
+        return _committed(*self.prepare(df, undo=True))
+
+    def redo(self, df):
+        return _committed(*self.prepare(df))
+
+
+def apply_delta(delta, df, undo=False):
+    # (new frame, commit). Deltas holding state that changes with each
+    # swap (ColumnsChanged) leave it alone until commit() is called, once
+    # the new frame is in place; commit is None for the others.
+    prepare = getattr(delta, "prepare", None)
+    if prepare is not None:
+        return prepare(df, undo)
+    return (delta.undo(df) if undo else delta.redo(df)), None
+
+
+def _committed(df, commit):
+    if commit is not None:
+        commit()
+    return df
+
+
+# ==========================================================
+# Op helpers: return (new_df, delta)
+# ==========================================================
+def keep_rows(df, keep):
+    keep = np.asarray(keep, dtype=bool)
+    return df[keep].reset_index(drop=True), RowsRemoved(df, keep)
+
+
+def replace_columns(df, new_columns):
+    delta = ColumnsChanged(df, list(new_columns))
+    out = df.copy(deep=False)
+    for col, values in new_columns.items():
+        out[col] = values
+    return out, delta
+
+
+def select_rows(df, positions, replaced=None):
+    delta = RowsSelected(df, positions, replaced)
+    return delta.redo(df), delta
+
+
+def drop_columns(df, columns):
+    return df.drop(columns=list(columns)), ColumnsDropped(df, columns)
+
+
+def rename_columns(df, mapping):
+    return df.rename(columns=mapping), Renamed(mapping)
+
+
+# ==========================================================
+# Per-frame cache
+# ==========================================================
+class FrameCache:
+    # Frames are unhashable, so entries are keyed by identity and dropped
+    # by a weakref callback when their frame is collected. Ops never
+    # mutate their input, so what was derived from a frame stays valid.
+
+    def __init__(self, limit):
+        self.limit = limit  # entries per frame, oldest dropped first
+        self._frames = {}  # id(frame) -> (weakref to frame, {key: value})
+        self._lock = threading.Lock()
+
+    def _entries(self, df, create=False):
+        item = self._frames.get(id(df))
+        if item is not None and item[0]() is df:
+            return item[1]
+        if not create:
+            return None
+        key = id(df)
+
+        def forget(ref):
+            with self._lock:
+                if key in self._frames and self._frames[key][0] is ref:
+                    del self._frames[key]
+        entries = {}
+        self._frames[key] = (weakref.ref(df, forget), entries)
+        return entries
+
+    def get(self, df, key):
+        with self._lock:
+            entries = self._entries(df)
+            return entries.get(key) if entries else None
+
+    def items(self, df):
+        with self._lock:
+            entries = self._entries(df)
+            return list(entries.items()) if entries else []
+
+    def put(self, df, key, value):
+        with self._lock:
+            entries = self._entries(df, create=True)
+            entries.pop(key, None)
+            entries[key] = value
+            while len(entries) > self.limit:
+                del entries[next(iter(entries))]
+
+
+# ==========================================================
+# History stack with a memory budget
+# ==========================================================
+class History:
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES, max_steps=DEFAULT_MAX_STEPS):
+        self.budget_bytes = budget_bytes
+        self.max_steps = max_steps
+        self._undo = []
+        self._redo = []
+
+    @property
+    def nbytes(self):
+        # Entries that keep a whole frame (a selection's or a plan's source)
+        # count it once per frame. The next redo's source is the frame on
+        # screen, which the history does not keep alive.
+        total = 0
+        frames = {}
+        current = self._redo[-1] if self._redo else None
+        for delta in self._undo + self._redo:
+            total += delta.nbytes
+            source = getattr(delta, "source", None)
+            if source is not None and delta is not current:
+                frames[id(source)] = delta.source_nbytes
+        return total + sum(frames.values())
+
+    def can_undo(self):
+        return bool(self._undo)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+
+    def push(self, delta):
+        self._undo.append(delta)
+        self._redo.clear()
+        self._evict()
+
+    def replace_top(self, old, delta):
+        # Swap the newest step for a refined version of itself
+        if self._undo and self._undo[-1] is old:
+            self._undo[-1] = delta
+            self._redo.clear()
+            self._evict()
+        else:
+            self.push(delta)
+
+    def peek_undo(self):
+        # The delta undo() would apply next
+        return self._undo[-1] if self._undo else None
+
+    def peek_redo(self):
+        return self._redo[-1] if self._redo else None
+
+    def undo(self, df):
+        delta = self.peek_undo()
+        if delta is None:
+            return None
+        out, commit = apply_delta(delta, df, undo=True)
+        self.undone(delta, commit)
+        return out
+
+    def redo(self, df):
+        delta = self.peek_redo()
+        if delta is None:
+            return None
+        out, commit = apply_delta(delta, df)
+        self.redone(delta, commit)
+        return out
+
+    # A worker can apply_delta() peek_undo() / peek_redo() off the Tk
+    # thread; the step is committed and moves between the stacks once its
+    # result is in place
+    def undone(self, delta, commit=None):
+        if self._undo and self._undo[-1] is delta:
+            if commit is not None:
+                commit()
+            self._redo.append(self._undo.pop())
+
+    def redone(self, delta, commit=None):
+        if self._redo and self._redo[-1] is delta:
+            if commit is not None:
+                commit()
+            self._undo.append(self._redo.pop())
+
+    def _evict(self):
+        # Oldest steps go first; the newest step is always kept
+        while len(self._undo) > self.max_steps:
+            self._undo.pop(0)
+        while len(self._undo) > 1 and self.nbytes > self.budget_bytes:
+            self._undo.pop(0)
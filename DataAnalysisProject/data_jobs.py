@@ -0,0 +1,129 @@
+# ----------------------------------------------
+# data_jobs.py
+# Background job runner for the Data Analysis screen.
+# Heavy pandas work runs on a worker thread; progress and results are
+# marshalled back to Tk with root.after so widgets are only ever touched
+# from the main thread.
+# ----------------------------------------------
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobCancelled(Exception):
+    pass
+
+
+# ==========================================================
+# Job handle (passed to the worker function)
+# ==========================================================
+class Job:
+
+    def __init__(self, title):
+        self.title = title
+        self._cancel = threading.Event()
+        self._events = queue.Queue()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def check(self):
+        # Workers call this between steps so Cancel takes effect early
+        if self._cancel.is_set():
+            raise JobCancelled(self.title)
+
+    def progress(self, fraction, message=None):
+        # fraction is 0..1, or None when the step cannot be measured
+        self.check()
+        self._events.put((fraction, message))
+
+
+# ==========================================================
+# Runner (one data job at a time, results delivered on Tk thread)
+# ==========================================================
+class JobRunner:
+
+    def __init__(self, root, on_progress=None, on_state=None, workers=2, poll_ms=50):
+        self._root = root
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="data-job")
+        self._on_progress = on_progress or (lambda fraction, message: None)
+        self._on_state = on_state or (lambda title, running: None)
+        self._poll_ms = poll_ms
+        self._current = None
+        self._closed = False
+
+    @property
+    def busy(self):
+        return self._current is not None
+
+    def submit(self, title, work, on_done=None, on_error=None, on_cancel=None):
+        # work(job) runs on the pool; on_done(result) / on_error(exc) /
+        # on_cancel() run on Tk
+        if self._closed or self.busy:
+            return None
+        job = Job(title)
+        self._current = job
+        future = self._pool.submit(work, job)
+        self._on_state(title, True)
+        self._on_progress(None, f"{title}...")
+        self._root.after(self._poll_ms, self._poll, job, future, on_done, on_error, on_cancel)
+        return job
+
+    def cancel(self):
+        if self._current is not None:
+            self._current.cancel()
+            self._on_progress(None, f"Cancelling {self._current.title}...")
+
+    def shutdown(self):
+        self._closed = True
+        if self._current is not None:
+            self._current.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _drain(self, job):
+        last = None
+        while True:
+            try:
+                last = job._events.get_nowait()
+            except queue.Empty:
+                break
+        if last is not None:
+            self._on_progress(*last)
+
+    def _poll(self, job, future, on_done, on_error, on_cancel):
+        if self._closed:
+            return
+        self._drain(job)
+        if not future.done():
+            self._root.after(self._poll_ms, self._poll, job, future, on_done, on_error, on_cancel)
+            return
+
+        self._current = None
+        self._on_state(job.title, False)
+        try:
+            result = future.result()
+        except JobCancelled:
+            self._on_progress(0, f"{job.title} cancelled.")
+            if on_cancel:
+                on_cancel()
+            return
+        except Exception as e:
+            self._on_progress(0, f"{job.title} failed.")
+            if on_error:
+                on_error(e)
+            return
+
+        # Operations that cannot be interrupted mid-call are discarded here
+        if job.cancelled:
+            self._on_progress(0, f"{job.title} cancelled.")
+            if on_cancel:
+                on_cancel()
+            return
+        self._on_progress(1, f"{job.title} done.")
+        if on_done:
+            on_done(result)
@@ -0,0 +1,296 @@
+# ----------------------------------------------
+# data_loader.py
+# Chunked CSV loading with progress and compact dtypes.
+# Uses the pyarrow streaming reader when pyarrow is installed,
+# otherwise the pandas C parser in chunks.
+# Excel goes through calamine when installed, otherwise a read-only
+# openpyxl row stream compacted chunk by chunk; both take a sheet and
+# an optional cell range.
+# ----------------------------------------------
+
+import importlib.util
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_dtypes import compact_series, concat_compact, memory_bytes, optimize_dtypes
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+    pa_csv = None
+
+try:
+    import openpyxl
+    from openpyxl.utils.cell import get_column_letter, range_boundaries
+except ImportError:
+    openpyxl = None
+
+CHUNK_ROWS = 250_000
+EXCEL_CHUNK_ROWS = 50_000
+ARROW_BLOCK_BYTES = 16 * 1024 * 1024
+HAS_CALAMINE = importlib.util.find_spec("python_calamine") is not None
+# The ISO 8601 forms arrow's CSV reader turns into dates and timestamps
+ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}(?:[T ]\d{2}(?::\d{2}(?::\d{2}(?:\.\d+)?)?)?)?(?:Z|[+-]\d{2}:?\d{2})?")
+
+
+def _compact_chunk(chunk):
+    return pd.DataFrame({col: compact_series(chunk[col]) for col in chunk.columns})
+
+
+def _arrow_chunks(handle):
+    # Match pandas: empty fields are missing, dates come back as datetime64,
+    # repeated names become a, a.1 and a header without rows keeps its columns
+    reader = pa_csv.open_csv(
+        handle,
+        read_options=pa_csv.ReadOptions(block_size=ARROW_BLOCK_BYTES),
+        convert_options=pa_csv.ConvertOptions(strings_can_be_null=True),
+    )
+    names = _header(reader.schema.names)
+    empty = True
+    for batch in reader:
+        empty = False
+        chunk = batch.to_pandas(date_as_object=False)
+        chunk.columns = names
+        yield chunk
+    if empty:
+        yield pd.DataFrame({name: pd.Series(dtype=object) for name in names})
+
+
+def _parse_dates(df):
+    # The C parser leaves dates as text; columns whose every value is an
+    # ISO 8601 date become datetime64 as they do on the arrow path. Only
+    # distinct values are parsed, so a category column costs its categories.
+    for col in df.columns:
+        s = df[col]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            values, codes = s.cat.categories, s.cat.codes.to_numpy()
+        elif s.dtype == object or pd.api.types.is_string_dtype(s):
+            codes, values = pd.factorize(s)
+        else:
+            continue
+        values = pd.Index(values)
+        if not len(values) or values.inferred_type != "string" \
+                or not values.str.fullmatch(ISO_DATE).all():
+            continue
+        try:
+            dates = pd.to_datetime(values, format="ISO8601")
+        except (ValueError, TypeError):
+            continue  # e.g. mixed UTC offsets
+        if (values.str.len() == 10).all():
+            dates = dates.as_unit("ms")  # arrow reads plain dates as date32
+        # Missing values have code -1, which picks the NaT appended last
+        dates = dates.append(pd.DatetimeIndex([pd.NaT], dtype=dates.dtype))
+        df[col] = pd.Series(dates[codes], index=df.index, name=col)
+    return df
+
+
+def _pandas_chunks(handle, chunk_rows):
+    for chunk in pd.read_csv(handle, chunksize=chunk_rows, low_memory=False):
+        yield chunk
+
+
+def _read(path, engine, progress, chunk_rows):
+    total = os.path.getsize(path) or 1
+    chunks = []
+    held = 0
+    peak = 0
+    rows = 0
+
+    with open(path, "rb") as handle:
+        source = _arrow_chunks(handle) if engine == "pyarrow" else _pandas_chunks(handle, chunk_rows)
+        for raw in source:
+            raw_bytes = memory_bytes(raw)
+            chunk = _compact_chunk(raw)
+            del raw
+            held += memory_bytes(chunk)
+            peak = max(peak, held + raw_bytes)
+            rows += len(chunk)
+            chunks.append(chunk)
+            if progress:
+                progress(min(handle.tell() / total, 0.99), f"Loading CSV... {rows:,} rows")
+
+    if progress:
+        progress(0.99, "Compacting columns...")
+    df = concat_compact(chunks)
+    if engine != "pyarrow":
+        df = _parse_dates(df)
+    peak = max(peak, held + memory_bytes(df))
+    return df, peak
+
+
+def read_csv_chunked(path, progress=None, chunk_rows=CHUNK_ROWS, engine=None):
+    # Returns (df, report). progress(fraction, message) may raise to cancel.
+    if engine is None:
+        engine = "pyarrow" if pa_csv is not None else "c"
+
+    started = time.perf_counter()
+    try:
+        df, peak = _read(path, engine, progress, chunk_rows)
+    except Exception as e:
+        # Arrow infers column types from the first block; mixed files
+        # fall back to the pandas parser
+        if engine != "pyarrow" or not isinstance(e, pa.ArrowInvalid):
+            raise
+        engine = "c"
+        df, peak = _read(path, engine, progress, chunk_rows)
+
+    report = {
+        "rows": len(df),
+        "columns": len(df.columns),
+        "engine": engine,
+        "seconds": time.perf_counter() - started,
+        "memory_bytes": memory_bytes(df),
+        "peak_bytes": peak,
+    }
+    return df, report
+
+
+# ==========================================================
+# Excel
+# ==========================================================
+def excel_sheets(path):
+    if openpyxl is not None and path.lower().endswith((".xlsx", ".xlsm")):
+        wb = openpyxl.load_workbook(path, read_only=True)
+        try:
+            return list(wb.sheetnames)
+        finally:
+            wb.close()
+    with pd.ExcelFile(path) as book:
+        return list(book.sheet_names)
+
+
+def excel_variant(sheet=None, cell_range=None):
+    # Cache key suffix; the default (first sheet, everything) keeps ""
+    if sheet is None and not cell_range:
+        return ""
+    return f"sheet={sheet}|range={(cell_range or '').upper()}"
+
+
+def _range_kwargs(cell_range):
+    # "B2:F5000" -> read_excel arguments; the range's first row is the header
+    if not cell_range:
+        return {}
+    if openpyxl is None:
+        raise RuntimeError("openpyxl is required to read a cell range.")
+    min_col, min_row, max_col, max_row = range_boundaries(cell_range.upper())
+    kwargs = {}
+    if min_row:
+        kwargs["skiprows"] = min_row - 1
+    if max_row:
+        kwargs["nrows"] = max_row - (min_row or 1)
+    if min_col:
+        kwargs["usecols"] = f"{get_column_letter(min_col)}:{get_column_letter(max_col)}"
+    return kwargs
+
+
+def _header(names):
+    # Blank and repeated names as pandas makes them: Unnamed: i, a.1, a.2;
+    # a suffix never takes a name that already appears in the header
+    names = [f"Unnamed: {i}" if name is None or name == "" else name
+             for i, name in enumerate(names)]
+    taken = set(names)
+    seen = {}
+    out = []
+    for name in names:
+        if name in seen:
+            base = name
+            while name in taken:
+                seen[base] += 1
+                name = f"{base}.{seen[base]}"
+            taken.add(name)
+        seen.setdefault(name, 0)
+        out.append(name)
+    return out
+
+
+def _stream_xlsx(path, sheet, cell_range, progress, chunk_rows):
+    # Read-only openpyxl: rows are streamed from the sheet XML and turned
+    # into compact frames every chunk_rows rows
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet] if sheet is not None else wb.worksheets[0]
+        bounds = {}
+        if cell_range:
+            min_col, min_row, max_col, max_row = range_boundaries(cell_range.upper())
+            bounds = {"min_col": min_col, "min_row": min_row,
+                      "max_col": max_col, "max_row": max_row}
+        total = ws.max_row if bounds.get("max_row") is None else bounds["max_row"]
+        total = (total - (bounds.get("min_row") or 1)) if total else None
+
+        rows = ws.iter_rows(values_only=True, **bounds)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame(), 0
+        columns = _header(header)
+        chunks, buffer, held, peak, count = [], [], 0, 0, 0
+
+        def flush():
+            nonlocal held, peak
+            raw = pd.DataFrame.from_records(buffer, columns=columns).infer_objects()
+            raw_bytes = memory_bytes(raw)
+            chunk = _compact_chunk(raw)
+            held += memory_bytes(chunk)
+            peak = max(peak, held + raw_bytes)
+            chunks.append(chunk)
+            buffer.clear()
+
+        width = len(columns)
+        for row in rows:
+            if len(row) != width:
+                row = (row + (None,) * width)[:width]
+            buffer.append(row)
+            count += 1
+            if len(buffer) >= chunk_rows:
+                flush()
+                if progress:
+                    frac = min(count / total, 0.99) if total else None
+                    progress(frac, f"Loading Excel... {count:,} rows")
+        if buffer or not chunks:
+            flush()
+    finally:
+        wb.close()
+
+    if progress:
+        progress(0.99, "Compacting columns...")
+    df = concat_compact(chunks)
+    # Drop trailing rows openpyxl reports as used but that hold no values
+    filled = np.flatnonzero(df.notna().any(axis=1).to_numpy())
+    if len(filled) and filled[-1] < len(df) - 1:
+        df = df.iloc[:filled[-1] + 1]
+    return df, max(peak, held + memory_bytes(df))
+
+
+def read_excel_compact(path, progress=None, sheet=None, cell_range=None,
+                       chunk_rows=EXCEL_CHUNK_ROWS):
+    # Returns (df, report) like read_csv_chunked
+    started = time.perf_counter()
+    if HAS_CALAMINE or openpyxl is None or not path.lower().endswith((".xlsx", ".xlsm")):
+        engine = "calamine" if HAS_CALAMINE else None
+        if progress:
+            progress(None, f"Reading Excel ({engine or 'default engine'})...")
+        raw = pd.read_excel(path, sheet_name=sheet if sheet is not None else 0,
+                            engine=engine, **_range_kwargs(cell_range))
+        if progress:
+            progress(0.9, "Compacting columns...")
+        df = optimize_dtypes(raw)
+        peak = memory_bytes(raw) + memory_bytes(df)
+        engine = engine or "pandas"
+    else:
+        df, peak = _stream_xlsx(path, sheet, cell_range, progress, chunk_rows)
+        engine = "openpyxl-stream"
+
+    report = {
+        "rows": len(df),
+        "columns": len(df.columns),
+        "engine": engine,
+        "seconds": time.perf_counter() - started,
+        "memory_bytes": memory_bytes(df),
+        "peak_bytes": peak,
+    }
+    return df, report
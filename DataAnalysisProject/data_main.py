@@ -1,16 +1,9 @@
-import customtkinter as ctk
-from module_dataanalysis import create_dataanalysis_screen
-from ui_theme import apply_theme
-
-apply_theme()
-
-root = ctk.CTk()
-root.title("Data Analysis Toolkit")
-root.geometry("1200x750")
-
-def go_home():
-    root.destroy()
-
-create_dataanalysis_screen(root, go_home)
-
-root.mainloop()
+# Opens the Data Analysis screen through the shared launcher (../launcher.py)
+import os
+import sys
+
+if __name__ == "__main__":
+    # Guarded so spawned aggregation workers do not start a window
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from launcher import main
+    sys.exit(main(["data"] + sys.argv[1:]))
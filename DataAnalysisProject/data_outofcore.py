@@ -0,0 +1,477 @@
+# ----------------------------------------------
+# data_outofcore.py
+# Out-of-core datasets for files larger than RAM.
+# Data stays on disk (a Parquet/Feather file, or a CSV that is spooled
+# once to Parquet when pyarrow is available) and is read back in column-
+# projected chunks. Chart data is built from streaming, mergeable partial
+# aggregates, so memory stays bounded by the chunk size and the result.
+# ----------------------------------------------
+
+import os
+
+import numpy as np
+import pandas as pd
+from matplotlib import cbook
+
+from data_cache import DatasetCache
+from data_corr import prepare_heatmap, prepare_pairs
+from data_downsample import (DEFAULT_WIDTH, MAX_BAR_CATEGORIES, MAX_PIE_CATEGORIES,
+                             MAX_FLIERS, cap_categories)
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pa_csv = None
+    pq = None
+
+CHUNK_ROWS = 500_000
+SAMPLE_SIZE = 100_000
+SAMPLE_PIECES = 20  # row groups / record batches read for a quick profile
+COLUMNAR_EXTENSIONS = (".parquet", ".feather", ".arrow")
+
+
+# ==========================================================
+# Dataset
+# ==========================================================
+class OutOfCoreDataset:
+
+    def __init__(self, path, source, columns, dtypes, rows=None):
+        self.path = path
+        self.source = source  # file actually read: the original or its spool
+        self.columns = list(columns)
+        self.dtypes = dict(dtypes)
+        self.rows = rows
+
+    @classmethod
+    def open(cls, path, progress=None, cache=None):
+        ext = os.path.splitext(path)[1].lower()
+        if ext in COLUMNAR_EXTENSIONS:
+            if pa is None:
+                raise RuntimeError("pyarrow is required to read Parquet / Feather files.")
+            return cls._from_columnar(path, path)
+        if pa is None:
+            # No arrow: stream the CSV itself on every pass
+            head = pd.read_csv(path, nrows=1000)
+            return cls(path, path, head.columns, head.dtypes)
+        cache = cache or DatasetCache()
+        spool = cache.spool_path(path)
+        if os.path.exists(spool):
+            # Touch so eviction sees this spool as recently used
+            os.utime(spool, None)
+        else:
+            _spool_csv(path, spool, progress)
+            cache.evict(keep=spool)
+        return cls._from_columnar(path, spool)
+
+    @classmethod
+    def _from_columnar(cls, path, source):
+        if source.lower().endswith(".parquet"):
+            meta = pq.ParquetFile(source)
+            schema, rows = meta.schema_arrow, meta.metadata.num_rows
+        else:
+            reader = pa.ipc.open_file(pa.memory_map(source))
+            schema = reader.schema
+            rows = sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+        empty = schema.empty_table().to_pandas()
+        return cls(path, source, empty.columns, empty.dtypes, rows)
+
+    @property
+    def columnar(self):
+        return self.source.lower().endswith(COLUMNAR_EXTENSIONS)
+
+    def numeric_columns(self):
+        return [c for c in self.columns if pd.api.types.is_numeric_dtype(self.dtypes[c])
+                and not pd.api.types.is_bool_dtype(self.dtypes[c])]
+
+    def head(self, n=60):
+        for chunk in self.iter_chunks(chunk_rows=max(n, 1000)):
+            return chunk.head(n)
+        return pd.DataFrame(columns=self.columns)
+
+    def iter_chunks(self, columns=None, chunk_rows=CHUNK_ROWS, progress=None, label="Scanning"):
+        done = 0
+        for chunk in self._chunks(columns, chunk_rows):
+            done += len(chunk)
+            yield chunk
+            if progress:
+                frac = done / self.rows if self.rows else None
+                progress(min(frac, 0.99) if frac is not None else None, f"{label}... {done:,} rows")
+
+    def sample_pieces(self, rows, pieces=SAMPLE_PIECES, progress=None):
+        # (first row, frame) slices from up to `pieces` row groups / record
+        # batches spread over the file, about `rows` rows in all: a profile
+        # without a full pass. A file that small is read whole.
+        if self.rows is not None and self.rows <= rows:
+            start = 0
+            for chunk in self._chunks(None, CHUNK_ROWS):
+                yield start, chunk
+                start += len(chunk)
+            return
+        src = self.source.lower()
+        if src.endswith(".parquet"):
+            source = pq.ParquetFile(self.source)
+            sizes = [source.metadata.row_group(i).num_rows for i in range(source.num_row_groups)]
+
+            def read(i, n):
+                batch = next(source.iter_batches(batch_size=n, row_groups=[i]), None)
+                return batch.to_pandas() if batch is not None else None
+        elif src.endswith(COLUMNAR_EXTENSIONS):
+            reader = pa.ipc.open_file(pa.memory_map(self.source))
+            sizes = [reader.get_batch(i).num_rows for i in range(reader.num_record_batches)]
+
+            def read(i, n):
+                return reader.get_batch(i).slice(0, n).to_pandas()
+        else:
+            # A CSV streamed without arrow has no groups to pick from
+            yield 0, pd.read_csv(self.source, nrows=rows, low_memory=False)
+            return
+        if not sizes:
+            return
+        starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        chosen = np.unique(np.linspace(0, len(sizes) - 1, min(pieces, len(sizes))).round().astype(int))
+        per = max(rows // len(chosen), 1)
+        for done, i in enumerate(chosen):
+            chunk = read(int(i), per)
+            if chunk is not None and len(chunk):
+                yield int(starts[i]), chunk
+            if progress:
+                progress((done + 1) / len(chosen), "Sampling...")
+
+    def _chunks(self, columns, chunk_rows):
+        src = self.source.lower()
+        if src.endswith(".parquet"):
+            for batch in pq.ParquetFile(self.source).iter_batches(batch_size=chunk_rows, columns=columns):
+                yield batch.to_pandas()
+        elif src.endswith(COLUMNAR_EXTENSIONS):
+            reader = pa.ipc.open_file(pa.memory_map(self.source))
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                if columns is not None:
+                    batch = batch.select(columns)
+                yield batch.to_pandas()
+        else:
+            yield from pd.read_csv(self.source, usecols=columns, chunksize=chunk_rows, low_memory=False)
+
+
+def _spool_csv(path, spool, progress=None):
+    # One streaming pass: CSV -> Parquet, so later passes read only the
+    # columns a chart needs
+    os.makedirs(os.path.dirname(spool), exist_ok=True)
+    total = os.path.getsize(path) or 1
+    tmp = spool + ".tmp"
+    writer = None
+    try:
+        with open(path, "rb") as handle:
+            reader = pa_csv.open_csv(
+                handle,
+                read_options=pa_csv.ReadOptions(block_size=16 * 1024 * 1024),
+                convert_options=pa_csv.ConvertOptions(strings_can_be_null=True),
+            )
+            for batch in reader:
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp, batch.schema)
+                writer.write_batch(batch)
+                if progress:
+                    progress(min(handle.tell() / total, 0.99), "Spooling to Parquet...")
+        if writer is None:
+            raise ValueError("The file has no rows.")
+        writer.close()
+        writer = None
+        os.replace(tmp, spool)
+    finally:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+# ==========================================================
+# Streaming partial aggregates (update per chunk, merge, result)
+# ==========================================================
+class GroupSumCount:
+
+    def __init__(self, col, group, agg="sum"):
+        # A count only accumulates counts: summing a text column would
+        # build one ever-growing string per group
+        self.col = col
+        self.group = group
+        self.aggs = ["count"] if agg == "count" else ["sum", "count"]
+        self.acc = None
+
+    def update(self, chunk):
+        part = chunk.groupby(self.group, observed=True)[self.col].agg(self.aggs)
+        self.merge_partial(part)
+
+    def merge_partial(self, part):
+        self.acc = part if self.acc is None else self.acc.add(part, fill_value=0)
+
+    def merge(self, other):
+        if other.acc is not None:
+            self.merge_partial(other.acc)
+
+    def result(self, agg):
+        if self.acc is None:
+            return pd.Series(dtype=float)
+        acc = self.acc.sort_index()
+        if agg == "mean":
+            out = acc["sum"] / acc["count"].where(acc["count"] > 0)
+        else:
+            out = acc[agg]
+        out.name = self.col
+        return out
+
+
+class ValueCounter:
+
+    def __init__(self, col):
+        self.col = col
+        self.acc = None
+
+    def update(self, chunk):
+        part = chunk[self.col].value_counts()
+        self.acc = part if self.acc is None else self.acc.add(part, fill_value=0)
+
+    def merge(self, other):
+        if other.acc is not None:
+            self.acc = other.acc if self.acc is None else self.acc.add(other.acc, fill_value=0)
+
+    def result(self):
+        if self.acc is None:
+            return pd.Series(dtype="int64")
+        return self.acc.astype("int64").sort_values(ascending=False)
+
+
+class MinMax:
+
+    def __init__(self, col):
+        self.col = col
+        self.lo = np.inf
+        self.hi = -np.inf
+        self.count = 0
+
+    def update(self, chunk):
+        s = chunk[self.col].dropna()
+        if len(s):
+            self.lo = min(self.lo, float(s.min()))
+            self.hi = max(self.hi, float(s.max()))
+            self.count += len(s)
+
+    def merge(self, other):
+        self.lo = min(self.lo, other.lo)
+        self.hi = max(self.hi, other.hi)
+        self.count += other.count
+
+
+class FixedHistogram:
+
+    def __init__(self, col, lo, hi, bins=20):
+        self.col = col
+        if lo == hi:
+            lo, hi = lo - 0.5, hi + 0.5
+        self.edges = np.linspace(lo, hi, bins + 1)
+        self.counts = np.zeros(bins, dtype=np.int64)
+
+    def update(self, chunk):
+        values = chunk[self.col].dropna().to_numpy(dtype=float)
+        self.counts += np.histogram(values, bins=self.edges)[0]
+
+    def merge(self, other):
+        self.counts += other.counts
+
+
+class BottomKSample:
+    # Uniform sample of k values: every value draws a random key and the k
+    # smallest keys are kept, which merges exactly across chunks
+
+    def __init__(self, col, k=SAMPLE_SIZE, seed=0):
+        self.col = col
+        self.k = k
+        self.rng = np.random.default_rng(seed)
+        self.keys = np.empty(0)
+        self.values = np.empty(0)
+
+    def update(self, chunk):
+        values = chunk[self.col].dropna().to_numpy(dtype=float)
+        self._combine(self.rng.random(len(values)), values)
+
+    def merge(self, other):
+        self._combine(other.keys, other.values)
+
+    def _combine(self, keys, values):
+        keys = np.concatenate([self.keys, keys])
+        values = np.concatenate([self.values, values])
+        if len(keys) > self.k:
+            keep = np.argpartition(keys, self.k - 1)[:self.k]
+            keys, values = keys[keep], values[keep]
+        self.keys, self.values = keys, values
+
+
+class StreamingMinMaxLine:
+    # Min and max per bucket of global row positions (a streamed min/max downsample)
+
+    def __init__(self, col, total_rows, n_buckets):
+        self.col = col
+        self.total = max(total_rows, 1)
+        self.n_buckets = max(n_buckets, 1)
+        self.offset = 0
+        self.parts = []
+
+    def update(self, chunk):
+        s = chunk[self.col].reset_index(drop=True)
+        pos = np.arange(self.offset, self.offset + len(s))
+        self.offset += len(s)
+        valid = s.notna().to_numpy()
+        if not valid.any():
+            return
+        values = s.to_numpy(dtype=float)[valid]
+        pos = pos[valid]
+        self.parts.append(self._reduce(pos, values))
+
+    def _reduce(self, pos, values):
+        frame = pd.DataFrame({"pos": pos, "value": values,
+                              "bucket": pos * self.n_buckets // self.total})
+        grouped = frame.groupby("bucket")["value"]
+        picks = np.unique(np.concatenate([grouped.idxmin().to_numpy(), grouped.idxmax().to_numpy()]))
+        return frame.loc[picks, ["pos", "value"]]
+
+    def result(self):
+        if not self.parts:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        merged = pd.concat(self.parts, ignore_index=True)
+        final = self._reduce(merged["pos"].to_numpy(), merged["value"].to_numpy())
+        final = final.sort_values("pos")
+        return final["pos"].to_numpy(), final["value"].to_numpy()
+
+
+class StreamingCorr:
+    # Pairwise-complete Pearson correlation from summed moments
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.n = np.zeros((k, k))
+        self.sx = np.zeros((k, k))
+        self.sxx = np.zeros((k, k))
+        self.sxy = np.zeros((k, k))
+
+    def update(self, chunk):
+        x = chunk[self.columns].to_numpy(dtype=float)
+        m = (~np.isnan(x)).astype(float)
+        x0 = np.nan_to_num(x)
+        self.n += m.T @ m
+        self.sx += x0.T @ m          # sum of column i where column j is present
+        self.sxx += (x0 * x0).T @ m
+        self.sxy += x0.T @ x0
+
+    def merge(self, other):
+        self.n += other.n
+        self.sx += other.sx
+        self.sxx += other.sxx
+        self.sxy += other.sxy
+
+    def result(self):
+        n, sx, sy = self.n, self.sx, self.sx.T
+        cov = n * self.sxy - sx * sy
+        var_x = n * self.sxx - sx * sx
+        var_y = (n * self.sxx - sx * sx).T
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = cov / np.sqrt(var_x * var_y)
+        np.fill_diagonal(corr, 1.0)
+        return pd.DataFrame(np.clip(corr, -1, 1), index=self.columns, columns=self.columns)
+
+
+# ==========================================================
+# Chart data (same spec format as data_engine.prepare_chart_data)
+# ==========================================================
+def _scan(dataset, columns, aggregators, progress, label):
+    for chunk in dataset.iter_chunks(columns=columns, progress=progress, label=label):
+        for a in aggregators:
+            a.update(chunk)
+
+
+def _box_stats(sample, lo, hi):
+    # Quartiles come from the sample; the true min / max stay visible
+    stats = cbook.boxplot_stats(sample.values)
+    for s in stats:
+        fliers = s["fliers"][:MAX_FLIERS]
+        extremes = [v for v in (lo, hi) if v < s["whislo"] or v > s["whishi"]]
+        s["fliers"] = np.concatenate([fliers, extremes])
+    return stats
+
+
+def prepare_chart_data_ooc(dataset, ctype, col, group, agg, width=DEFAULT_WIDTH, progress=None):
+    numeric = col in dataset.numeric_columns()
+    grouped_how = "mean" if agg == "mean" else "sum"
+
+    def grouped():
+        if agg != "count" and not pd.api.types.is_numeric_dtype(dataset.dtypes[col]):
+            raise ValueError(f"{col} is not numeric; use count to group it by {group}.")
+        a = GroupSumCount(col, group, agg)
+        _scan(dataset, [col, group], [a], progress, "Aggregating")
+        return a.result(agg)
+
+    def counts():
+        a = ValueCounter(col)
+        _scan(dataset, [col], [a], progress, "Counting")
+        return a.result()
+
+    if ctype == "pie":
+        if numeric and group:
+            return {"plot": "pie", "data": cap_categories(grouped(), MAX_PIE_CATEGORIES, grouped_how),
+                    "title": f"{agg.capitalize()} of {col} by {group}"}
+        return {"plot": "pie", "data": cap_categories(counts(), MAX_PIE_CATEGORIES),
+                "title": f"Distribution of {col}"}
+
+    if ctype == "bar":
+        if group:
+            data = cap_categories(grouped(), MAX_BAR_CATEGORIES, grouped_how)
+        else:
+            data = cap_categories(counts(), MAX_BAR_CATEGORIES)
+        return {"plot": "bar", "data": data, "title": f"Bar Chart - {col}"}
+
+    if ctype == "line":
+        if group:
+            data = grouped()
+            return {"plot": "line_grouped", "data": (data.index.astype(str), data.to_numpy()),
+                    "title": f"{agg.capitalize()} of {col} by {group}"}
+        if not dataset.rows:
+            raise ValueError("Row count unknown; open the file as Parquet to draw a line chart.")
+        a = StreamingMinMaxLine(col, dataset.rows, width // 2)
+        _scan(dataset, [col], [a], progress, "Downsampling")
+        return {"plot": "line", "data": a.result(), "title": f"Line Chart - {col}"}
+
+    if not numeric and ctype in ("hist", "box"):
+        raise ValueError(f"{col} is not numeric.")
+
+    if ctype == "hist":
+        bounds = MinMax(col)
+        _scan(dataset, [col], [bounds], progress, "Finding range")
+        if not bounds.count:
+            return None
+        hist = FixedHistogram(col, bounds.lo, bounds.hi, bins=20)
+        _scan(dataset, [col], [hist], progress, "Binning")
+        return {"plot": "hist_binned", "data": (hist.counts, hist.edges),
+                "title": f"Histogram - {col}"}
+
+    if ctype == "box":
+        bounds, sample = MinMax(col), BottomKSample(col)
+        _scan(dataset, [col], [bounds, sample], progress, "Sampling")
+        if not bounds.count:
+            return None
+        return {"plot": "box", "data": _box_stats(sample, bounds.lo, bounds.hi),
+                "title": f"Box Plot - {col} (approx.)"}
+
+    if ctype in ("heatmap", "pairs"):
+        num = dataset.numeric_columns()
+        if len(num) < 2:
+            return None
+        a = StreamingCorr(num)
+        _scan(dataset, num, [a], progress, "Correlating")
+        if ctype == "pairs":
+            return prepare_pairs(a.result())
+        return prepare_heatmap(a.result())
+
+    return None
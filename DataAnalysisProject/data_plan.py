@@ -0,0 +1,365 @@
+# ----------------------------------------------
+# data_plan.py
+# Cleaning steps and the lazy cleaning plan.
+# Each cleaning tool is a Step. In eager mode a step is applied on its
+# own (apply_step); in lazy mode steps are queued in a Plan that is
+# optimised (row filters pushed ahead of column transforms they do not
+# read) and executed fused: adjacent row filters and dedupe become one
+# mask and one take, adjacent column transforms share one shallow copy.
+# Dedupe runs on the cached row fingerprints of data_dedupe, filter
+# conditions on the compiled, mask-caching queries of data_query.
+# ----------------------------------------------
+
+import numpy as np
+import pandas as pd
+
+from data_dateindex import parse_dates
+from data_dedupe import duplicated
+from data_query import compile_query
+from data_dtypes import is_text, optimize_memory, strip_text
+from data_history import keep_rows, replace_columns, drop_columns, rename_columns
+
+ROWS = "rows"
+DEDUPE = "dedupe"
+COLUMNS = "columns"
+RENAME = "rename"
+GLOBAL = "global"
+
+
+# ==========================================================
+# Steps
+# ==========================================================
+class Step:
+    kind = None
+    op = None
+    title = ""
+
+    def to_dict(self):
+        # Constructor arguments are stored under their own names
+        return {"op": self.op, **vars(self)}
+
+    def reads(self, columns):
+        # Columns the step looks at; None means every column
+        return None
+
+    def writes(self):
+        return set()
+
+
+class DropEmptyRows(Step):
+    kind = ROWS
+    op = "remove_empty_rows"
+    title = "Remove Empty Rows"
+
+    def mask(self, df):
+        return df.notna().any(axis=1).to_numpy()
+
+
+class DropNA(Step):
+    kind = ROWS
+    op = "drop_rows_na"
+    title = "Drop Rows NA"
+
+    def mask(self, df):
+        return df.notna().all(axis=1).to_numpy()
+
+
+class Query(Step):
+    kind = ROWS
+    op = "filter_rows"
+    title = "Filter Rows"
+
+    def __init__(self, condition):
+        self.condition = condition
+
+    def reads(self, columns):
+        names = compile_query(self.condition).reads()
+        if names is None:
+            return None
+        return {str(c) for c in columns if str(c) in names}
+
+    def mask(self, df):
+        # Parsed once per condition; predicate masks are cached per frame
+        return compile_query(self.condition).mask(df)
+
+
+class DateRange(Step):
+    kind = ROWS
+    op = "date_range"
+    title = "Date Filter"
+
+    def __init__(self, column, start, end):
+        self.column = column
+        self.start = str(start)
+        self.end = str(end)
+
+    def reads(self, columns):
+        return {str(self.column)}
+
+    def mask(self, df):
+        dates = parse_dates(df[self.column])
+        keep = (dates >= pd.to_datetime(self.start)) & (dates <= pd.to_datetime(self.end))
+        return keep.to_numpy(dtype=bool)
+
+
+class DropDuplicates(Step):
+    kind = DEDUPE
+    op = "remove_duplicates"
+    title = "Remove Duplicates"
+
+    def __init__(self, subset=None, keep="first"):
+        # subset: key columns (None compares whole rows); keep: "first" / "last"
+        self.subset = list(subset) if subset else None
+        self.keep = keep
+
+    def mask(self, df, positions=None):
+        return ~duplicated(df, self.subset, self.keep, positions)
+
+
+class FillNA(Step):
+    kind = COLUMNS
+    op = "fill_na"
+    title = "Fill NA"
+
+    def __init__(self, value):
+        self.value = value
+
+    def columns(self, df):
+        filled = {}
+        for col in df.columns[df.isna().any()]:
+            s = df[col]
+            value = self.value
+            # Categorical columns only accept values that are already categories
+            if isinstance(s.dtype, pd.CategoricalDtype) and value not in s.cat.categories:
+                s = s.cat.add_categories([value])
+            elif isinstance(s.dtype, pd.StringDtype) and not isinstance(value, str):
+                value = str(value)
+            filled[col] = s.fillna(value)
+        return filled
+
+    def writes(self):
+        return None
+
+
+class TrimText(Step):
+    kind = COLUMNS
+    op = "trim_text"
+    title = "Trim Text"
+
+    def columns(self, df):
+        trimmed = {}
+        for col in df.columns:
+            s = df[col]
+            if is_text(s) or isinstance(s.dtype, pd.CategoricalDtype):
+                trimmed[col] = strip_text(s)
+        return trimmed
+
+    def writes(self):
+        return None
+
+
+class OptimizeMemory(Step):
+    # Categories for repetitive strings, Arrow strings for the rest,
+    # smallest numeric types
+    kind = COLUMNS
+    op = "optimize_memory"
+    title = "Optimize Memory"
+
+    def columns(self, df):
+        return optimize_memory(df)
+
+    def writes(self):
+        return None
+
+
+class ConvertType(Step):
+    kind = COLUMNS
+    op = "convert_type"
+    title = "Convert Type"
+
+    def __init__(self, column, dtype):
+        self.column = column
+        self.dtype = dtype
+
+    def columns(self, df):
+        if self.dtype == "datetime":
+            return {self.column: pd.to_datetime(df[self.column], errors="coerce")}
+        return {self.column: df[self.column].astype(self.dtype)}
+
+    def writes(self):
+        return {str(self.column)}
+
+
+class Rename(Step):
+    kind = RENAME
+    op = "rename_column"
+    title = "Rename Column"
+
+    def __init__(self, mapping):
+        self.mapping = dict(mapping)
+
+
+class DropEmptyColumns(Step):
+    # Needs every row to decide, so it cannot run on a preview prefix
+    kind = GLOBAL
+    op = "remove_empty_columns"
+    title = "Remove Empty Columns"
+
+    def empty(self, df):
+        return df.columns[df.isna().all()]
+
+
+STEP_TYPES = {cls.op: cls for cls in (
+    DropEmptyRows, DropNA, Query, DateRange, DropDuplicates, FillNA,
+    TrimText, OptimizeMemory, ConvertType, Rename, DropEmptyColumns,
+)}
+
+
+def step_from_dict(data):
+    params = dict(data)
+    op = params.pop("op", None)
+    if op not in STEP_TYPES:
+        raise ValueError(f"Unknown recipe step: {op!r}")
+    return STEP_TYPES[op](**params)
+
+
+# ==========================================================
+# Eager application: (new_df, history delta)
+# ==========================================================
+def apply_step(df, step):
+    if step.kind == ROWS:
+        return keep_rows(df, step.mask(df))
+    if step.kind == DEDUPE:
+        return keep_rows(df, step.mask(df))
+    if step.kind == COLUMNS:
+        return replace_columns(df, step.columns(df))
+    if step.kind == RENAME:
+        return rename_columns(df, step.mapping)
+    if isinstance(step, DropEmptyColumns):
+        return drop_columns(df, step.empty(df))
+    raise ValueError(f"Unknown step: {step!r}")
+
+
+# ==========================================================
+# Lazy plan
+# ==========================================================
+class PlanApplied:
+    # History delta: undo returns the frame the plan ran on, redo reruns it
+
+    def __init__(self, source, plan):
+        self.source = source
+        self.plan = plan.copy()
+        # The source is counted by History, once however many entries share it
+        self.source_nbytes = int(source.memory_usage(deep=True).sum())
+        self.nbytes = 0
+
+    def undo(self, df):
+        return self.source
+
+    def redo(self, df):
+        return self.plan.execute(self.source)
+
+
+class Plan:
+
+    def __init__(self, steps=None):
+        self.steps = list(steps or [])
+        self.version = 0  # moves on with every change, for views of the plan
+
+    def __len__(self):
+        return len(self.steps)
+
+    def copy(self):
+        return Plan(self.steps)
+
+    def add(self, step):
+        self.steps.append(step)
+        self.version += 1
+
+    def pop(self):
+        self.version += 1
+        return self.steps.pop() if self.steps else None
+
+    def clear(self):
+        self.steps.clear()
+        self.version += 1
+
+    def describe(self):
+        return [step.title for step in self.steps]
+
+    # ---------------- optimisation ----------------
+    def optimized(self, columns):
+        # Predicate pushdown: move each row filter ahead of column transforms
+        # that do not write any column it reads
+        steps = []
+        for step in self.steps:
+            pos = len(steps)
+            if step.kind == ROWS:
+                reads = step.reads(columns)
+                while pos > 0 and reads is not None and steps[pos - 1].kind == COLUMNS:
+                    writes = steps[pos - 1].writes()
+                    if writes is None or writes & reads:
+                        break
+                    pos -= 1
+            steps.insert(pos, step)
+
+        # Group adjacent steps of the same family into fused stages
+        stages = []
+        for step in steps:
+            family = ROWS if step.kind in (ROWS, DEDUPE) else step.kind
+            if stages and stages[-1][0] == family and family in (ROWS, COLUMNS):
+                stages[-1][1].append(step)
+            else:
+                stages.append((family, [step]))
+        return stages
+
+    # ---------------- execution ----------------
+    def execute(self, df, progress=None):
+        stages = self.optimized(df.columns)
+        for i, (family, steps) in enumerate(stages):
+            if progress:
+                progress(i / max(len(stages), 1), f"Running plan: {', '.join(s.title for s in steps)}")
+            if family == ROWS:
+                df = self._run_rows(df, steps)
+            elif family == COLUMNS:
+                df = self._run_columns(df, steps)
+            else:
+                df = apply_step(df, steps[0])[0]
+        return df
+
+    def preview(self, df, n=60):
+        # Row filters, dedupe (keep first) and column transforms only look at
+        # a row and the rows before it, so the head of the result can be
+        # computed from a prefix of the input
+        if any(step.kind == GLOBAL or (step.kind == DEDUPE and step.keep != "first")
+               for step in self.steps):
+            return self.execute(df).head(n)
+        k = max(n * 4, 1000)
+        while True:
+            out = self.execute(df.iloc[:k])
+            if len(out) >= n or k >= len(df):
+                return out.head(n)
+            k *= 4
+
+    def _run_rows(self, df, steps):
+        keep = np.ones(len(df), dtype=bool)
+        for step in steps:
+            if step.kind == DEDUPE:
+                # A key dedupe depends on which rows are still there, so it
+                # runs in order; the frame's fingerprints are hashed once
+                # and only indexed by the rows kept so far
+                positions = np.flatnonzero(keep)
+                keep[positions] = step.mask(df, positions)
+            else:
+                keep &= step.mask(df)
+        positions = np.flatnonzero(keep)
+        if len(positions) == len(df):
+            return df.reset_index(drop=True)
+        return df.take(positions).reset_index(drop=True)
+
+    def _run_columns(self, df, steps):
+        out = df.copy(deep=False)
+        for step in steps:
+            for col, values in step.columns(out).items():
+                out[col] = values
+        return out
@@ -0,0 +1,182 @@
+# ----------------------------------------------
+# data_profile.py
+# Per-column dataset profile kept up to date from history deltas.
+# The profile (nulls, dtype, memory, min/max, distinct count) is built
+# once at load. After that each op's delta says what changed: replaced
+# columns are recomputed, dropped / renamed columns are moved, and
+# removed rows are subtracted using only the removed rows, so the info
+# panel never rescans the whole frame.
+# ----------------------------------------------
+
+import weakref
+
+import pandas as pd
+
+from data_history import RowsRemoved, ColumnsChanged, ColumnsDropped, Renamed, Steps
+
+
+def _has_order(s):
+    return (pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s)) \
+        or pd.api.types.is_datetime64_any_dtype(s)
+
+
+def _min_max(s):
+    if not _has_order(s):
+        return None, None
+    return s.min(), s.max()
+
+
+class ColumnProfile:
+
+    def __init__(self, s):
+        self.dtype = s.dtype
+        self.nulls = int(s.isna().sum())
+        self.memory = int(s.memory_usage(deep=True, index=False))
+        self.min, self.max = _min_max(s)
+        # Counting distinct values is the costly part; done on first use
+        self._distinct = None
+
+    def copy(self):
+        out = ColumnProfile.__new__(ColumnProfile)
+        out.__dict__.update(self.__dict__)
+        return out
+
+    def distinct(self, s):
+        if self._distinct is None:
+            if isinstance(s.dtype, pd.CategoricalDtype):
+                # Upper bound; unused categories are not dropped on filtering
+                self._distinct = len(s.cat.categories)
+            else:
+                self._distinct = int(s.nunique())
+        return self._distinct
+
+
+class DatasetProfile:
+
+    def __init__(self, df=None):
+        self.rows = 0
+        self.columns = {}
+        # Columns whose stats must be recomputed from the frame
+        self.stale = set()
+        if df is not None:
+            self.rows = len(df)
+            self.columns = {col: ColumnProfile(df[col]) for col in df.columns}
+
+    @property
+    def nulls(self):
+        return sum(p.nulls for p in self.columns.values())
+
+    @property
+    def memory(self):
+        return sum(p.memory for p in self.columns.values())
+
+    def dtypes(self):
+        return {col: p.dtype for col, p in self.columns.items()}
+
+    def column(self, df, col):
+        # Profile of one column, finishing any work deferred by updates
+        p = self.columns[col]
+        if p.min is _STALE:
+            p.min, p.max = _min_max(df[col])
+        return p
+
+    def distinct(self, df, col):
+        return self.column(df, col).distinct(df[col])
+
+    # ---------------- incremental updates ----------------
+    def after(self, df, delta, undo=False):
+        # New profile for df, the frame delta.undo / delta.redo produced.
+        # The old profile is left as it is, so this can run in a job while
+        # the screen still shows the previous frame.
+        if not isinstance(delta, _INCREMENTAL):
+            # Row selections and whole plans keep their source frame, so the
+            # profiles on both sides are kept with them for undo / redo
+            known = _SNAPSHOTS.get(delta)
+            if known:
+                return known[0] if undo else known[1]
+            out = DatasetProfile(df)
+            if not undo:
+                _SNAPSHOTS[delta] = (self, out)
+            return out
+
+        out = DatasetProfile()
+        out.columns = {col: p.copy() for col, p in self.columns.items()}
+        out.stale = set(self.stale)
+        out.rows = self.rows
+        out._apply(delta, undo)
+        out.rows = len(df)
+        out._refresh(df)
+        return out
+
+    def _apply(self, delta, undo):
+        if isinstance(delta, Steps):
+            for d in (reversed(delta.deltas) if undo else delta.deltas):
+                self._apply(d, undo)
+        elif isinstance(delta, ColumnsChanged):
+            self.stale.update(delta.saved)
+        elif isinstance(delta, ColumnsDropped):
+            if undo:
+                self.stale.update(delta.saved)
+            else:
+                for col in delta.saved:
+                    self.columns.pop(col, None)
+                    self.stale.discard(col)
+        elif isinstance(delta, Renamed):
+            mapping = delta.mapping
+            if undo:
+                mapping = {new: old for old, new in mapping.items()}
+            self.columns = {mapping.get(col, col): p for col, p in self.columns.items()}
+            self.stale = {mapping.get(col, col) for col in self.stale}
+        elif isinstance(delta, RowsRemoved):
+            self._rows_changed(delta.removed, -1 if not undo else 1)
+        else:
+            self.columns = {}
+            self.stale = {_ALL}
+
+    def _rows_changed(self, rows, sign):
+        # sign -1: rows were removed, +1: rows came back (undo)
+        before = self.rows
+        after = before + sign * len(rows)
+        for col, p in self.columns.items():
+            if col in self.stale or col not in rows:
+                continue
+            s = rows[col]
+            p.nulls += sign * int(s.isna().sum())
+            p._distinct = None
+            if before:
+                p.memory = int(p.memory * after / before)
+            if p.min is _STALE or p.min is None:
+                continue
+            lo, hi = _min_max(s)
+            if pd.isna(lo):
+                continue
+            if sign > 0:
+                p.min = lo if pd.isna(p.min) else min(p.min, lo)
+                p.max = hi if pd.isna(p.max) else max(p.max, hi)
+            elif lo <= p.min or hi >= p.max:
+                # An extreme may have gone; recompute when next asked
+                p.min = p.max = _STALE
+        self.rows = after
+
+    def _refresh(self, df):
+        if _ALL in self.stale:
+            self.columns = {col: ColumnProfile(df[col]) for col in df.columns}
+        else:
+            for col in self.stale:
+                if col in df.columns:
+                    self.columns[col] = ColumnProfile(df[col])
+            # Keep the frame's column order
+            self.columns = {col: self.columns.get(col) or ColumnProfile(df[col])
+                            for col in df.columns}
+        self.stale = set()
+
+
+class _Stale:
+    def __repr__(self):
+        return "<stale>"
+
+
+_STALE = _Stale()
+_ALL = object()
+_INCREMENTAL = (RowsRemoved, ColumnsChanged, ColumnsDropped, Renamed, Steps)
+_SNAPSHOTS = weakref.WeakKeyDictionary()
@@ -0,0 +1,267 @@
+# ----------------------------------------------
+# data_query.py
+# Compiled row filters for Filter Rows.
+# A condition is parsed once (cached by its text) into an and / or / not
+# tree of predicates. Each predicate's boolean mask is cached per frame,
+# so "Age > 30 and City == 'Paris'" after "Age > 30" only evaluates the
+# new half, and masks follow the rows through later filters and undo.
+# Predicates on plain numeric columns run through numexpr when it is
+# installed (or as one compiled numpy expression); anything else is
+# handed to pandas' own eval.
+# ----------------------------------------------
+
+import ast
+import io
+import re
+import tokenize
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from data_history import ColumnsChanged, ColumnsDropped, FrameCache, RowsRemoved, RowsSelected
+
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
+NUMEXPR_MIN_ROWS = 100_000  # below this numexpr's start-up cost outweighs its speed
+MAX_MASKS = 8  # predicate masks cached per frame
+QUERY_CACHE = 128  # compiled conditions
+
+_masks = FrameCache(MAX_MASKS)  # {predicate text: (columns read, mask)} per frame
+
+_COMPARE = (ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE)
+_ARITHMETIC = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod, ast.Pow)
+_BOOLEAN_WORDS = {"&": "and", "|": "or", "~": "not"}
+
+
+# ==========================================================
+# Parsing
+# ==========================================================
+def _prepare(condition):
+    # Backquoted column names become identifiers; & | ~ become and / or /
+    # not, which pandas' query gives the same precedence
+    quoted = {}
+
+    def name(match):
+        key = f"__col{len(quoted)}"
+        quoted[key] = match.group(1)
+        return key
+    text = re.sub(r"`([^`]+)`", name, condition)
+    tokens = []
+    for tok in tokenize.generate_tokens(io.StringIO(text).readline):
+        if tok.type == tokenize.OP and tok.string in _BOOLEAN_WORDS:
+            tokens.append((tokenize.NAME, _BOOLEAN_WORDS[tok.string]))
+        else:
+            tokens.append((tok.type, tok.string))
+    return tokenize.untokenize(tokens), quoted
+
+
+class Predicate:
+
+    def __init__(self, node, quoted):
+        self.node = node
+        names = {n.id for n in ast.walk(node) if isinstance(n, ast.Name)}
+        self.names = {quoted.get(n, n) for n in names}
+        # One pass, so restoring __col1 cannot touch __col11
+        self.text = re.sub(r"\b__col\d+\b", lambda m: _quote(quoted, m.group(0)), ast.unparse(node))
+        self._quoted = quoted
+        self._numeric = _is_numeric(node)
+        self._arithmetic = any(isinstance(n, (ast.BinOp, ast.UnaryOp)) for n in ast.walk(node))
+        self._source = self._code = None
+
+    def columns(self, df):
+        return {str(c) for c in df.columns} & self.names
+
+    def mask(self, df):
+        cached = _masks.get(df, self.text)
+        if cached is not None:
+            return cached[1]
+        arrays = self._arrays(df) if self._numeric else None
+        if arrays is not None:
+            result = self._evaluate(arrays, len(df))
+        else:
+            result = df.eval(self.text)
+            if isinstance(result, pd.Series) and pd.api.types.is_bool_dtype(result):
+                result = result.fillna(False).to_numpy(dtype=bool)
+        if not isinstance(result, np.ndarray) or result.dtype != bool or result.shape != (len(df),):
+            raise ValueError("Query must evaluate to True/False for each row.")
+        _masks.put(df, self.text, (self.columns(df), result))
+        return result
+
+    def _arrays(self, df):
+        # {identifier: ndarray} when every name is a plain numeric column
+        lookup = {str(c): c for c in df.columns}
+        arrays = {}
+        for n in ast.walk(self.node):
+            if not isinstance(n, ast.Name):
+                continue
+            col = lookup.get(self._quoted.get(n.id, n.id))
+            if col is None:
+                return None
+            s = df[col]
+            if not isinstance(s, pd.Series) or not isinstance(s.dtype, np.dtype) \
+                    or s.dtype.kind not in "biuf":
+                return None
+            values = s.to_numpy()
+            if self._arithmetic:
+                # Loaded columns are downcast (int8, float32...); arithmetic
+                # on them must not wrap around
+                values = _widen(values)
+            arrays[_identifier(n.id)] = values
+        return arrays
+
+    def _evaluate(self, arrays, rows):
+        if self._code is None:
+            node = _Rename().visit(ast.parse(ast.unparse(self.node), mode="eval"))
+            self._source = ast.unparse(node)
+            self._code = compile(node, "<query>", "eval")
+        if numexpr is not None and rows >= NUMEXPR_MIN_ROWS:
+            return numexpr.evaluate(self._source, local_dict=arrays)
+        with np.errstate(all="ignore"):
+            return np.asarray(eval(self._code, {"__builtins__": {}}, arrays))
+
+
+def _widen(values):
+    kind = values.dtype.kind
+    if kind == "i" or kind == "u" and values.dtype.itemsize < 8:
+        return values.astype(np.int64, copy=False)
+    if kind == "f":
+        return values.astype(np.float64, copy=False)
+    return values
+
+
+def _quote(quoted, key):
+    return f"`{quoted[key]}`" if key in quoted else key
+
+
+def _identifier(name):
+    # Column names are not always valid numexpr identifiers
+    return f"_q_{name.encode().hex()}"
+
+
+class _Rename(ast.NodeTransformer):
+
+    def visit_Name(self, node):
+        return ast.copy_location(ast.Name(id=_identifier(node.id), ctx=ast.Load()), node)
+
+
+def _is_numeric(node):
+    # Comparisons and arithmetic over names and numbers only
+    for n in ast.walk(node):
+        if isinstance(n, ast.Compare):
+            if not all(isinstance(op, _COMPARE) for op in n.ops):
+                return False
+        elif isinstance(n, ast.BinOp):
+            if not isinstance(n.op, _ARITHMETIC):
+                return False
+        elif isinstance(n, ast.UnaryOp):
+            if not isinstance(n.op, (ast.USub, ast.UAdd)):
+                return False
+        elif isinstance(n, ast.Constant):
+            if not isinstance(n.value, (bool, int, float)):
+                return False
+        elif not isinstance(n, (ast.Name, ast.expr_context, ast.cmpop, ast.operator, ast.unaryop)):
+            return False
+    return True
+
+
+class CompiledQuery:
+
+    def __init__(self, condition):
+        self.condition = condition
+        self.predicates = {}
+        try:
+            text, quoted = _prepare(condition)
+            tree = ast.parse(text.strip(), mode="eval").body
+        except (SyntaxError, tokenize.TokenError):
+            # Not Python syntax (e.g. @variables): pandas reports the error
+            self.tree = None
+            return
+        self.tree = self._build(tree, quoted)
+
+    def _build(self, node, quoted):
+        if isinstance(node, ast.BoolOp):
+            kind = "and" if isinstance(node.op, ast.And) else "or"
+            return (kind, [self._build(v, quoted) for v in node.values])
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            return ("not", self._build(node.operand, quoted))
+        if isinstance(node, ast.Compare) and len(node.ops) > 1:
+            # a < b < c is (a < b) and (b < c)
+            parts, left = [], node.left
+            for op, right in zip(node.ops, node.comparators):
+                parts.append(self._build(ast.Compare(left=left, ops=[op], comparators=[right]), quoted))
+                left = right
+            return ("and", parts)
+        predicate = Predicate(node, quoted)
+        predicate = self.predicates.setdefault(predicate.text, predicate)
+        return ("leaf", predicate)
+
+    def mask(self, df):
+        if self.tree is None:
+            return _pandas_mask(df, self.condition)
+        return self._mask(self.tree, df)
+
+    def _mask(self, tree, df):
+        kind, value = tree
+        if kind == "leaf":
+            return value.mask(df)
+        if kind == "not":
+            return ~self._mask(value, df)
+        out = self._mask(value[0], df).copy()
+        for child in value[1:]:
+            if kind == "and":
+                out &= self._mask(child, df)
+            else:
+                out |= self._mask(child, df)
+        return out
+
+    def reads(self):
+        # Names the condition mentions, or None when it could not be parsed
+        if self.tree is None:
+            return None
+        return set().union(*(p.names for p in self.predicates.values()))
+
+
+def _pandas_mask(df, condition):
+    result = df.eval(condition)
+    if not isinstance(result, pd.Series) or not pd.api.types.is_bool_dtype(result):
+        raise ValueError("Query must evaluate to True/False for each row.")
+    return result.fillna(False).to_numpy(dtype=bool)
+
+
+@lru_cache(maxsize=QUERY_CACHE)
+def compile_query(condition):
+    return CompiledQuery(condition)
+
+
+def evaluate(df, condition):
+    return compile_query(condition).mask(df)
+
+
+# ==========================================================
+# Masks across deltas
+# ==========================================================
+def carry_masks(old, new, delta, undo=False):
+    # Masks of predicates that do not read a changed column follow the
+    # rows into `new`; undo returns to frames that kept their own masks
+    if isinstance(delta, RowsSelected):
+        if undo:
+            return
+        old = delta.source
+    if old is None or new is None or old is new or undo and isinstance(delta, RowsRemoved):
+        return
+    if isinstance(delta, RowsRemoved):
+        rows, stale = delta.keep, set()
+    elif isinstance(delta, RowsSelected):
+        rows, stale = delta.positions, {str(c) for c in delta.replaced}
+    elif isinstance(delta, (ColumnsChanged, ColumnsDropped)):
+        rows, stale = None, {str(c) for c in delta.saved}
+    else:
+        return
+    for text, (columns, mask) in _masks.items(old):
+        if columns & stale:
+            continue
+        _masks.put(new, text, (columns, mask if rows is None else mask[rows]))
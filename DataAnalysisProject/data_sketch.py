@@ -0,0 +1,331 @@
+# ----------------------------------------------
+# data_sketch.py
+# Sample-based column profiler behind Auto Recommend.
+# Columns are judged on a fixed-size uniform row sample (reservoir), so
+# ranking them costs the same on 50M rows as on 50k. Distinct counts
+# come from HyperLogLog sketches when the rows are streamed anyway
+# (out-of-core), otherwise they are extrapolated from the sample.
+# ----------------------------------------------
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from data_downsample import MAX_BAR_CATEGORIES, MAX_PIE_CATEGORIES
+
+SAMPLE_SIZE = 20_000
+HLL_PRECISION = 12
+MIN_CONTINUOUS = 20  # fewer distinct values than this reads as categorical
+DATE_SEPARATORS = r"[-/.:\s]"  # text without one (IDs, years) is never a date
+
+
+def hash_values(values):
+    return pd.util.hash_pandas_object(pd.Series(values), index=False).to_numpy()
+
+
+# ==========================================================
+# Sketches
+# ==========================================================
+class HyperLogLog:
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes):
+        h = np.asarray(hashes, dtype=np.uint64)
+        if not len(h):
+            return
+        p = self.precision
+        idx = (h >> np.uint64(64 - p)).astype(np.intp)
+        rest = h & np.uint64((1 << (64 - p)) - 1)
+        # Rank = position of the first 1 bit in the remaining 64 - p bits.
+        # They fit a float64 mantissa, so frexp's exponent is the bit length.
+        bits = np.frexp(rest.astype(np.float64))[1]
+        rank = (64 - p + 1 - bits).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+
+    def add(self, values):
+        self.add_hashes(hash_values(values))
+
+    def merge(self, other):
+        out = HyperLogLog(self.precision)
+        out.registers = np.maximum(self.registers, other.registers)
+        return out
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(int)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            estimate = m * math.log(m / zeros)
+        return estimate
+
+
+class Reservoir:
+    # Uniform sample of k rows from a stream of chunks (algorithm R, one
+    # vectorised draw per chunk). Sampled rows keep their stream position.
+
+    def __init__(self, k=SAMPLE_SIZE, seed=0):
+        self.k = k
+        self.seen = 0
+        self.rng = np.random.default_rng(seed)
+        self.sample = None
+        self.positions = np.empty(0, dtype=np.int64)
+
+    def update(self, chunk):
+        n = len(chunk)
+        offsets = self.seen + np.arange(n, dtype=np.int64)
+        self.seen += n
+        chunk = chunk.reset_index(drop=True)
+
+        fill = min(max(self.k - len(self.positions), 0), n)
+        if fill:
+            head = chunk.iloc[:fill]
+            self.sample = head if self.sample is None else pd.concat([self.sample, head], ignore_index=True)
+            self.positions = np.concatenate([self.positions, offsets[:fill]])
+        if fill == n:
+            return
+
+        # Row t replaces slot j ~ U[0, t] when j < k; for a slot hit more
+        # than once in this chunk only the last replacement survives
+        rows = np.arange(fill, n)
+        slots = self.rng.integers(0, offsets[rows] + 1)
+        hit = slots < self.k
+        rows, slots = rows[hit], slots[hit]
+        if not len(rows):
+            return
+        last = len(slots) - 1 - np.unique(slots[::-1], return_index=True)[1]
+        rows, slots = rows[last], slots[last]
+
+        keep = np.ones(len(self.positions), dtype=bool)
+        keep[slots] = False
+        # Slots are interchangeable, so replaced rows simply move to the end
+        self.sample = pd.concat([self.sample[keep], chunk.take(rows)], ignore_index=True)
+        self.positions = np.concatenate([self.positions[keep], offsets[rows]])
+
+
+def sample_frame(df, k=SAMPLE_SIZE, seed=0):
+    # In-memory frames know their length: a reservoir over them is just
+    # k positions drawn without replacement
+    if len(df) <= k:
+        return df.reset_index(drop=True), np.arange(len(df))
+    positions = np.sort(np.random.default_rng(seed).choice(len(df), k, replace=False))
+    return df.take(positions).reset_index(drop=True), positions
+
+
+# ==========================================================
+# Column sketches
+# ==========================================================
+class ColumnSketch:
+
+    def __init__(self, values, positions, total_rows, sketch=None):
+        values = values.reset_index(drop=True)
+        valid = values.notna().to_numpy()
+        present = values[valid]
+        n = len(values)
+        self.dtype = values.dtype
+        self.fill = len(present) / n if n else 0.0
+        self.kind = _kind(values, present)
+        if sketch is not None:
+            self.distinct = min(sketch.count(), total_rows)
+        else:
+            seen = len(np.unique(hash_values(present)))
+            self.distinct = _extrapolate(seen, len(present), total_rows * self.fill)
+
+        counts = present.value_counts(sort=False).to_numpy() if len(present) else np.empty(0)
+        self.balance = _balance(counts)
+
+        self.sequential = False
+        if self.kind == "numeric" and len(present) > 2:
+            # IDs and row counters rise with the row position
+            x = present.to_numpy(dtype=float)
+            pos = np.asarray(positions)[valid]
+            if np.ptp(x) > 0:
+                self.sequential = np.corrcoef(pos, x)[0, 1] > 0.99 \
+                    and self.distinct > 0.9 * total_rows * self.fill
+
+
+def _kind(values, present):
+    if pd.api.types.is_bool_dtype(values):
+        return "categorical"
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return "time"
+    if pd.api.types.is_numeric_dtype(values):
+        return "numeric"
+    if len(present) and not isinstance(values.dtype, pd.CategoricalDtype):
+        # Text that parses as dates is a time column stored as strings;
+        # numbers stored as text (zero-padded IDs) parse as years, so
+        # they are ruled out first
+        sample = present.head(200).astype(str)
+        if pd.to_numeric(sample, errors="coerce").notna().mean() > 0.9:
+            return "categorical"
+        parsed = pd.to_datetime(sample, errors="coerce", format="mixed")
+        dated = parsed.notna() & sample.str.contains(DATE_SEPARATORS)
+        if dated.mean() > 0.9:
+            return "time"
+    return "categorical"
+
+
+def _extrapolate(seen, sample_rows, total_rows):
+    # Number of equally common values D for which a sample of this size
+    # would show `seen` distinct ones: seen = D * (1 - exp(-n / D))
+    if sample_rows == 0 or seen == 0:
+        return 0
+    if total_rows <= sample_rows or seen < 2:
+        return seen
+    if seen >= sample_rows:
+        return total_rows
+    lo, hi = float(seen), float(total_rows)
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        if mid * -math.expm1(-sample_rows / mid) < seen:
+            lo = mid
+        else:
+            hi = mid
+    return min(hi, total_rows)
+
+
+def _balance(counts):
+    # Normalised entropy: 1 when categories are equally common
+    counts = counts[counts > 0]
+    if len(counts) < 2:
+        return 0.0
+    p = counts / counts.sum()
+    return float(-(p * np.log(p)).sum() / np.log(len(counts)))
+
+
+# ==========================================================
+# Recommendations
+# ==========================================================
+class SampleProfile:
+
+    def __init__(self, sample, positions, total_rows, sketches=None):
+        self.rows = total_rows
+        self.sample_rows = len(sample)
+        sketches = sketches or {}
+        self.columns = {col: ColumnSketch(sample[col], positions, total_rows, sketches.get(col))
+                        for col in sample.columns}
+
+    @classmethod
+    def from_frame(cls, df, k=SAMPLE_SIZE, seed=0):
+        sample, positions = sample_frame(df, k, seed)
+        return cls(sample, positions, len(df))
+
+    @classmethod
+    def from_chunks(cls, chunks, k=SAMPLE_SIZE, seed=0):
+        # One streaming pass: reservoir sample plus a HyperLogLog per column
+        reservoir = Reservoir(k, seed)
+        sketches = {}
+        for chunk in chunks:
+            reservoir.update(chunk)
+            for col in chunk.columns:
+                sketches.setdefault(col, HyperLogLog()).add(chunk[col].dropna())
+        if reservoir.sample is None:
+            return None
+        return cls(reservoir.sample, reservoir.positions, reservoir.seen, sketches)
+
+    @classmethod
+    def from_pieces(cls, pieces, total_rows=None):
+        # Slices of a larger file, as (first row, frame): distinct counts
+        # are extrapolated to total_rows instead of sketched in a full pass
+        pieces = [(start, chunk) for start, chunk in pieces if len(chunk)]
+        if not pieces:
+            return None
+        sample = pd.concat([chunk for _, chunk in pieces], ignore_index=True)
+        positions = np.concatenate([start + np.arange(len(chunk)) for start, chunk in pieces])
+        return cls(sample, positions, max(total_rows or 0, len(sample)))
+
+    # ---------------- per-role scores ----------------
+    def category_score(self, col, max_categories):
+        sk = self.columns[col]
+        if sk.kind not in ("categorical", "numeric") or sk.distinct < 1.5:
+            return 0.0
+        score = sk.fill * (0.5 + 0.5 * sk.balance)
+        if sk.distinct > max_categories:
+            # Still drawable with an "Other" bucket, but less readable
+            score *= max_categories / sk.distinct / 2
+        if sk.kind == "numeric":
+            score *= 0.6
+        return score
+
+    def continuous_score(self, col):
+        sk = self.columns[col]
+        if sk.kind != "numeric" or sk.distinct < MIN_CONTINUOUS:
+            return 0.0
+        score = sk.fill * min(1.0, math.log10(sk.distinct) / 3)
+        if sk.sequential:
+            score *= 0.1
+        return score
+
+    def time_score(self, col):
+        sk = self.columns[col]
+        if sk.kind != "time" or sk.distinct < 2:
+            return 0.0
+        score = sk.fill * min(1.0, math.log10(sk.distinct + 1) / 2)
+        if sk.dtype.kind != "M":
+            score *= 0.8  # needs parsing on every chart
+        return score
+
+    def rank(self, role, max_categories=MAX_BAR_CATEGORIES):
+        if role == "category":
+            score = lambda c: self.category_score(c, max_categories)
+        elif role == "continuous":
+            score = self.continuous_score
+        else:
+            score = self.time_score
+        ranked = sorted(((score(c), c) for c in self.columns), key=lambda t: -t[0])
+        return [c for s, c in ranked if s > 0]
+
+    def recommend(self, chart_type):
+        # dict(column, group, agg, message) or None
+        numbers = self.rank("continuous")
+        best_num = numbers[0] if numbers else None
+
+        if chart_type == "pie":
+            cats = self.rank("category", MAX_PIE_CATEGORIES)
+            if cats:
+                return {"column": cats[0], "group": None, "agg": "count",
+                        "message": f"Pie → {cats[0]} ({self._distinct(cats[0])} categories)"}
+            return None
+
+        if chart_type == "bar":
+            cats = self.rank("category", MAX_BAR_CATEGORIES)
+            if cats and best_num:
+                return {"column": best_num, "group": cats[0], "agg": "mean",
+                        "message": f"Bar → {cats[0]} vs {best_num}"}
+            if cats:
+                return {"column": cats[0], "group": None, "agg": "count",
+                        "message": f"Bar → counts of {cats[0]}"}
+            return None
+
+        if chart_type == "line":
+            times = self.rank("time")
+            if best_num and times:
+                return {"column": best_num, "group": times[0], "agg": "sum",
+                        "message": f"Line → {best_num} over {times[0]}"}
+            if best_num:
+                return {"column": best_num, "group": None, "agg": "sum",
+                        "message": f"Line → {best_num}"}
+            return None
+
+        if chart_type in ("hist", "box"):
+            if best_num:
+                name = "Histogram" if chart_type == "hist" else "Box"
+                return {"column": best_num, "group": None, "agg": "count",
+                        "message": f"{name} → {best_num}"}
+            return None
+
+        if chart_type in ("heatmap", "pairs"):
+            if len(numbers) >= 2:
+                return {"column": None, "group": None, "agg": None,
+                        "message": f"Heatmap → correlations of {len(numbers)} numeric columns"}
+            return None
+        return None
+
+    def _distinct(self, col):
+        d = self.columns[col].distinct
+        return f"~{d:,.0f}" if self.sample_rows < self.rows else f"{d:,.0f}"
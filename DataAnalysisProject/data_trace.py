@@ -0,0 +1,273 @@
+# ----------------------------------------------
+# data_trace.py
+# Per-action instrumentation for the Data Analysis screen.
+# An action (one button press) records wall time, CPU time, the rise in
+# peak traced memory and the frame's rows / columns before and after.
+# Phases inside it (worker compute, Tk apply, chart draw, canvas embed)
+# are timed on whichever thread runs them, so a slow action shows where
+# its time went. Finished actions are kept in a bounded log that can be
+# saved as JSON or as a Chrome trace (chrome://tracing, Perfetto).
+# ----------------------------------------------
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+from data_dtypes import format_bytes
+
+TRACE_LIMIT = 500
+
+
+class Span:
+
+    def __init__(self, name, depth=0):
+        self.name = name
+        self.depth = depth
+        self.thread = threading.current_thread().name
+        self.tid = threading.get_ident()
+        self.start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.seconds = None
+        self.cpu_seconds = None
+        self.peak_bytes = None
+        self.status = "ok"
+        self._base = self._peak = None
+
+    def close(self, status="ok"):
+        self.seconds = time.perf_counter() - self.start
+        self.cpu_seconds = time.process_time() - self.cpu_start
+        self.status = status
+        if self._base is not None:
+            self.peak_bytes = self._peak - self._base
+
+    def as_dict(self, origin):
+        return {"name": self.name, "thread": self.thread, "depth": self.depth,
+                "start": self.start - origin, "seconds": self.seconds,
+                "cpu_seconds": self.cpu_seconds, "peak_bytes": self.peak_bytes,
+                "status": self.status}
+
+
+class Action(Span):
+    # Started and finished on the Tk thread; phases may run on any thread
+
+    def __init__(self, tracer, name, size):
+        super().__init__(name)
+        self.tracer = tracer
+        self.before = size
+        self.after = None
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        tracer = self.tracer
+        stack = tracer._stack()
+        depth = sum(1 for action, is_phase in stack if action is self and is_phase)
+        span = Span(name, depth)
+        tracer._open(span)
+        stack.append((self, True))
+        status = "ok"
+        try:
+            yield span
+        except BaseException as e:
+            status = type(e).__name__
+            raise
+        finally:
+            stack.pop()
+            tracer._close(span, status)
+            with tracer._lock:
+                self.phases.append(span)
+
+    def finish(self, status="ok"):
+        self.after = self.tracer._size()
+        self.tracer._close(self, status)
+        self.tracer._record(self)
+
+    def __enter__(self):
+        # Synchronous actions: the whole body is the action
+        self.tracer._stack().append((self, False))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer._stack().pop()
+        self.finish("ok" if exc_type is None else exc_type.__name__)
+        return False
+
+    def as_dict(self, origin):
+        out = super().as_dict(origin)
+        del out["depth"]
+        rows, cols = self.before or (None, None)
+        out.update(rows_before=rows, columns_before=cols)
+        rows, cols = self.after or (None, None)
+        out.update(rows_after=rows, columns_after=cols)
+        out["phases"] = [p.as_dict(origin) for p in sorted(self.phases, key=lambda p: p.start)]
+        return out
+
+
+# ==========================================================
+# Tracer
+# ==========================================================
+class Tracer:
+
+    def __init__(self, size=None, on_record=None, limit=TRACE_LIMIT):
+        # size() -> (rows, columns) of the current data, or None
+        self._size = size or (lambda: None)
+        self.on_record = on_record
+        self.actions = deque(maxlen=limit)
+        self.origin = time.perf_counter()
+        self.started = datetime.now()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._live = []
+        self._owns_tracing = False
+
+    # ---------------- memory ----------------
+    @property
+    def track_memory(self):
+        return tracemalloc.is_tracing()
+
+    def set_track_memory(self, enabled):
+        # tracemalloc slows allocation-heavy code, so it is opt-in
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracing = True
+        elif not enabled and self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+    def _sample(self):
+        # Fold the peak since the last sample into every open span, then
+        # restart the peak, so nested and concurrent spans each see theirs
+        current, peak = tracemalloc.get_traced_memory()
+        for span in self._live:
+            if span._base is not None:
+                span._peak = max(span._peak, peak)
+        tracemalloc.reset_peak()
+        return current
+
+    def _open(self, span):
+        with self._lock:
+            if tracemalloc.is_tracing():
+                current = self._sample()
+                span._base = span._peak = current
+            self._live.append(span)
+
+    def _close(self, span, status):
+        with self._lock:
+            if tracemalloc.is_tracing():
+                self._sample()
+            else:
+                span._base = None
+            self._live.remove(span)
+        span.close(status)
+
+    # ---------------- actions ----------------
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def action(self, name):
+        action = Action(self, name, self._size())
+        self._open(action)
+        return action
+
+    def phase(self, name):
+        # A phase of the action running on this thread; no-op outside one
+        stack = self._stack()
+        return stack[-1][0].phase(name) if stack else nullcontext()
+
+    @contextmanager
+    def within(self, action):
+        # Phases opened on this thread belong to `action` for the duration
+        stack = self._stack()
+        stack.append((action, False))
+        try:
+            yield action
+        finally:
+            stack.pop()
+
+    def discard(self, action):
+        with self._lock:
+            if action in self._live:
+                self._live.remove(action)
+
+    def _record(self, action):
+        with self._lock:
+            self.actions.append(action)
+        if self.on_record:
+            self.on_record(action)
+
+    def clear(self):
+        with self._lock:
+            self.actions.clear()
+
+    def recent(self, n=None):
+        # Newest first
+        with self._lock:
+            actions = list(self.actions)
+        actions.reverse()
+        return actions[:n] if n else actions
+
+    # ---------------- export ----------------
+    def to_json(self):
+        actions = self.recent()[::-1]
+        return {"started": self.started.isoformat(timespec="seconds"),
+                "pid": os.getpid(),
+                "actions": [a.as_dict(self.origin) for a in actions]}
+
+    def to_chrome_trace(self):
+        # Trace Event Format: complete ("X") events in microseconds. Actions
+        # get their own track; phases sit on the thread that ran them.
+        pid = os.getpid()
+        us = lambda seconds: round(seconds * 1e6, 1)
+        events = [{"ph": "M", "name": "thread_name", "pid": pid, "tid": 0,
+                   "args": {"name": "Actions"}}]
+        threads = {}
+        for action in self.recent()[::-1]:
+            args = {"cpu_ms": us(action.cpu_seconds) / 1000, "status": action.status}
+            if action.peak_bytes is not None:
+                args["peak_bytes"] = action.peak_bytes
+            if action.before:
+                args["rows_before"], args["columns_before"] = action.before
+            if action.after:
+                args["rows_after"], args["columns_after"] = action.after
+            events.append({"ph": "X", "name": action.name, "cat": "action", "pid": pid, "tid": 0,
+                           "ts": us(action.start - self.origin), "dur": us(action.seconds),
+                           "args": args})
+            for span in action.phases:
+                threads[span.tid] = span.thread
+                args = {"action": action.name, "cpu_ms": us(span.cpu_seconds) / 1000,
+                        "status": span.status}
+                if span.peak_bytes is not None:
+                    args["peak_bytes"] = span.peak_bytes
+                events.append({"ph": "X", "name": span.name, "cat": "phase", "pid": pid,
+                               "tid": span.tid, "ts": us(span.start - self.origin),
+                               "dur": us(span.seconds), "args": args})
+        events[1:1] = [{"ph": "M", "name": "thread_name", "pid": pid, "tid": tid,
+                        "args": {"name": name}} for tid, name in threads.items()]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save(self, path, chrome=False):
+        data = self.to_chrome_trace() if chrome else self.to_json()
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(data, handle, indent=None if chrome else 2)
+
+
+def format_action(action):
+    # One line per action for the stats panel, phases indented below
+    size = lambda s: f"{s[0]:,}x{s[1]}" if s and s[0] is not None else "-"
+    mem = lambda b: format_bytes(b) if b is not None else "-"
+    lines = [f"{action.name:<28}{action.seconds:8.3f}s  cpu {action.cpu_seconds:7.3f}s  "
+             f"mem {mem(action.peak_bytes):>9}  {size(action.before)} -> {size(action.after)}"
+             + ("" if action.status == "ok" else f"  [{action.status}]")]
+    for span in sorted(action.phases, key=lambda p: p.start):
+        indent = "  " * (span.depth + 1)
+        lines.append(f"{indent}{span.name:<{26 - 2 * span.depth}}{span.seconds:8.3f}s  "
+                     f"cpu {span.cpu_seconds:7.3f}s  mem {mem(span.peak_bytes):>9}  ({span.thread})")
+    return "\n".join(lines)
@@ -3,26 +3,39 @@
 # Polished UI + Date Filter Panel + Auto Recommend
 # ----------------------------------------------
 
+import os
+import time
+
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import filedialog, simpledialog, messagebox
 import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import seaborn as sns
-
-from ui_theme import CARD_BG, TEXTBOX_BG, PRIMARY, PRIMARY_HOVER, TEXT_COLOR, apply_theme
-
-apply_theme()
 
-# Safe matplotlib style
-try:
-    plt.style.use("seaborn-v0_8-darkgrid")
-except:
-    try:
-        plt.style.use("seaborn-darkgrid")
-    except:
-        plt.style.use("ggplot")
+from data_aggregate import AggregateCache
+from data_cache import DatasetCache
+from data_chart import ChartSurface, draw_chart, open_chart_popup
+from data_downsample import DEFAULT_WIDTH
+from data_dtypes import format_bytes, memory_bytes
+from data_export import export_format, export_frame
+from data_grid import PagedGrid
+from data_engine import Recipe, load_dataset, prepare_chart_data
+from data_loader import excel_sheets, excel_variant
+from data_dateindex import DateIndex
+from data_dedupe import KEEP_OPTIONS, carry_fingerprints, find_duplicates
+from data_history import History, apply_delta, select_rows
+from data_jobs import JobRunner
+from data_outofcore import OutOfCoreDataset, prepare_chart_data_ooc
+from data_profile import DatasetProfile
+from data_query import carry_masks
+from data_sketch import SAMPLE_SIZE as SKETCH_SAMPLE, SampleProfile
+from data_trace import Tracer, format_action
+from data_plan import (GLOBAL, Plan, PlanApplied, apply_step, ConvertType,
+                       DateRange, DropDuplicates, DropEmptyColumns, DropEmptyRows,
+                       DropNA, FillNA, OptimizeMemory, Query, Rename, TrimText)
+from ui_theme import CARD_BG, TEXTBOX_BG, PRIMARY, PRIMARY_HOVER, TEXT_COLOR
+
+PREVIEW_ROWS = 60  # rows the queued steps are previewed on
+STATS_ACTIONS = 30  # most recent actions listed in the stats panel
 
 
 # ==========================================================
@@ -38,70 +51,417 @@ def create_dataanalysis_screen(root, go_back_callback):
     frame.pack(fill="both", expand=True, padx=10, pady=10)
 
     frame._df = None
-    frame._history = []
-    frame._canvas = None
+    frame._history = History()
+    frame._chart = None
+    frame._cache = DatasetCache()
+    frame._aggs = AggregateCache()
+    frame._revision = frame._aggs.revision
+    frame._date_view = None
+    frame._plan = Plan()
+    frame._ooc = None
+    frame._ooc_head = None
+    frame._profile = None
+    frame._selector_cols = None
+    frame._sampled = None
+    frame._loaded_memory = None
+    frame._recorded = []
+    frame._redo_recorded = []
+    frame._preview_df = None
+    frame._preview_key = None
+    frame._dirty = set()
+    frame._rendered = {}
+    frame._refresh_id = None
 
     # ==========================================================
     # Utility Functions
     # ==========================================================
     def clear_plot_area():
-        if frame._canvas:
-            try:
-                frame._canvas.get_tk_widget().destroy()
-            except:
-                pass
-        frame._canvas = None
+        if frame._chart:
+            frame._chart.clear()
+
+    def chart_surface():
+        # Built once on first embed, then redrawn in place
+        if frame._chart is None:
+            frame._chart = ChartSurface(plot_area)
+        return frame._chart
+
+    def plan_preview():
+        # Queued steps run only on as many leading rows as the preview
+        # needs; kept until the data or the plan changes. Raises if a
+        # queued step fails on the data.
+        key = (frame._revision, frame._plan.version)
+        if frame._preview_key != key:
+            frame._preview_df = frame._plan.preview(frame._df, PREVIEW_ROWS)
+            frame._preview_key = key
+        return frame._preview_df
 
     def update_preview():
-        preview_box.configure(state="normal")
-        preview_box.delete("1.0", "end")
-        if frame._df is None:
-            preview_box.insert("end", "No dataset loaded.")
+        # The grid formats only the rows and columns in view, so the
+        # whole frame can be paged through
+        if frame._ooc is not None:
+            ds = frame._ooc
+            total = f"{ds.rows:,}" if ds.rows is not None else "unknown"
+            preview_grid.show(frame._ooc_head, note=f"first rows of {total} (out-of-core)")
+        elif frame._df is None:
+            preview_grid.show_message("No dataset loaded.")
+        elif frame._plan:
+            try:
+                preview_grid.show(plan_preview(), note="queued steps applied to these rows")
+            except Exception:
+                preview_grid.show(frame._df)
         else:
+            preview_grid.show(frame._df)
+
+    def current_columns():
+        # Column names as they will be once queued steps have run
+        if frame._ooc is not None:
+            return pd.Index(frame._ooc.columns)
+        if frame._plan:
             try:
-                preview_box.insert("end", frame._df.head(60).to_string())
-            except:
-                preview_box.insert("end", str(frame._df.head(60)))
-        preview_box.configure(state="disabled")
+                return plan_preview().columns
+            except Exception:
+                pass
+        return frame._df.columns
 
     def update_info():
+        if frame._ooc is not None:
+            ds = frame._ooc
+            rows = f"{ds.rows:,}" if ds.rows is not None else "unknown"
+            info_label.configure(text=(
+                f"Rows: {rows} (out-of-core)\n"
+                f"Columns: {len(ds.columns)}\n"
+                f"Missing: n/a"
+            ))
+            return
         if frame._df is None:
             info_label.configure(text="Rows: 0\nColumns: 0\nMissing: 0")
             return
-        df = frame._df
-        missing = df.isna().sum().sum()
-        info_label.configure(text=(
-            f"Rows: {len(df)}\n"
-            f"Columns: {len(df.columns)}\n"
-            f"Missing: {missing}"
-        ))
+        # Counts come from the profile, which each op keeps up to date
+        profile = frame._profile
+        text = (
+            f"Rows: {profile.rows}\n"
+            f"Columns: {len(profile.columns)}\n"
+            f"Missing: {profile.nulls}\n"
+            f"Memory: {format_bytes(profile.memory)}"
+        )
+        if frame._loaded_memory and profile.memory != frame._loaded_memory:
+            text += f" (at load: {format_bytes(frame._loaded_memory)})"
+        if frame._plan:
+            text += f"\nQueued: {', '.join(frame._plan.describe())}"
+        info_label.configure(text=text)
 
     def refresh_selectors():
-        if frame._df is None:
+        if frame._df is None and frame._ooc is None:
+            frame._selector_cols = None
             column_select.configure(values=[])
             group_select.configure(values=["None"])
+            date_column_select.configure(values=[])
+            return
+        cols = list(current_columns().astype(str))
+        dtypes = frame._ooc.dtypes if frame._ooc is not None else frame._profile.dtypes()
+        # Most ops keep the columns; skip rebuilding the dropdowns then
+        key = (cols, [str(d) for d in dtypes.values()])
+        if key == frame._selector_cols:
             return
-        cols = list(frame._df.columns.astype(str))
+        frame._selector_cols = key
         column_select.configure(values=cols)
         group_select.configure(values=["None"] + cols)
 
-    def push_history():
-        if frame._df is not None:
-            try:
-                frame._history.append(frame._df.copy())
-                if len(frame._history) > 15:
-                    frame._history.pop(0)
-            except:
-                pass
+        date_cols = [str(c) for c, dtype in dtypes.items()
+                     if pd.api.types.is_datetime64_any_dtype(dtype)]
+        date_column_select.configure(values=cols)
+        if date_column_select.get() not in cols:
+            if "Date" in cols:
+                date_column_select.set("Date")
+            elif date_cols:
+                date_column_select.set(date_cols[0])
+
+    # ==========================================================
+    # Refresh Scheduling
+    # ==========================================================
+    def schedule_refresh(preview=True, info=True, selectors=True):
+        # Views are marked dirty and redrawn together in one after_idle
+        # pass, so back-to-back changes (an undo chain) render once
+        for name, dirty in (("preview", preview), ("info", info), ("selectors", selectors)):
+            if dirty:
+                frame._dirty.add(name)
+        if frame._refresh_id is None:
+            frame._refresh_id = root.after_idle(flush_refresh)
+
+    def flush_refresh():
+        frame._refresh_id = None
+        if not frame.winfo_exists():
+            return
+        dirty, frame._dirty = frame._dirty, set()
+        # A view already drawn for this data and plan is left alone
+        state = (frame._revision, frame._plan.version)
+        for name, update in (("preview", update_preview), ("info", update_info),
+                             ("selectors", refresh_selectors)):
+            if name in dirty and frame._rendered.get(name) != state:
+                update()
+                frame._rendered[name] = state
+
+    def set_df(df, profile=None, delta=None, undo=False):
+        # Every change to the frame goes through here so the revision
+        # moves on and aggregates cached for the old data are dropped;
+        # row fingerprints and filter masks follow it through its delta
+        carry_fingerprints(frame._df, df, delta, undo)
+        carry_masks(frame._df, df, delta, undo)
+        frame._df = df
+        frame._profile = profile
+        frame._revision = frame._aggs.bump()
+
+    def push_history(delta, steps=()):
+        # Steps are recorded alongside the history so a saved recipe
+        # matches what undo / redo left applied
+        frame._history.push(delta)
+        frame._recorded.append(list(steps))
+        frame._redo_recorded.clear()
 
     def undo_last():
-        if not frame._history:
+        if jobs.busy:
+            messagebox.showinfo("Busy", "Wait for the current job to finish.")
+            return
+        if frame._plan:
+            # Queued steps have not touched the data; just drop the last one
+            frame._plan.pop()
+            schedule_refresh()
+            return
+        if not frame._history.can_undo():
             messagebox.showinfo("Undo", "Nothing to undo.")
             return
-        frame._df = frame._history.pop()
-        update_preview()
-        update_info()
-        refresh_selectors()
+        df = frame._df
+        profile = frame._profile
+        delta = frame._history.peek_undo()
+
+        def work(job):
+            new_df, commit = apply_delta(delta, df, undo=True)
+            return new_df, commit, profile.after(new_df, delta, undo=True)
+
+        def done(result):
+            new_df, commit, new_profile = result
+            frame._history.undone(delta, commit)
+            set_df(new_df, new_profile, delta, undo=True)
+            if frame._recorded:
+                frame._redo_recorded.append(frame._recorded.pop())
+            schedule_refresh()
+
+        run_job("Undo", work, done)
+
+    def redo_last():
+        if jobs.busy:
+            messagebox.showinfo("Busy", "Wait for the current job to finish.")
+            return
+        if frame._plan:
+            messagebox.showinfo("Redo", "Run or undo the queued steps first.")
+            return
+        if not frame._history.can_redo():
+            messagebox.showinfo("Redo", "Nothing to redo.")
+            return
+        df = frame._df
+        profile = frame._profile
+        delta = frame._history.peek_redo()
+
+        def work(job):
+            new_df, commit = apply_delta(delta, df)
+            return new_df, commit, profile.after(new_df, delta)
+
+        def done(result):
+            new_df, commit, new_profile = result
+            frame._history.redone(delta, commit)
+            set_df(new_df, new_profile, delta)
+            if frame._redo_recorded:
+                frame._recorded.append(frame._redo_recorded.pop())
+            schedule_refresh()
+
+        run_job("Redo", work, done)
+
+    # ==========================================================
+    # Background Jobs
+    # ==========================================================
+    def show_progress(fraction, message):
+        if fraction is not None:
+            progress_bar.set(fraction)
+        if message:
+            status_label.configure(text=message)
+
+    def show_job_state(title, running):
+        cancel_btn.configure(state="normal" if running else "disabled")
+        # Undo / redo work on the current frame, so not while a job replaces it
+        for name in ("Undo", "Redo"):
+            tool_buttons[name].configure(state="disabled" if running else "normal")
+
+    jobs = JobRunner(root, on_progress=show_progress, on_state=show_job_state)
+    frame._jobs = jobs
+
+    def data_size():
+        if frame._ooc is not None:
+            return frame._ooc.rows, len(frame._ooc.columns)
+        return frame._df.shape if frame._df is not None else None
+
+    # Every action is timed: worker compute, Tk apply and chart draw /
+    # embed as phases of one span (shown in the Stats panel)
+    tracer = Tracer(size=data_size, on_record=lambda action: update_stats())
+    frame._tracer = tracer
+
+    def notify(title, message, show=messagebox.showinfo):
+        # Dialogs open after the action is recorded, so time spent
+        # reading them is not counted
+        root.after_idle(lambda: show(title, message))
+
+    def run_job(title, work, on_done, error_title=None, phase="compute"):
+        action = tracer.action(title)
+
+        def traced(job):
+            with action.phase(phase):
+                return work(job)
+
+        def done(result):
+            with action, action.phase("apply"):
+                on_done(result)
+
+        def failed(e):
+            action.finish(type(e).__name__)
+            messagebox.showerror(error_title or title, str(e))
+
+        job = jobs.submit(title, traced, done, on_error=failed,
+                          on_cancel=lambda: action.finish("cancelled"))
+        if job is None:
+            tracer.discard(action)
+            messagebox.showinfo("Busy", "Wait for the current job to finish.")
+        return job
+
+    def run_clean(title, op, columns_changed=False, error_title=None, steps=()):
+        # op(df) returns (new_df, delta) and must leave its input untouched,
+        # so the current frame stays valid until the job ends
+        if frame._df is None: return
+        df = frame._df
+        profile = frame._profile
+
+        def work(job):
+            new_df, delta = op(df)
+            return new_df, delta, profile.after(new_df, delta)
+
+        def done(result):
+            new_df, delta, new_profile = result
+            push_history(delta, steps)
+            set_df(new_df, new_profile, delta)
+            schedule_refresh(selectors=columns_changed)
+
+        run_job(title, work, done, error_title=error_title)
+
+    # ==========================================================
+    # Lazy Plan
+    # ==========================================================
+    def run_step(step, columns_changed=False, error_title=None):
+        if frame._ooc is not None:
+            messagebox.showinfo("Out-of-core", "Cleaning tools need a dataset loaded into memory.")
+            return
+        if frame._df is None: return
+        if not lazy_var.get():
+            run_clean(step.title, lambda df: apply_step(df, step),
+                      columns_changed, error_title, steps=[step])
+            return
+        if jobs.busy:
+            messagebox.showinfo("Busy", "Wait for the current job to finish.")
+            return
+
+        frame._plan.add(step)
+        if step.kind == GLOBAL:
+            # Needs a full pass anyway, so run the plan now
+            materialize()
+            return
+        try:
+            with tracer.action(f"Queue {step.title}"):
+                plan_preview()
+        except Exception as e:
+            frame._plan.pop()
+            messagebox.showerror(error_title or step.title, str(e))
+            return
+        schedule_refresh(selectors=columns_changed)
+
+    def materialize(then=None):
+        # Run the queued steps fused into as few passes as possible
+        if not frame._plan:
+            if then:
+                then()
+            return
+        df = frame._df
+        profile = frame._profile
+        plan = frame._plan.copy()
+
+        def work(job):
+            new_df = plan.execute(df, progress=job.progress)
+            delta = PlanApplied(df, plan)
+            job.progress(None, "Profiling columns...")
+            return new_df, delta, profile.after(new_df, delta)
+
+        def done(result):
+            new_df, delta, new_profile = result
+            push_history(delta, plan.steps)
+            frame._plan.clear()
+            set_df(new_df, new_profile, delta)
+            schedule_refresh()
+            if then:
+                then()
+
+        run_job(f"Running {len(plan)} queued step(s)", work, done, error_title="Plan Error")
+
+    def toggle_lazy():
+        if not lazy_var.get():
+            materialize()
+
+    def forget_dataset():
+        # State tied to the previous dataset; the date view and the sample
+        # would otherwise keep its frame and date index alive
+        preview_grid.reset()
+        frame._history.clear()
+        frame._plan.clear()
+        frame._recorded.clear()
+        frame._redo_recorded.clear()
+        frame._date_view = None
+        frame._sampled = None
+
+    def set_loaded(result):
+        df, report, profile = result
+        frame._ooc = None
+        frame._ooc_head = None
+        set_df(df, profile)
+        frame._loaded_memory = profile.memory
+        forget_dataset()
+        schedule_refresh()
+        status_label.configure(text=(
+            f"Loaded {report['rows']:,} rows in {report['seconds']:.1f}s "
+            f"({report['engine']}) - {format_bytes(report['memory_bytes'])}, "
+            f"peak {format_bytes(report['peak_bytes'])}"
+        ))
+
+    def load_with_cache(path, job, sheet=None, cell_range=None):
+        # The parsed frame is cached as Feather for the next open; each
+        # sheet / range of a workbook is cached on its own
+        started = time.perf_counter()
+        variant = excel_variant(sheet, cell_range)
+        df = frame._cache.get(path, variant)
+        if df is not None:
+            size = memory_bytes(df)
+            report = {"rows": len(df), "engine": "cache",
+                      "seconds": time.perf_counter() - started,
+                      "memory_bytes": size, "peak_bytes": size}
+        else:
+            df, report = load_dataset(path, progress=job.progress,
+                                      sheet=sheet, cell_range=cell_range)
+            job.progress(0.99, "Writing dataset cache...")
+            frame._cache.put(path, df, variant)
+        job.progress(None, "Profiling columns...")
+        return df, report, DatasetProfile(df)
+
+    def close_screen():
+        jobs.shutdown()
+        tracer.set_track_memory(False)
+        if frame._chart:
+            frame._chart.close()
+        scroll.destroy()
+        go_back_callback()
 
     # ==========================================================
     # Load / Export
@@ -110,183 +470,253 @@ def create_dataanalysis_screen(root, go_back_callback):
         path = filedialog.askopenfilename(filetypes=[("CSV", "*.csv")])
         if not path:
             return
-        try:
-            df = pd.read_csv(path)
-            frame._df = df
-            update_preview()
-            update_info()
-            refresh_selectors()
-        except Exception as e:
-            messagebox.showerror("Error loading CSV", str(e))
+        run_job("Loading CSV", lambda job: load_with_cache(path, job),
+                set_loaded, error_title="Error loading CSV")
 
     def load_excel():
-        path = filedialog.askopenfilename(filetypes=[("Excel", "*.xlsx;*.xls")])
+        path = filedialog.askopenfilename(filetypes=[("Excel", "*.xlsx;*.xlsm;*.xls")])
         if not path:
             return
         try:
-            df = pd.read_excel(path)
-            frame._df = df
-            update_preview()
-            update_info()
-            refresh_selectors()
+            sheets = excel_sheets(path)
         except Exception as e:
             messagebox.showerror("Error loading Excel", str(e))
+            return
+
+        sheet = sheets[0] if sheets else None
+        if len(sheets) > 1:
+            sheet = simpledialog.askstring(
+                "Sheet", f"Sheet to load ({', '.join(sheets)}):", initialvalue=sheets[0])
+            if sheet is None:
+                return
+            if sheet not in sheets:
+                messagebox.showerror("Error loading Excel", f"No sheet named '{sheet}'.")
+                return
+        cell_range = simpledialog.askstring(
+            "Cell Range", "Cell range with the header in its first row\n"
+                          "(e.g. A1:F5000, or B:D). Leave blank for the whole sheet:")
+        if cell_range is None:
+            return
+        cell_range = cell_range.strip() or None
+        if sheet == (sheets[0] if sheets else None) and cell_range is None:
+            sheet = None  # the default read shares the plain cache entry
+
+        run_job("Loading Excel", lambda job: load_with_cache(path, job, sheet, cell_range),
+                set_loaded, error_title="Error loading Excel")
+
+    def open_large_file():
+        path = filedialog.askopenfilename(filetypes=[
+            ("Data files", "*.csv;*.parquet;*.feather;*.arrow"),
+            ("CSV", "*.csv"), ("Parquet", "*.parquet"), ("Feather", "*.feather;*.arrow")])
+        if not path:
+            return
 
-    def export_csv():
+        def work(job):
+            ds = OutOfCoreDataset.open(path, progress=job.progress, cache=frame._cache)
+            return ds, ds.head(60)
+
+        def done(result):
+            ds, head = result
+            frame._ooc = ds
+            frame._ooc_head = head
+            set_df(None)
+            forget_dataset()
+            schedule_refresh()
+            status_label.configure(text=f"Out-of-core mode: {os.path.basename(path)}")
+
+        run_job("Opening large file", work, done, error_title="Error opening file")
+
+    def save_recipe():
+        steps = [step for steps in frame._recorded for step in steps] + frame._plan.steps
+        if not steps:
+            messagebox.showinfo("Save Recipe", "No cleaning steps recorded yet.")
+            return
+        path = filedialog.asksaveasfilename(defaultextension=".json",
+                                            filetypes=[("Recipe", "*.json")])
+        if not path:
+            return
+        group = group_select.get()
+        aggregate = None
+        if group != "None" and column_select.get():
+            aggregate = {"column": column_select.get(), "group": group,
+                         "agg": agg_select.get()}
+        try:
+            Recipe(steps, aggregate).save(path)
+            messagebox.showinfo("Save Recipe", f"Saved {len(steps)} step(s) to {path}")
+        except Exception as e:
+            messagebox.showerror("Save Recipe", str(e))
+
+    def export_data():
         if frame._df is None:
             messagebox.showinfo("Export", "No dataset loaded.")
             return
-        path = filedialog.asksaveasfilename(defaultextension=".csv",
-                                            filetypes=[("CSV", "*.csv")])
+        if frame._plan:
+            materialize(then=export_data)
+            return
+        path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[
+            ("CSV", "*.csv"), ("CSV (gzip)", "*.csv.gz"), ("CSV (zstd)", "*.csv.zst"),
+            ("Parquet", "*.parquet"), ("Feather", "*.feather")])
         if not path:
             return
         try:
-            frame._df.to_csv(path, index=False)
-            messagebox.showinfo("Export", f"Saved to {path}")
-        except Exception as e:
+            export_format(path)
+        except ValueError as e:
             messagebox.showerror("Export Error", str(e))
+            return
+        # Ops never modify a frame in place, so the job can write this one
+        # while the screen keeps working on newer versions
+        df = frame._df
+
+        def done(report):
+            status_label.configure(text=(
+                f"Exported {report['rows']:,} rows as {report['format']} in "
+                f"{report['seconds']:.1f}s - {format_bytes(report['bytes'])}"
+            ))
+            notify("Export", f"Saved to {path}")
+
+        run_job("Exporting", lambda job: export_frame(df, path, progress=job.progress),
+                done, error_title="Export Error")
 
     # ==========================================================
     # Cleaning Tools
     # ==========================================================
     def remove_empty_rows():
-        if frame._df is None: return
-        push_history()
-        frame._df = frame._df.dropna(how="all").reset_index(drop=True)
-        update_preview(); update_info()
+        run_step(DropEmptyRows())
 
     def remove_empty_columns():
-        if frame._df is None: return
-        push_history()
-        frame._df = frame._df.dropna(axis=1, how="all")
-        update_preview(); update_info(); refresh_selectors()
+        run_step(DropEmptyColumns(), columns_changed=True)
 
     def drop_rows_na():
-        if frame._df is None: return
-        push_history()
-        frame._df = frame._df.dropna().reset_index(drop=True)
-        update_preview(); update_info()
+        run_step(DropNA())
 
     def fill_na():
         if frame._df is None: return
         val = simpledialog.askstring("Fill NA", "Enter replacement value:")
         if val is None: return
-        push_history()
-        frame._df = frame._df.fillna(val)
-        update_preview(); update_info()
+        run_step(FillNA(val))
+
+    def ask_key_columns(title):
+        # [] for whole rows, None when cancelled or a name is unknown
+        text = simpledialog.askstring(title, "Key columns (comma separated, blank for whole rows):")
+        if text is None: return None
+        names = {str(c): c for c in current_columns()}
+        keys = [name.strip() for name in text.split(",") if name.strip()]
+        missing = [name for name in keys if name not in names]
+        if missing:
+            messagebox.showerror(title, f"Unknown column(s): {', '.join(missing)}")
+            return None
+        return [names[name] for name in keys]
 
     def remove_duplicates():
         if frame._df is None: return
-        push_history()
-        frame._df = frame._df.drop_duplicates().reset_index(drop=True)
-        update_preview(); update_info()
+        subset = ask_key_columns("Remove Duplicates")
+        if subset is None: return
+        keep = simpledialog.askstring("Remove Duplicates", "Keep which occurrence? first / last",
+                                      initialvalue="first")
+        if keep is None: return
+        keep = keep.strip().lower()
+        if keep not in KEEP_OPTIONS:
+            messagebox.showerror("Remove Duplicates", "Enter first or last.")
+            return
+        run_step(DropDuplicates(subset, keep))
 
-    def trim_text():
+    def find_duplicate_rows(subset=None):
+        # Counts only; the data is left as it is
+        if frame._ooc is not None:
+            messagebox.showinfo("Out-of-core", "Finding duplicates needs a dataset loaded into memory.")
+            return
         if frame._df is None: return
-        push_history()
-        for col in frame._df.select_dtypes(include="object"):
-            frame._df[col] = frame._df[col].astype(str).str.strip()
-        update_preview(); update_info()
+        if subset is None:
+            subset = ask_key_columns("Find Duplicates")
+            if subset is None: return
+        if frame._plan:
+            materialize(then=lambda: find_duplicate_rows(subset))
+            return
+        df = frame._df
+        key = ", ".join(map(str, subset)) if subset else "whole rows"
+
+        def work(job):
+            job.progress(None, "Finding duplicates...")
+            return find_duplicates(df, subset or None)
+
+        def done(result):
+            rows, groups = result
+            status_label.configure(text=f"{rows:,} duplicate rows ({key})")
+            notify("Find Duplicates", f"{rows:,} rows repeat an earlier row, "
+                                      f"in {groups:,} groups.\nKey: {key}")
+
+        run_job("Find Duplicates", work, done)
+
+    def trim_text():
+        run_step(TrimText())
+
+    def optimize_memory():
+        run_step(OptimizeMemory(), columns_changed=True)
 
     def rename_column():
         if frame._df is None: return
         old = simpledialog.askstring("Rename Column", "Old name:")
-        if not old or old not in frame._df.columns:
+        if not old or old not in current_columns():
             return
         new = simpledialog.askstring("Rename Column", "New name:")
         if not new: return
-        push_history()
-        frame._df = frame._df.rename(columns={old: new})
-        update_preview(); update_info(); refresh_selectors()
+        run_step(Rename({old: new}), columns_changed=True)
 
     def convert_type():
         if frame._df is None: return
         col = simpledialog.askstring("Convert Type", "Column name:")
-        if not col or col not in frame._df.columns:
+        if not col or col not in current_columns():
             return
         dtype = simpledialog.askstring("Data Type", "int, float, str, datetime:")
         if not dtype: return
-        push_history()
-        try:
-            if dtype == "datetime":
-                frame._df[col] = pd.to_datetime(frame._df[col], errors="coerce")
-            else:
-                frame._df[col] = frame._df[col].astype(dtype)
-        except Exception as e:
-            messagebox.showerror("Conversion Error", str(e))
-        update_preview(); update_info()
+        run_step(ConvertType(col, dtype), error_title="Conversion Error")
 
     def filter_rows():
         if frame._df is None: return
         cond = simpledialog.askstring("Filter Rows", "Enter query (e.g., Age > 30):")
         if not cond: return
-        push_history()
-        try:
-            frame._df = frame._df.query(cond).reset_index(drop=True)
-            update_preview(); update_info(); refresh_selectors()
-        except Exception as e:
-            messagebox.showerror("Filter Error", str(e))
+        run_step(Query(cond), columns_changed=True, error_title="Filter Error")
 
     # ==========================================================
     # Auto Recommend
     # ==========================================================
     def auto_recommend():
-        if frame._df is None:
+        if frame._df is None and frame._ooc is None:
             messagebox.showinfo("No Data", "Load a dataset first.")
             return
-
-        df = frame._df
-        chart_type = chart_select.get()
-
-        numeric = list(df.select_dtypes(include="number").columns)
-        categorical = list(df.select_dtypes(include="object").columns)
-
-        best_num = numeric[0] if numeric else None
-        best_cat = categorical[0] if categorical else None
-
-        if chart_type == "pie":
-            if best_cat:
-                column_select.set(best_cat)
-                group_select.set("None")
-                agg_select.set("count")
-                messagebox.showinfo("Recommended", f"Pie → {best_cat}")
-            else:
-                messagebox.showinfo("Recommendation", "No categorical columns.")
-            return
-
-        if chart_type == "bar":
-            if best_num and best_cat:
-                column_select.set(best_num)
-                group_select.set(best_cat)
-                agg_select.set("mean")
-                messagebox.showinfo("Recommended", f"Bar → {best_cat} vs {best_num}")
+        if frame._plan:
+            materialize(then=auto_recommend)
             return
 
-        if chart_type == "line":
-            if best_num:
-                column_select.set(best_num)
-                group_select.set("None")
-                agg_select.set("sum")
-                messagebox.showinfo("Recommended", f"Line → {best_num}")
-            return
-
-        if chart_type == "hist":
-            if best_num:
-                column_select.set(best_num)
-                agg_select.set("count")
-                messagebox.showinfo("Recommended", f"Histogram → {best_num}")
-            return
-
-        if chart_type == "box":
-            if best_num:
-                column_select.set(best_num)
-                messagebox.showinfo("Recommended", f"Box → {best_num}")
-            return
+        chart_type = chart_select.get()
 
-        if chart_type == "heatmap":
-            if len(numeric) >= 2:
-                messagebox.showinfo("Recommended", "Heatmap → numeric correlations")
-            return
+        def apply(profile):
+            frame._sampled = (revision, profile)
+            rec = profile.recommend(chart_type) if profile is not None else None
+            if rec is None:
+                notify("Recommendation", f"No suitable columns for a {chart_type} chart.")
+                return
+            if rec["column"]:
+                column_select.set(rec["column"])
+            group_select.set(rec["group"] or "None")
+            if rec["agg"]:
+                agg_select.set(rec["agg"])
+            notify("Recommended", rec["message"])
+
+        # Columns are ranked on a fixed-size sample, kept until the data changes
+        revision = frame._revision
+        if frame._sampled and frame._sampled[0] == revision:
+            apply(frame._sampled[1])
+        elif frame._ooc is not None:
+            ds = frame._ooc
+            # A few row groups spread over the file, not a full pass
+            run_job("Sampling columns",
+                    lambda job: SampleProfile.from_pieces(
+                        ds.sample_pieces(SKETCH_SAMPLE, progress=job.progress), ds.rows),
+                    apply, error_title="Recommendation")
+        else:
+            with tracer.action("Auto Recommend"):
+                apply(SampleProfile.from_frame(frame._df))
 
     # ==========================================================
     # Date Filter (UI-based)
@@ -295,8 +725,12 @@ def create_dataanalysis_screen(root, go_back_callback):
         if frame._df is None:
             messagebox.showinfo("No Data", "Load a dataset first.")
             return
-        if "Date" not in frame._df.columns:
-            messagebox.showwarning("Missing Column", "Dataset must contain 'Date' column.")
+        if frame._plan:
+            materialize(then=filter_by_date_panel)
+            return
+        column = date_column_select.get()
+        if column not in frame._df.columns:
+            messagebox.showwarning("Missing Column", "Choose a date column to filter on.")
             return
 
         start = start_date_entry.get().strip()
@@ -306,35 +740,69 @@ def create_dataanalysis_screen(root, go_back_callback):
             messagebox.showwarning("Invalid Input", "Enter both start and end date.")
             return
 
-        try:
-            push_history()
-            frame._df["Date"] = pd.to_datetime(frame._df["Date"], errors="coerce")
-
+        # Reuse the parsed, sorted index when filtering the same column again.
+        # If the current frame is the previous date filter's result, filter its
+        # source instead, so the range can be widened as well as narrowed.
+        view = frame._date_view
+        base, index, refine = frame._df, None, False
+        if view and view["column"] == column:
+            if view["revision"] == frame._revision:
+                base, index, refine = view["base"], view["index"], True
+            elif view["base"] is frame._df:
+                index = view["index"]
+        # A refined filter replaces the previous one, so it starts from the
+        # profile of that filter's source
+        profile = view["profile"] if refine else frame._profile
+
+        def work(job):
             start_dt = pd.to_datetime(start)
             end_dt = pd.to_datetime(end)
+            idx = index
+            if idx is None:
+                job.progress(None, "Indexing dates...")
+                idx = DateIndex(base[column])
+            job.progress(0.5, "Filtering rows...")
+            parsed = pd.api.types.is_datetime64_any_dtype(base[column])
+            replaced = None if parsed else {column: idx.values}
+            filtered, delta = select_rows(base, idx.positions(start_dt, end_dt), replaced)
+            return filtered, delta, profile.after(filtered, delta), idx, start_dt, end_dt
+
+        def done(result):
+            filtered, delta, new_profile, idx, start_dt, end_dt = result
+            step = DateRange(column, start_dt, end_dt)
+            if refine and frame._recorded:
+                frame._history.replace_top(view["delta"], delta)
+                frame._recorded[-1] = [step]
+            else:
+                push_history(delta, [step])
+            set_df(filtered, new_profile, delta)
+            frame._date_view = {"column": column, "base": base, "index": idx,
+                                "delta": delta, "profile": profile,
+                                "revision": frame._revision}
 
-            filtered = frame._df[(frame._df["Date"] >= start_dt) &
-                                 (frame._df["Date"] <= end_dt)]
-            frame._df = filtered.reset_index(drop=True)
-
-            update_preview()
-            update_info()
-            refresh_selectors()
+            schedule_refresh()
 
-            messagebox.showinfo("Filtered", f"Filtered rows from {start_dt.date()} to {end_dt.date()}")
+            notify("Filtered", f"Filtered rows from {start_dt.date()} to {end_dt.date()}")
 
-        except Exception as e:
-            messagebox.showerror("Date Error", str(e))
+        run_job("Date Filter", work, done, error_title="Date Error")
 
     # ==========================================================
     # Chart Generation
     # ==========================================================
     def generate_chart():
+        if frame._ooc is not None:
+            generate_chart_ooc()
+            return
         if frame._df is None:
             messagebox.showinfo("No Data", "Load a dataset first.")
             return
+        if frame._plan:
+            materialize(then=generate_chart)
+            return
 
         df = frame._df
+        revision = frame._revision
+        width = max(plot_area.winfo_width(), DEFAULT_WIDTH)
         ctype = chart_select.get()
         col = column_select.get()
         group = group_select.get()
@@ -344,91 +812,103 @@ def create_dataanalysis_screen(root, go_back_callback):
         if group == "None":
             group = None
 
+        if ctype not in ("heatmap", "pairs") and not col:
+            if ctype == "pie":
+                messagebox.showinfo("Select Column", "Choose a column for Pie chart.")
+            return
+
+        run_job("Generating chart",
+                lambda job: prepare_chart_data(df, ctype, col, group, agg,
+                                               cache=frame._aggs, revision=revision,
+                                               width=width, progress=job.progress),
+                lambda spec: show_chart(spec, embed),
+                error_title="Plot Error", phase="prepare")
+
+    def generate_chart_ooc():
+        # Streaming aggregates over the on-disk data; results are memoised
+        # like in-memory ones, keyed on the (unchanging) revision
+        ds = frame._ooc
+        revision = frame._revision
+        width = max(plot_area.winfo_width(), DEFAULT_WIDTH)
+        ctype = chart_select.get()
+        col = column_select.get()
+        group = group_select.get()
+        agg = agg_select.get()
+        embed = embed_var.get()
+
+        if group == "None":
+            group = None
+        if ctype not in ("heatmap", "pairs") and not col:
+            return
+
+        def work(job):
+            return frame._aggs.get_or_compute(
+                revision, ("ooc", ctype, col, group, agg, width),
+                lambda: prepare_chart_data_ooc(ds, ctype, col, group, agg, width=width,
+                                               progress=job.progress))
+
+        run_job("Generating chart", work, lambda spec: show_chart(spec, embed),
+                error_title="Plot Error", phase="prepare")
+
+    def show_chart(spec, embed):
+        if spec is None:
+            return
         clear_plot_area()
-        fig, ax = plt.subplots(figsize=(10, 5))
 
+        def draw(ax):
+            with tracer.phase("draw"):
+                draw_chart(ax, spec)
+
+        # Embed or popup; the embed phase includes rasterising the figure
         try:
-            # PIE Chart
-            if ctype == "pie":
-                if not col:
-                    messagebox.showinfo("Select Column", "Choose a column for Pie chart.")
-                    plt.close(fig); return
-                if pd.api.types.is_numeric_dtype(df[col]) and group:
-                    grouped = getattr(df.groupby(group)[col], agg)()
-                    ax.pie(grouped.values, labels=grouped.index, autopct="%1.1f%%")
-                    ax.set_title(f"{agg.capitalize()} of {col} by {group}")
-                else:
-                    counts = df[col].value_counts()
-                    ax.pie(counts.values, labels=counts.index, autopct="%1.1f%%")
-                    ax.set_title(f"Distribution of {col}")
-
-            # BAR Chart
-            elif ctype == "bar":
-                if not col:
-                    plt.close(fig); return
-                if group:
-                    grouped = getattr(df.groupby(group)[col], agg)()
-                    ax.bar(grouped.index.astype(str), grouped.values)
-                    plt.setp(ax.get_xticklabels(), rotation=40, ha="right")
+            with tracer.phase("embed"):
+                if embed:
+                    chart_surface().render(draw, idle=False)
                 else:
-                    counts = df[col].value_counts()
-                    ax.bar(counts.index.astype(str), counts.values)
-                    plt.setp(ax.get_xticklabels(), rotation=40, ha="right")
-                ax.set_title(f"Bar Chart - {col}")
-
-            # LINE Chart
-            elif ctype == "line":
-                if not col:
-                    plt.close(fig); return
-                if group:
-                    grouped = getattr(df.groupby(group)[col], agg)()
-                    ax.plot(grouped.index.astype(str), grouped.values, marker="o")
-                    plt.setp(ax.get_xticklabels(), rotation=40, ha="right")
-                    ax.set_title(f"{agg.capitalize()} of {col} by {group}")
-                else:
-                    ax.plot(df[col].dropna().values, marker="o")
-                    ax.set_title(f"Line Chart - {col}")
-
-            # HISTOGRAM
-            elif ctype == "hist":
-                if not col:
-                    plt.close(fig); return
-                ax.hist(df[col].dropna(), bins=20)
-                ax.set_title(f"Histogram - {col}")
-
-            # BOX Plot
-            elif ctype == "box":
-                if not col:
-                    plt.close(fig); return
-                ax.boxplot(df[col].dropna())
-                ax.set_title(f"Box Plot - {col}")
-
-            # HEATMAP
-            elif ctype == "heatmap":
-                num = df.select_dtypes(include="number")
-                if num.shape[1] < 2:
-                    plt.close(fig); return
-                corr = num.corr()
-                sns.heatmap(corr, annot=True, cmap="Blues", ax=ax)
-                ax.set_title("Correlation Heatmap")
-
+                    open_chart_popup(root, draw)
         except Exception as e:
-            plt.close(fig)
-            messagebox.showerror("Plot Error", str(e))
-            return
+            notify("Plot Error", str(e), messagebox.showerror)
 
-        # Embed or popup
-        if embed:
-            canvas = FigureCanvasTkAgg(fig, master=plot_area)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill="both", expand=True)
-            frame._canvas = canvas
+    # ==========================================================
+    # Stats Panel
+    # ==========================================================
+    def update_stats():
+        if not stats_var.get():
+            return
+        lines = [format_action(action) for action in tracer.recent(STATS_ACTIONS)]
+        stats_box.configure(state="normal")
+        stats_box.delete("1.0", "end")
+        stats_box.insert("end", "\n".join(lines) if lines else "No actions recorded yet.")
+        stats_box.configure(state="disabled")
+
+    def toggle_stats():
+        if stats_var.get():
+            stats_body.pack(fill="x", pady=(0, 5))
+            update_stats()
         else:
-            popup = tk.Toplevel(root)
-            popup.geometry("1000x700")
-            canvas = FigureCanvasTkAgg(fig, master=popup)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill="both", expand=True)
+            stats_body.pack_forget()
+
+    def toggle_memory():
+        tracer.set_track_memory(memory_var.get())
+
+    def clear_stats():
+        tracer.clear()
+        update_stats()
+
+    def save_trace(chrome):
+        if not tracer.actions:
+            messagebox.showinfo("Save Trace", "No actions recorded yet.")
+            return
+        path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("Chrome trace" if chrome else "JSON", "*.json")])
+        if not path:
+            return
+        try:
+            tracer.save(path, chrome=chrome)
+            status_label.configure(text=f"Saved trace of {len(tracer.actions)} action(s)")
+        except Exception as e:
+            messagebox.showerror("Save Trace", str(e))
 
     # ==========================================================
     # UI Layout
@@ -446,9 +926,25 @@ def create_dataanalysis_screen(root, go_back_callback):
     ctk.CTkButton(
         header, text="Back", width=100,
         fg_color=PRIMARY, hover_color=PRIMARY_HOVER,
-        command=lambda: [frame.destroy(), go_back_callback()]
+        command=close_screen
     ).pack(side="right")
 
+    # Job status row
+    status_row = ctk.CTkFrame(frame, fg_color="transparent")
+    status_row.pack(fill="x", pady=(0, 10))
+
+    status_label = ctk.CTkLabel(status_row, text="Ready.", anchor="w", width=300)
+    status_label.pack(side="left", padx=5)
+
+    progress_bar = ctk.CTkProgressBar(status_row, width=300)
+    progress_bar.set(0)
+    progress_bar.pack(side="left", padx=5)
+
+    cancel_btn = ctk.CTkButton(status_row, text="Cancel", width=100,
+                               fg_color="#EF4444", state="disabled",
+                               command=lambda: jobs.cancel())
+    cancel_btn.pack(side="left", padx=5)
+
     # Body split
     body = ctk.CTkFrame(frame, fg_color="transparent")
     body.pack(fill="both", expand=True)
@@ -458,12 +954,12 @@ def create_dataanalysis_screen(root, go_back_callback):
     left.pack(side="left", fill="y", padx=10)
 
     # Preview
-    preview_box = ctk.CTkTextbox(
-        left, width=500, height=550,
+    preview_grid = PagedGrid(
+        left, width=500, height=530,
         fg_color=TEXTBOX_BG, text_color=TEXT_COLOR,
         font=("Consolas", 12)
     )
-    preview_box.pack(pady=5)
+    preview_grid.pack(pady=5)
 
     # Load row
     load_row = ctk.CTkFrame(left, fg_color="transparent")
@@ -471,7 +967,11 @@ def create_dataanalysis_screen(root, go_back_callback):
 
     ctk.CTkButton(load_row, text="Load CSV", width=120, command=load_csv).pack(side="left", padx=5)
     ctk.CTkButton(load_row, text="Load Excel", width=120, command=load_excel).pack(side="left", padx=5)
-    ctk.CTkButton(load_row, text="Export CSV", width=120, command=export_csv).pack(side="left", padx=5)
+    ctk.CTkButton(load_row, text="Export Data", width=120, command=export_data).pack(side="left", padx=5)
+
+    ctk.CTkButton(left, text="Open Large File (out-of-core)", width=260,
+                  command=open_large_file).pack(pady=(0, 5))
+    ctk.CTkButton(left, text="Save Recipe", width=260, command=save_recipe).pack(pady=(0, 5))
 
     info_label = ctk.CTkLabel(left, text="Rows: 0\nColumns: 0\nMissing: 0")
     info_label.pack(pady=10)
@@ -484,16 +984,26 @@ def create_dataanalysis_screen(root, go_back_callback):
         ("Drop Rows NA", drop_rows_na),
         ("Fill NA", fill_na),
         ("Remove Duplicates", remove_duplicates),
+        ("Find Duplicates", find_duplicate_rows),
         ("Trim Text", trim_text),
+        ("Optimize Memory", optimize_memory),
         ("Rename Column", rename_column),
         ("Convert Type", convert_type),
         ("Filter Rows", filter_rows),
-        ("Undo", undo_last)
+        ("Run Queued Steps", materialize),
+        ("Undo", undo_last),
+        ("Redo", redo_last)
     ]
 
+    lazy_var = tk.BooleanVar(value=False)
+    ctk.CTkCheckBox(left, text="Lazy mode (queue steps)", variable=lazy_var,
+                    command=toggle_lazy).pack(pady=(5, 3))
+
+    tool_buttons = {}
     for name, fn in clean_tools:
-        ctk.CTkButton(left, text=name, width=260, fg_color="#3C4153",
-                      hover_color="#2D3140", command=fn).pack(pady=3)
+        tool_buttons[name] = ctk.CTkButton(left, text=name, width=260, fg_color="#3C4153",
+                                           hover_color="#2D3140", command=fn)
+        tool_buttons[name].pack(pady=3)
 
     # RIGHT PANEL
     right = ctk.CTkFrame(body, fg_color="transparent")
@@ -503,7 +1013,7 @@ def create_dataanalysis_screen(root, go_back_callback):
     ctrl = ctk.CTkFrame(right, fg_color="transparent")
     ctrl.pack(fill="x", pady=(5, 5))
 
-    chart_select = ctk.CTkComboBox(ctrl, values=["bar", "line", "pie", "hist", "box", "heatmap"], width=120)
+    chart_select = ctk.CTkComboBox(ctrl, values=["bar", "line", "pie", "hist", "box", "heatmap", "pairs"], width=120)
     chart_select.set("bar")
     chart_select.pack(side="left", padx=5)
 
@@ -533,6 +1043,11 @@ def create_dataanalysis_screen(root, go_back_callback):
     date_panel = ctk.CTkFrame(right, fg_color="transparent")
     date_panel.pack(fill="x", pady=(5, 10))
 
+    ctk.CTkLabel(date_panel, text="Date Column:").pack(side="left", padx=5)
+    date_column_select = ctk.CTkComboBox(date_panel, values=[], width=130)
+    date_column_select.set("Date")
+    date_column_select.pack(side="left", padx=5)
+
     ctk.CTkLabel(date_panel, text="Start Date (YYYY-MM-DD):").pack(side="left", padx=5)
     start_date_entry = ctk.CTkEntry(date_panel, width=150)
     start_date_entry.pack(side="left", padx=5)
@@ -549,4 +1064,31 @@ def create_dataanalysis_screen(root, go_back_callback):
     plot_area = ctk.CTkFrame(right, fg_color=CARD_BG)
     plot_area.pack(fill="both", expand=True, pady=5)
 
+    # Stats panel (collapsed until opened)
+    stats_row = ctk.CTkFrame(right, fg_color="transparent")
+    stats_row.pack(fill="x", pady=(5, 0))
+
+    stats_var = tk.BooleanVar(value=False)
+    ctk.CTkSwitch(stats_row, text="Operation Stats", variable=stats_var,
+                  command=toggle_stats).pack(side="left", padx=5)
+
+    memory_var = tk.BooleanVar(value=False)
+    ctk.CTkCheckBox(stats_row, text="Track memory (slower)", variable=memory_var,
+                    command=toggle_memory).pack(side="left", padx=5)
+
+    ctk.CTkButton(stats_row, text="Save Chrome Trace", width=150,
+                  command=lambda: save_trace(True)).pack(side="right", padx=5)
+    ctk.CTkButton(stats_row, text="Save JSON", width=100,
+                  command=lambda: save_trace(False)).pack(side="right", padx=5)
+    ctk.CTkButton(stats_row, text="Clear", width=70, fg_color="#3C4153",
+                  hover_color="#2D3140", command=clear_stats).pack(side="right", padx=5)
+
+    stats_body = ctk.CTkFrame(right, fg_color="transparent")
+    stats_box = ctk.CTkTextbox(
+        stats_body, height=200,
+        fg_color=TEXTBOX_BG, text_color=TEXT_COLOR,
+        font=("Consolas", 11), wrap="none"
+    )
+    stats_box.pack(fill="x")
+
     return frame
@@ -1,12 +1,17 @@
 # module_textutils.py
 import customtkinter as ctk
 import tkinter as tk
+import os
 import re
+import threading
 import tkinter.messagebox as mb
-from ui_theme import CARD_BG, TEXTBOX_BG, PRIMARY, PRIMARY_HOVER, TEXT_COLOR, apply_theme
+from tkinter import filedialog
+from ui_theme import CARD_BG, TEXTBOX_BG, PRIMARY, PRIMARY_HOVER, TEXT_COLOR
+from text_stream import (Cancelled, EMAIL_RE, PHONE_RE, SENTENCE_END, convert_case, extract,
+                         format_size, is_phone, preview, remove_duplicate_words,
+                         sentence_score, summarize as summarize_file, text_stats)
 
-
-apply_theme()
+POLL_MS = 100
 
 
 def create_textutils_screen(parent, go_back_callback):
@@ -31,6 +36,8 @@ def create_textutils_screen(parent, go_back_callback):
 
     # Original text
     ctk.CTkLabel(left, text="Original Text", anchor="w", font=("Segoe UI", 13, "bold")).pack(anchor="w", padx=6, pady=(6,4))
+    file_label = ctk.CTkLabel(left, text="", anchor="w", font=("Segoe UI", 11))
+    file_label.pack(anchor="w", padx=6)
     original = ctk.CTkTextbox(left, height=160, fg_color=TEXTBOX_BG, wrap="word", corner_radius=8)
     original.pack(fill="x", padx=6, pady=(0,10))
     original.configure(state="disabled")
@@ -40,6 +47,12 @@ def create_textutils_screen(parent, go_back_callback):
     tools_card.pack(fill="both", padx=6, pady=6)
     ctk.CTkLabel(tools_card, text="Tools", font=("Segoe UI", 13, "bold")).pack(anchor="w", padx=8, pady=(8,4))
 
+    # File mode: an opened file is streamed by every tool instead of
+    # going through the text box, and results are written to a file
+    frame._file = None
+    frame._file_stats = None
+    frame._job = None
+
     # Output area
     ctk.CTkLabel(right, text="Output", anchor="w", font=("Segoe UI", 13, "bold")).pack(anchor="w", padx=6, pady=(6,4))
     output = ctk.CTkTextbox(right, height=300, fg_color=TEXTBOX_BG, wrap="word", corner_radius=8)
@@ -68,6 +81,15 @@ def create_textutils_screen(parent, go_back_callback):
         output.insert("1.0", txt)
         output.configure(state="disabled")
 
+    def show_stats(stats):
+        unique = f"{'' if stats['unique_exact'] else '~'}{stats['unique']:,}"
+        words_card.configure(text=f"Words\n{stats['words']:,}")
+        chars_card.configure(text=f"Characters\n{stats['characters']:,}")
+        unique_card.configure(text=f"Unique\n{unique}")
+        lines_card.configure(text=f"Lines\n{stats['lines']:,}")
+        return (f"Words: {stats['words']:,}\nCharacters: {stats['characters']:,}\n"
+                f"Unique words: {unique}\nLines: {stats['lines']:,}")
+
     def update_info(txt):
         words = re.findall(r"\S+", txt)
         lines = [l for l in txt.splitlines() if l.strip()]
@@ -77,23 +99,140 @@ def create_textutils_screen(parent, go_back_callback):
         unique_card.configure(text=f"Unique\n{unique}")
         lines_card.configure(text=f"Lines\n{len(lines)}")
 
+    # ==========================================================
+    # File mode (streaming passes on a worker thread)
+    # ==========================================================
+    def run_stream(title, work, done):
+        # work(progress) runs off the Tk thread; done(result) back on it
+        if frame._job is not None:
+            mb.showinfo("Busy", "Wait for the current file pass to finish.")
+            return
+        job = {"fraction": 0.0, "result": None, "error": None, "finished": False, "cancel": False}
+
+        def progress(fraction):
+            if job["cancel"]:
+                raise Cancelled()
+            job["fraction"] = fraction
+
+        def target():
+            try:
+                job["result"] = work(progress)
+            except Exception as e:
+                job["error"] = e
+            job["finished"] = True
+
+        frame._job = job
+        status.configure(text=f"{title}...")
+        cancel_btn.configure(state="normal")
+        threading.Thread(target=target, name="text-stream", daemon=True).start()
+        poll(title, job, done)
+
+    def poll(title, job, done):
+        if not frame.winfo_exists():
+            job["cancel"] = True
+            return
+        progress_bar.set(job["fraction"])
+        if not job["finished"]:
+            frame.after(POLL_MS, poll, title, job, done)
+            return
+        frame._job = None
+        cancel_btn.configure(state="disabled")
+        if isinstance(job["error"], Cancelled):
+            status.configure(text=f"{title}: cancelled.")
+        elif job["error"] is not None:
+            status.configure(text=f"{title}: failed.")
+            mb.showerror(title, str(job["error"]))
+        else:
+            status.configure(text=f"{title}: done.")
+            done(job["result"])
+
+    def cancel_job():
+        if frame._job is not None:
+            frame._job["cancel"] = True
+
+    def ask_output(tag):
+        # Output goes next to the input by default, never over it
+        folder, name = os.path.split(frame._file)
+        stem, ext = os.path.splitext(name)
+        out_path = filedialog.asksaveasfilename(
+            title="Save output as", initialdir=folder, initialfile=f"{stem}_{tag}{ext or '.txt'}",
+            defaultextension=ext or ".txt")
+        if not out_path:
+            return None
+        if os.path.abspath(out_path) == os.path.abspath(frame._file):
+            mb.showerror("Save Output", "Choose a different file from the one being read.")
+            return None
+        return out_path
+
+    def show_written(out_path, note, empty=None):
+        header = f"Wrote {note} to {out_path} ({format_size(os.path.getsize(out_path))})"
+        body = preview(out_path)
+        set_output_text(header + "\n\n" + (body or empty or ""))
+
+    def stream_to_file(title, tag, work, describe, empty=None):
+        out_path = ask_output(tag)
+        if not out_path: return
+        path = frame._file
+        run_stream(title, lambda progress: work(path, out_path, progress),
+                   lambda result: show_written(out_path, describe(result), empty))
+
+    def file_case(case):
+        stream_to_file(f"{case.title()} case", case,
+                       lambda path, out, progress: convert_case(path, out, case, progress),
+                       lambda n: f"{n:,} characters")
+
+    def file_wordcount():
+        if frame._file_stats is not None:
+            set_output_text(show_stats(frame._file_stats))
+            return
+        path = frame._file
+
+        def done(stats):
+            frame._file_stats = stats
+            set_output_text(show_stats(stats))
+        run_stream("Word count", lambda progress: text_stats(path, progress), done)
+
+    def file_removedups():
+        stream_to_file("Remove duplicates", "dedup", remove_duplicate_words,
+                       lambda counts: f"{counts[0]:,} of {counts[1]:,} words")
+
+    def file_extract(kind):
+        stream_to_file(f"Extract {kind}", kind,
+                       lambda path, out, progress: extract(path, out, kind, progress),
+                       lambda n: f"{n:,} {kind}",
+                       empty="No emails found." if kind == "emails" else "No phone numbers found.")
+
+    def file_summarize():
+        out_path = ask_output("summary")
+        if not out_path: return
+        path = frame._file
+
+        def done(summary):
+            set_output_text("Summary:\n" + summary)
+            update_info(summary)
+        run_stream("Summarize", lambda progress: summarize_file(path, out_path, progress=progress), done)
+
     # Actions
     def uppercase():
+        if frame._file: return file_case("upper")
         txt = get_original_text()
         set_output_text(txt.upper())
         update_info(txt.upper())
 
     def lowercase():
+        if frame._file: return file_case("lower")
         txt = get_original_text()
         set_output_text(txt.lower())
         update_info(txt.lower())
 
     def titlecase():
+        if frame._file: return file_case("title")
         txt = get_original_text()
         set_output_text(txt.title())
         update_info(txt.title())
 
     def wordcount():
+        if frame._file: return file_wordcount()
         txt = get_original_text()
         words = re.findall(r"\S+", txt)
         unique = len(set(w.lower() for w in words))
@@ -102,6 +241,7 @@ def create_textutils_screen(parent, go_back_callback):
         set_output_text(res)
 
     def removedups():
+        if frame._file: return file_removedups()
         txt = get_original_text()
         words = re.findall(r"\S+", txt)
         seen=set(); out=[]
@@ -112,30 +252,29 @@ def create_textutils_screen(parent, go_back_callback):
         set_output_text(res); update_info(res)
 
     def extract_emails():
+        if frame._file: return file_extract("emails")
         txt = get_original_text()
-        emails = re.findall(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[A-Za-z]{2,}", txt)
+        emails = EMAIL_RE.findall(txt)
         set_output_text("\n".join(emails) if emails else "No emails found.")
 
     def extract_phones():
+        if frame._file: return file_extract("phones")
         txt = get_original_text()
-        phones = re.findall(r"(?:\+?\d{1,3}[-.\s]?)?(?:\(?\d{2,4}\)?[-.\s]?)?\d{3,4}[-.\s]?\d{3,4}", txt)
-        phones = [p for p in phones if len(re.sub(r"\D","",p))>=7]
+        phones = [p for p in PHONE_RE.findall(txt) if is_phone(p)]
         set_output_text("\n".join(phones) if phones else "No phone numbers found.")
 
     def summarize():
+        if frame._file: return file_summarize()
         txt = get_original_text().strip()
-        sentences = re.split(r'(?<=[.!?]) +', txt)
+        sentences = SENTENCE_END.split(txt)
         sentences = [s.strip() for s in sentences if s.strip()]
         if len(sentences)<=2:
             summary = txt
         else:
             # simple ranking by unique non-stopword count
-            stop = {'the','is','in','and','to','a','of','it','for','on','with','as','that','this','are','was','be','by','an','or'}
             scores={}
             for s in sentences:
-                words = re.findall(r'\w+', s.lower())
-                imp = [w for w in words if w not in stop and len(w)>2]
-                scores[s]=len(set(imp))
+                scores[s]=sentence_score(s)
             ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
             top = set([ranked[0][0], ranked[1][0]])
             ordered = [s for s in sentences if s in top]
@@ -158,12 +297,55 @@ def create_textutils_screen(parent, go_back_callback):
     ctk.CTkButton(grid, text="Extract Phones", command=extract_phones, **btn_opts).grid(row=2, column=0, padx=8, pady=8)
     ctk.CTkButton(grid, text="Summarize", command=summarize, **btn_opts).grid(row=2, column=1, padx=8, pady=8)
 
+    # Progress of file passes
+    job_row = ctk.CTkFrame(tools_card, fg_color="transparent")
+    job_row.pack(fill="x", padx=8, pady=(0,8))
+    progress_bar = ctk.CTkProgressBar(job_row, width=260)
+    progress_bar.set(0)
+    progress_bar.pack(side="left", padx=6)
+    status = ctk.CTkLabel(job_row, text="", anchor="w", font=("Segoe UI", 11))
+    status.pack(side="left", fill="x", expand=True, padx=6)
+    cancel_btn = ctk.CTkButton(job_row, text="Cancel", width=90, command=cancel_job, fg_color="#6B7280", state="disabled")
+    cancel_btn.pack(side="right", padx=6)
+
     # A small control row under left: populate original text from clipboard or clear
     ctl = ctk.CTkFrame(left, fg_color="transparent")
     ctl.pack(fill="x", padx=6, pady=(6,6))
+    def set_file(path):
+        # None leaves file mode
+        frame._file = path
+        frame._file_stats = None
+        file_label.configure(text="" if path is None else
+                             f"Streaming {os.path.basename(path)} ({format_size(os.path.getsize(path))}) - "
+                             "showing the start; tools read the whole file and write to a file")
+
+    def open_file():
+        if frame._job is not None:
+            mb.showinfo("Busy", "Wait for the current file pass to finish.")
+            return
+        path = filedialog.askopenfilename(
+            title="Open text file",
+            filetypes=[("Text files", "*.txt *.log *.csv *.md *.json"), ("All files", "*.*")])
+        if not path: return
+        set_file(path)
+        original.configure(state="normal")
+        original.delete("1.0","end")
+        original.insert("1.0", preview(path))
+        original.configure(state="disabled")
+        set_output_text("")
+
+        def done(stats):
+            frame._file_stats = stats
+            show_stats(stats)
+        run_stream("Reading file", lambda progress: text_stats(path, progress), done)
+
     def paste_clipboard():
+        if frame._job is not None:
+            mb.showinfo("Busy", "Wait for the current file pass to finish.")
+            return
         try:
             txt = frame.clipboard_get()
+            set_file(None)
             original.configure(state="normal")
             original.delete("1.0","end")
             original.insert("1.0", txt)
@@ -173,10 +355,13 @@ def create_textutils_screen(parent, go_back_callback):
             mb.showinfo("Clipboard", "No text on clipboard.")
 
     def clear_original():
+        cancel_job()
+        set_file(None)
         original.configure(state="normal"); original.delete("1.0","end"); original.configure(state="disabled")
         set_output_text(""); update_info("")
 
     ctk.CTkButton(ctl, text="Paste Clipboard", width=140, command=paste_clipboard, fg_color="#6B7280").pack(side="left", padx=6)
+    ctk.CTkButton(ctl, text="Open File", width=120, command=open_file, fg_color="#6B7280").pack(side="left", padx=6)
     ctk.CTkButton(ctl, text="Clear All", width=120, command=clear_original, fg_color="#EF4444").pack(side="right", padx=6)
 
     # expose inner controls for parent if needed (not necessary)
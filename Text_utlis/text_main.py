@@ -1,15 +1,8 @@
-import customtkinter as ctk
-from ui_theme import apply_theme
-from module_textutils import create_textutils_screen
-
-apply_theme()
-
-root = ctk.CTk()
-root.title("Text Utilities Toolkit")
-root.geometry("1100x700")
-
-# CREATE + DISPLAY TEXTUTILS UI
-frame = create_textutils_screen(root, lambda: None)
-frame.pack(fill="both", expand=True)
-
-root.mainloop()
+# Opens the Text Utilities screen through the shared launcher (../launcher.py)
+import os
+import sys
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from launcher import main
+    sys.exit(main(["text"] + sys.argv[1:]))
@@ -0,0 +1,250 @@
+# text_stream.py
+# Streaming passes over text files too large for the Tk text widget.
+# The file is memory-mapped and decoded in chunks that end at a line
+# break, so every tool runs in constant memory (remove duplicates keeps
+# one entry per distinct word) and writes its result straight to a file.
+import codecs
+import heapq
+import math
+import mmap
+import os
+import re
+from contextlib import contextmanager
+
+CHUNK_BYTES = 8 * 1024 * 1024
+PREVIEW_CHARS = 4000
+UNIQUE_EXACT_LIMIT = 1_000_000  # distinct words counted exactly before estimating
+HLL_PRECISION = 14  # 16k registers, ~0.8% standard error
+SUMMARY_SENTENCES = 2
+MAX_SENTENCE_CHARS = 1_000_000  # text without sentence ends is cut here
+
+EMAIL_RE = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[A-Za-z]{2,}")
+PHONE_RE = re.compile(r"(?:\+?\d{1,3}[-.\s]?)?(?:\(?\d{2,4}\)?[-.\s]?)?\d{3,4}[-.\s]?\d{3,4}")
+SENTENCE_END = re.compile(r"(?<=[.!?]) +")
+STOPWORDS = {'the','is','in','and','to','a','of','it','for','on','with','as','that','this','are','was','be','by','an','or'}
+
+CASES = {"upper": str.upper, "lower": str.lower, "title": str.title}
+
+
+class Cancelled(Exception):
+    # Raised by a progress callback to stop a pass
+    pass
+
+
+def is_phone(match):
+    return len(re.sub(r"\D", "", match)) >= 7
+
+
+def sentence_score(sentence):
+    # Distinct words that are not stop words
+    words = re.findall(r'\w+', sentence.lower())
+    return len(set(w for w in words if w not in STOPWORDS and len(w) > 2))
+
+
+def format_size(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:,.0f} {unit}" if unit == "B" else f"{n:,.1f} {unit}"
+        n /= 1024
+
+
+# ==========================================================
+# Reading
+# ==========================================================
+def iter_chunks(path, chunk_bytes=CHUNK_BYTES, progress=None):
+    # Decoded chunks of about chunk_bytes. A chunk ends after a newline,
+    # or after a space when a single line is longer than a chunk, so
+    # only a word longer than a chunk is ever split. progress(fraction)
+    # may raise Cancelled to stop.
+    size = os.path.getsize(path)
+    if size == 0:
+        return
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        start = 0
+        while start < size:
+            end = min(start + chunk_bytes, size)
+            if end < size:
+                cut = data.rfind(b"\n", start, end)
+                if cut == -1:
+                    cut = data.rfind(b" ", start, end)
+                if cut != -1:
+                    end = cut + 1
+            text = decoder.decode(data[start:end], final=end >= size)
+            start = end
+            if progress:
+                progress(start / size)
+            if text:
+                yield text
+
+
+def preview(path, n=PREVIEW_CHARS):
+    with open(path, encoding="utf-8-sig", errors="replace") as handle:
+        return handle.read(n)
+
+
+@contextmanager
+def _writer(out_path):
+    # Line endings are written as read. The file is renamed into place
+    # when complete, so a cancelled pass leaves no half-written output.
+    part = out_path + ".part"
+    try:
+        with open(part, "w", encoding="utf-8", newline="") as out:
+            yield out
+        os.replace(part, out_path)
+    finally:
+        if os.path.exists(part):
+            os.remove(part)
+
+
+# ==========================================================
+# Counting
+# ==========================================================
+class UniqueCounter:
+    # Exact up to `limit` distinct words, then a HyperLogLog estimate
+
+    def __init__(self, limit=UNIQUE_EXACT_LIMIT, precision=HLL_PRECISION):
+        self.limit = limit
+        self.precision = precision
+        self.seen = set()
+        self.registers = None
+
+    @property
+    def exact(self):
+        return self.registers is None
+
+    def update(self, words):
+        if self.registers is None:
+            self.seen.update(words)
+            if len(self.seen) > self.limit:
+                self.registers = bytearray(1 << self.precision)
+                self._add(self.seen)
+                self.seen = None
+        else:
+            self._add(set(words))
+
+    def _add(self, words):
+        shift = 64 - self.precision
+        rest = (1 << shift) - 1
+        registers = self.registers
+        for word in words:
+            h = hash(word) & 0xFFFFFFFFFFFFFFFF
+            rank = shift - (h & rest).bit_length() + 1
+            if rank > registers[h >> shift]:
+                registers[h >> shift] = rank
+
+    def count(self):
+        if self.registers is None:
+            return len(self.seen)
+        m = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+
+def text_stats(path, progress=None):
+    # Words, characters, unique words (case-insensitive) and non-blank lines
+    words = chars = lines = 0
+    unique = UniqueCounter()
+    open_line = False  # the last chunk ended inside a non-blank line
+    for chunk in iter_chunks(path, progress=progress):
+        chars += len(chunk)
+        tokens = chunk.lower().split()
+        words += len(tokens)
+        unique.update(set(tokens))
+        pieces = chunk.splitlines()
+        filled = [bool(p.strip()) for p in pieces]
+        lines += sum(filled)
+        if open_line and filled and filled[0]:
+            lines -= 1  # the rest of a line already counted
+        open_line = bool(filled) and filled[-1] and not chunk.endswith(("\n", "\r"))
+    return {"words": words, "characters": chars, "unique": unique.count(),
+            "unique_exact": unique.exact, "lines": lines}
+
+
+# ==========================================================
+# Transforms (written to out_path)
+# ==========================================================
+def convert_case(path, out_path, case, progress=None):
+    convert = CASES[case]
+    written = 0
+    with _writer(out_path) as out:
+        for chunk in iter_chunks(path, progress=progress):
+            written += out.write(convert(chunk))
+    return written
+
+
+def remove_duplicate_words(path, out_path, progress=None):
+    # First occurrence of each word (case-insensitive), space separated
+    seen = set()
+    kept = total = 0
+    with _writer(out_path) as out:
+        for chunk in iter_chunks(path, progress=progress):
+            words = chunk.split()
+            total += len(words)
+            fresh = []
+            for w in words:
+                key = w.lower()
+                if key not in seen:
+                    seen.add(key)
+                    fresh.append(w)
+            if fresh:
+                out.write((" " if kept else "") + " ".join(fresh))
+                kept += len(fresh)
+    return kept, total
+
+
+def extract(path, out_path, kind, progress=None):
+    # kind: "emails" or "phones"; one match per line
+    pattern = EMAIL_RE if kind == "emails" else PHONE_RE
+    found = 0
+    with _writer(out_path) as out:
+        for chunk in iter_chunks(path, progress=progress):
+            matches = pattern.findall(chunk)
+            if kind == "phones":
+                matches = [m for m in matches if is_phone(m)]
+            for m in matches:
+                out.write(("\n" if found else "") + m)
+                found += 1
+    return found
+
+
+def summarize(path, out_path=None, sentences=SUMMARY_SENTENCES, progress=None):
+    # The highest-scoring sentences in file order; ties go to the earlier
+    # one. Only the current best and one unfinished sentence are held.
+    best = []  # heap of (score, -index, sentence): the weakest on top
+    chosen = set()
+    count = 0
+    tail = ""
+
+    def consider(sentence):
+        nonlocal count
+        sentence = sentence.strip()
+        if not sentence or sentence in chosen:
+            return
+        item = (sentence_score(sentence), -count, sentence)
+        count += 1
+        if len(best) < sentences:
+            heapq.heappush(best, item)
+            chosen.add(sentence)
+        elif item[0] > best[0][0]:
+            chosen.discard(heapq.heapreplace(best, item)[2])
+            chosen.add(sentence)
+
+    for chunk in iter_chunks(path, progress=progress):
+        parts = SENTENCE_END.split(tail + chunk)
+        tail = parts.pop()
+        if len(tail) > MAX_SENTENCE_CHARS:
+            parts.append(tail)
+            tail = ""
+        for part in parts:
+            consider(part)
+    consider(tail)
+
+    summary = " ".join(s for _, _, s in sorted(best, key=lambda item: -item[1]))
+    if out_path:
+        with _writer(out_path) as out:
+            out.write(summary)
+    return summary
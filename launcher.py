@@ -0,0 +1,219 @@
+# ----------------------------------------------
+# launcher.py
+# Shared entry point for the toolkits (data_main.py and text_main.py
+# start here too). Only customtkinter is imported before the window
+# appears; a screen's module, with pandas / matplotlib behind it, is
+# imported on a background thread and the screen is built on the Tk
+# thread once that finishes. The home menu starts the Data Analysis
+# warm-up as soon as it is shown.
+#
+#   python launcher.py [data | text]
+#   python launcher.py --import-budget 0.5   (checks start-up imports)
+# ----------------------------------------------
+
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import threading
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# key: (button label, directory, module, factory, window title, geometry)
+SCREENS = {
+    "data": ("Data Analysis", "DataAnalysisProject", "module_dataanalysis",
+             "create_dataanalysis_screen", "Data Analysis Toolkit", "1200x750"),
+    "text": ("Text Utilities", "Text_utlis", "module_textutils",
+             "create_textutils_screen", "Text Utilities Toolkit", "1100x700"),
+}
+WARM_UP = ("data",)
+
+# Must not be loaded before the first window is shown
+HEAVY_MODULES = ("numpy", "pandas", "pyarrow", "matplotlib", "seaborn")
+# Must not be loaded even once every screen has been built
+LAZY_MODULES = ("seaborn", "matplotlib.pyplot")
+IMPORT_BUDGET = 0.5  # seconds for the start-up imports
+
+POLL_MS = 50
+
+for _screen in SCREENS.values():
+    _path = os.path.join(ROOT, _screen[1])
+    if _path not in sys.path:
+        sys.path.append(_path)
+
+import customtkinter as ctk
+from ui_theme import PRIMARY, PRIMARY_HOVER, TEXT_COLOR, apply_theme
+
+
+# ==========================================================
+# Screen loading (module imports off the Tk thread)
+# ==========================================================
+class ScreenLoader:
+
+    def __init__(self):
+        self._threads = {}
+        self._errors = {}
+        self._lock = threading.Lock()
+
+    def start(self, key):
+        with self._lock:
+            if key in self._threads:
+                return
+            thread = threading.Thread(target=self._load, args=(key,),
+                                      name=f"warm-up-{key}", daemon=True)
+            self._threads[key] = thread
+        thread.start()
+
+    def _load(self, key):
+        try:
+            importlib.import_module(SCREENS[key][2])
+        except Exception as e:
+            self._errors[key] = e
+
+    def ready(self, key):
+        thread = self._threads.get(key)
+        return thread is not None and not thread.is_alive()
+
+    def factory(self, key):
+        # Tk thread, once ready(); re-raises an import failure
+        if key in self._errors:
+            del self._threads[key]  # the next open tries again
+            raise self._errors.pop(key)
+        _, _, module, factory, _, _ = SCREENS[key]
+        return getattr(sys.modules[module], factory)
+
+
+# ==========================================================
+# App window
+# ==========================================================
+class Launcher:
+
+    def __init__(self, root):
+        self.root = root
+        self.loader = ScreenLoader()
+        self.current = None
+
+    def clear(self):
+        if self.current is not None and self.current.winfo_exists():
+            self.current.destroy()
+        self.current = None
+
+    def show_home(self):
+        self.clear()
+        self.root.title("Python Toolkits")
+        home = ctk.CTkFrame(self.root, fg_color="transparent")
+        home.pack(expand=True)
+        ctk.CTkLabel(home, text="Python Toolkits", font=("Segoe UI", 24, "bold"),
+                     text_color=TEXT_COLOR).pack(pady=(0, 20))
+        for key, screen in SCREENS.items():
+            ctk.CTkButton(home, text=screen[0], width=260, height=40,
+                          fg_color=PRIMARY, hover_color=PRIMARY_HOVER,
+                          command=lambda k=key: self.open(k)).pack(pady=6)
+        self.current = home
+        # Import the heavy screens while the user is still choosing
+        for key in WARM_UP:
+            self.loader.start(key)
+
+    def open(self, key):
+        self.clear()
+        _, _, _, _, title, geometry = SCREENS[key]
+        self.root.title(title)
+        self.root.geometry(geometry)
+        self.loader.start(key)
+        if self.loader.ready(key):
+            self._build(key)
+            return
+        splash = ctk.CTkLabel(self.root, text=f"Loading {SCREENS[key][0]}...",
+                              font=("Segoe UI", 16))
+        splash.pack(expand=True)
+        self.current = splash
+        self._wait(key, splash)
+
+    def _wait(self, key, splash):
+        if not splash.winfo_exists():
+            return
+        if not self.loader.ready(key):
+            self.root.after(POLL_MS, self._wait, key, splash)
+            return
+        self._build(key)
+
+    def _build(self, key):
+        self.clear()
+        try:
+            create = self.loader.factory(key)
+        except Exception as e:
+            self.current = ctk.CTkLabel(self.root, text=f"Could not load {SCREENS[key][0]}:\n{e}")
+            self.current.pack(expand=True)
+            return
+        frame = create(self.root, self.show_home)
+        if not frame.winfo_manager():
+            frame.pack(fill="both", expand=True)
+        self.current = frame
+
+
+# ==========================================================
+# Import budget check
+# ==========================================================
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import launcher
+seconds = time.perf_counter() - started
+eager = [m for m in launcher.HEAVY_MODULES if m in sys.modules]
+for key, screen in launcher.SCREENS.items():
+    __import__(screen[2])
+lazy = [m for m in launcher.LAZY_MODULES if m in sys.modules]
+print(json.dumps({"seconds": seconds, "eager": eager, "lazy": lazy}))
+"""
+
+
+def check_imports(budget):
+    # Measured in a fresh interpreter; returns the process exit code
+    result = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT,
+                            capture_output=True, text=True)
+    if result.returncode:
+        print(result.stderr.strip())
+        return 2
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    failures = []
+    if report["seconds"] > budget:
+        failures.append(f"start-up imports took {report['seconds']:.3f}s (budget {budget:.3f}s)")
+    if report["eager"]:
+        failures.append(f"loaded before the window: {', '.join(report['eager'])}")
+    if report["lazy"]:
+        failures.append(f"loaded by building screens: {', '.join(report['lazy'])}")
+    print(f"Start-up imports: {report['seconds']:.3f}s (budget {budget:.3f}s)")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Python toolkits launcher.")
+    parser.add_argument("screen", nargs="?", choices=sorted(SCREENS),
+                        help="open this screen directly instead of the home menu")
+    parser.add_argument("--import-budget", type=float, nargs="?", const=IMPORT_BUDGET,
+                        metavar="SECONDS",
+                        help="check start-up imports against a time budget and exit "
+                             f"(default budget: {IMPORT_BUDGET}s)")
+    args = parser.parse_args(argv)
+
+    if args.import_budget is not None:
+        return check_imports(args.import_budget)
+
+    apply_theme()
+    root = ctk.CTk()
+    root.geometry("1100x700")
+    app = Launcher(root)
+    if args.screen:
+        app.open(args.screen)
+    else:
+        app.show_home()
+    root.mainloop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,9 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The projects import their modules by bare name, as when run from their folders
+for path in (ROOT, os.path.join(ROOT, "DataAnalysisProject"), os.path.join(ROOT, "Text_utlis")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+
+from data_aggregate import group_aggregate, shutdown_pool
+
+
+def teardown_module():
+    shutdown_pool()
+
+
+def make_frame(rows=20_000):
+    rng = np.random.default_rng(0)
+    names = pd.Series(rng.integers(0, 500, rows)).map("name-{:04d}".format)
+    names[::13] = None
+    return pd.DataFrame({"Region": rng.choice(["N", "S", "E", "W"], rows),
+                         "Name": names.to_numpy(),
+                         "Sales": rng.random(rows) * 100})
+
+
+def test_parallel_count_on_text_column_matches_serial():
+    df = make_frame()
+    serial = group_aggregate(df, "Name", "Region", "count", parallel=False)
+    parallel = group_aggregate(df, "Name", "Region", "count", parallel=True)
+    tm.assert_series_equal(parallel, serial)
+
+
+def test_parallel_mean_matches_serial():
+    df = make_frame()
+    serial = group_aggregate(df, "Sales", "Region", "mean", parallel=False)
+    parallel = group_aggregate(df, "Sales", "Region", "mean", parallel=True)
+    tm.assert_series_equal(parallel, serial)
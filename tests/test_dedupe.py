@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_dedupe import duplicated, find_duplicates
+
+
+def test_signed_zero_is_a_duplicate():
+    df = pd.DataFrame({"x": [0.0, -0.0, 1.0], "y": pd.array([-0.0, 0.0, None], dtype="Float64")})
+    assert duplicated(df).tolist() == [False, True, False]
+    assert find_duplicates(df) == (1, 1)
+
+
+@pytest.mark.parametrize("keep", ["first", "last", False])
+@pytest.mark.parametrize("subset", [None, ["a"], ["a", "c"]])
+def test_matches_pandas_duplicated(keep, subset):
+    rng = np.random.default_rng(1)
+    rows = 2_000
+    df = pd.DataFrame({
+        "a": rng.integers(0, 5, rows),
+        "b": rng.choice([0.0, -0.0, 1.5, np.nan], rows),
+        "c": rng.choice(["x", "y", None], rows),
+    })
+    expected = df.duplicated(subset=subset, keep=keep).to_numpy()
+    assert np.array_equal(duplicated(df, subset, keep=keep), expected)
@@ -0,0 +1,31 @@
+import pandas as pd
+import pytest
+
+import data_engine
+from data_engine import load_dataset
+
+
+@pytest.mark.parametrize("ext", [".xlsx", ".xlsm"])
+def test_excel_files_load_as_excel(tmp_path, ext):
+    pytest.importorskip("openpyxl")
+    path = tmp_path / f"data{ext}"
+    df = pd.DataFrame({"a": [1, 2], "b": ["x", "y"]})
+    df.to_excel(path, index=False)
+    loaded, _ = load_dataset(str(path))
+    assert loaded["a"].tolist() == [1, 2]
+    assert loaded["b"].astype(str).tolist() == ["x", "y"]
+
+
+@pytest.mark.parametrize("name, reader", [
+    ("data.csv", "read_csv_chunked"),
+    ("data.CSV", "read_csv_chunked"),
+    ("data.xlsx", "read_excel_compact"),
+    ("data.xlsm", "read_excel_compact"),
+    ("data.XLS", "read_excel_compact"),
+])
+def test_routing_by_extension(monkeypatch, name, reader):
+    calls = []
+    for fn in ("read_csv_chunked", "read_excel_compact"):
+        monkeypatch.setattr(data_engine, fn, lambda path, *a, _fn=fn, **k: calls.append(_fn))
+    load_dataset(name)
+    assert calls == [reader]
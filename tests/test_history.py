@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+from data_history import (History, Steps, apply_delta, keep_rows, rename_columns,
+                          replace_columns, select_rows)
+from data_plan import Plan, PlanApplied, Query
+
+
+def test_undo_applied_off_the_stack_then_committed():
+    df = pd.DataFrame({"a": [1, 2, 3]})
+    history = History()
+    new_df, delta = keep_rows(df, np.array([True, False, True]))
+    history.push(delta)
+
+    # A worker applies the peeked step; the stacks move only when it lands
+    step = history.peek_undo()
+    restored = step.undo(new_df)
+    assert history.can_undo() and not history.can_redo()
+    history.undone(step)
+    assert restored.equals(df)
+    assert history.peek_redo() is step and not history.can_undo()
+
+    history.redone(step)
+    assert history.peek_undo() is step and not history.can_redo()
+
+
+def test_stale_step_is_not_moved():
+    df = pd.DataFrame({"a": [1]})
+    history = History()
+    _, first = rename_columns(df, {"a": "b"})
+    history.push(first)
+    history.undone(object())
+    assert history.peek_undo() is first and not history.can_redo()
+
+
+def test_selection_size_counts_only_what_it_adds():
+    df = pd.DataFrame({"a": np.arange(100_000), "d": ["2020-01-01"] * 100_000})
+    positions = np.arange(10)
+    _, delta = select_rows(df, positions)
+    assert delta.nbytes == positions.nbytes
+
+    parsed = pd.to_datetime(df["d"]).to_numpy()
+    _, delta = select_rows(df, positions, {"d": parsed})
+    assert positions.nbytes + parsed.nbytes <= delta.nbytes < df.memory_usage(deep=True).sum()
+
+
+def test_abandoned_column_undo_leaves_the_step_intact():
+    df = pd.DataFrame({"a": [1, 2, 3]})
+    history = History()
+    new_df, delta = replace_columns(df, {"a": pd.Series([10, 20, 30])})
+    history.push(delta)
+
+    # An undo job that is cancelled never commits
+    apply_delta(history.peek_undo(), new_df, undo=True)
+    restored = history.undo(new_df)
+    assert restored["a"].tolist() == [1, 2, 3]
+    assert history.redo(restored)["a"].tolist() == [10, 20, 30]
+
+
+def test_combined_steps_commit_together():
+    df = pd.DataFrame({"a": [1, 2], "b": ["x", "y"]})
+    history = History()
+    mid, first = replace_columns(df, {"a": pd.Series([5, 6])})
+    new_df, second = replace_columns(mid, {"b": pd.Series(["p", "q"])})
+    history.push(Steps([first, second]))
+
+    out, commit = apply_delta(history.peek_undo(), new_df, undo=True)
+    assert out.equals(df)
+    history.undone(history.peek_undo(), commit)
+    assert history.redo(out).equals(new_df)
+
+
+def test_budget_trims_repeated_filters():
+    # Each filter keeps its source alive; the budget must see those frames
+    df = pd.DataFrame({"a": np.arange(50_000, dtype=np.int64)})
+    history = History(budget_bytes=2_000_000)
+    for _ in range(10):
+        df, delta = select_rows(df, np.arange(len(df) - 1))
+        history.push(delta)
+    # About 800 kB per entry: its positions and its source
+    assert len(history._undo) == 2
+    assert history.nbytes <= history.budget_bytes
+
+
+def test_budget_trims_plan_applies():
+    df = pd.DataFrame({"a": np.arange(50_000, dtype=np.int64)})
+    history = History(budget_bytes=1_000_000)
+    for _ in range(10):
+        plan = Plan([Query("a >= 0")])
+        new_df = plan.execute(df)
+        history.push(PlanApplied(df, plan))
+        df = new_df.copy()
+    assert len(history._undo) == 2
+    assert history.nbytes <= history.budget_bytes
+
+
+def test_shared_source_counts_once():
+    df = pd.DataFrame({"a": np.arange(50_000, dtype=np.int64)})
+    history = History()
+    _, first = select_rows(df, np.arange(10))
+    _, second = select_rows(df, np.arange(20))
+    history.push(first)
+    history.push(second)
+    assert history.nbytes == first.nbytes + second.nbytes + first.source_nbytes
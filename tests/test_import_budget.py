@@ -0,0 +1,30 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+import launcher
+
+pytest.importorskip("customtkinter")
+
+
+@pytest.fixture(scope="module")
+def report():
+    # A fresh interpreter, so modules imported by other tests do not count
+    result = subprocess.run([sys.executable, "-c", launcher.PROBE], cwd=launcher.ROOT,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_startup_imports_within_budget(report):
+    assert report["seconds"] <= launcher.IMPORT_BUDGET
+
+
+def test_no_heavy_module_before_the_window(report):
+    assert report["eager"] == []
+
+
+def test_screens_do_not_load_lazy_modules(report):
+    assert report["lazy"] == []
@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+from data_loader import read_csv_chunked
+
+pytest.importorskip("pyarrow")
+
+
+def test_dates_have_the_same_dtype_on_both_engines(tmp_path):
+    path = tmp_path / "data.csv"
+    pd.DataFrame({
+        "Date": ["2020-01-01", "2020-02-03", None, "2021-12-31"] * 50,
+        "City": ["Paris", "Rome", "Oslo", "Lima"] * 50,
+        "Sales": range(200),
+    }).to_csv(path, index=False)
+    arrow, _ = read_csv_chunked(str(path), engine="pyarrow")
+    # Small chunks, so the dates are also merged across chunks
+    c, report = read_csv_chunked(str(path), engine="c", chunk_rows=30)
+    assert report["engine"] == "c"
+    assert c["Date"].dtype == arrow["Date"].dtype
+    pd.testing.assert_series_equal(c["Date"], arrow["Date"])
+    assert isinstance(c["City"].dtype, pd.CategoricalDtype)
+
+
+def test_text_that_is_not_a_date_stays_text(tmp_path):
+    path = tmp_path / "data.csv"
+    pd.DataFrame({"Code": ["2020-01-01", "pending", "2020-02-03"] * 10}).to_csv(path, index=False)
+    c, _ = read_csv_chunked(str(path), engine="c")
+    assert not pd.api.types.is_datetime64_any_dtype(c["Code"])
+
+
+@pytest.mark.parametrize("engine", ["pyarrow", "c"])
+def test_repeated_and_blank_headers_match_pandas(tmp_path, engine):
+    path = tmp_path / "data.csv"
+    path.write_text("a,a,a.1,,a\n1,2,3,4,5\n6,7,8,9,10\n")
+    df, _ = read_csv_chunked(str(path), engine=engine)
+    expected = pd.read_csv(path)
+    assert list(df.columns) == list(expected.columns)
+    assert df.to_numpy().tolist() == expected.to_numpy().tolist()
+
+
+@pytest.mark.parametrize("engine", ["pyarrow", "c"])
+def test_header_without_rows_keeps_its_columns(tmp_path, engine):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b,c\n")
+    df, report = read_csv_chunked(str(path), engine=engine)
+    assert list(df.columns) == ["a", "b", "c"]
+    assert len(df) == 0 and report["rows"] == 0
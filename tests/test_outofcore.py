@@ -0,0 +1,91 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_cache import DatasetCache
+from data_outofcore import OutOfCoreDataset, prepare_chart_data_ooc
+from data_sketch import SampleProfile
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    rng = np.random.default_rng(0)
+    rows = 50_000
+    df = pd.DataFrame({"Region": rng.choice(["N", "S", "E"], rows),
+                       "Name": pd.Series(rng.integers(0, 300, rows)).map("n{:03d}".format),
+                       "Sales": rng.random(rows)})
+    path = tmp_path / "data.parquet"
+    df.to_parquet(path)
+    return df, OutOfCoreDataset.open(str(path))
+
+
+def test_grouped_count_on_text_column(dataset):
+    df, ds = dataset
+    out = prepare_chart_data_ooc(ds, "bar", "Name", "Region", "count")["data"]
+    expected = df.groupby("Region")["Name"].count()
+    pd.testing.assert_series_equal(out.sort_index().astype("int64"), expected.astype("int64"),
+                                   check_names=False)
+
+
+def test_grouped_sum_of_text_column_is_rejected(dataset):
+    _, ds = dataset
+    with pytest.raises(ValueError, match="not numeric"):
+        prepare_chart_data_ooc(ds, "bar", "Name", "Region", "sum")
+
+
+def test_csv_spool_counts_towards_cache_limit(tmp_path):
+    cache = DatasetCache(str(tmp_path / "cache"), max_bytes=0)
+    csv = tmp_path / "data.csv"
+    pd.DataFrame({"x": range(100)}).to_csv(csv, index=False)
+    ds = OutOfCoreDataset.open(str(csv), cache=cache)
+    # The spool being read survives eviction and is counted with the entries
+    assert os.path.exists(ds.source)
+    assert cache.size_bytes() == os.path.getsize(ds.source)
+
+    other = tmp_path / "other.csv"
+    pd.DataFrame({"y": range(10)}).to_csv(other, index=False)
+    OutOfCoreDataset.open(str(other), cache=cache)
+    assert not os.path.exists(ds.source)
+
+
+def test_changed_csv_gets_a_new_spool(tmp_path):
+    cache = DatasetCache(str(tmp_path / "cache"))
+    csv = tmp_path / "data.csv"
+    pd.DataFrame({"x": range(100)}).to_csv(csv, index=False)
+    first = OutOfCoreDataset.open(str(csv), cache=cache).source
+    pd.DataFrame({"x": range(200)}).to_csv(csv, index=False)
+    os.utime(csv, ns=(os.stat(csv).st_atime_ns, os.stat(csv).st_mtime_ns + 10**9))
+    second = OutOfCoreDataset.open(str(csv), cache=cache)
+    assert second.source != first
+    assert second.rows == 200
+
+
+def test_sample_pieces_reads_a_bounded_spread(tmp_path):
+    rows = 200_000
+    df = pd.DataFrame({"id": np.arange(rows), "g": np.arange(rows) % 7})
+    path = tmp_path / "groups.parquet"
+    df.to_parquet(path, row_group_size=10_000)
+    ds = OutOfCoreDataset.open(str(path))
+
+    pieces = list(ds.sample_pieces(4_000, pieces=8))
+    assert len(pieces) == 8
+    assert sum(len(chunk) for _, chunk in pieces) == 4_000
+    starts = [start for start, _ in pieces]
+    assert starts[0] == 0 and starts[-1] == 190_000
+    for start, chunk in pieces:
+        # Each slice knows where it sits in the file
+        assert chunk["id"].iloc[0] == start
+
+    profile = SampleProfile.from_pieces(pieces, ds.rows)
+    assert profile.rows == rows
+    assert profile.columns["id"].sequential
+
+
+def test_small_file_is_sampled_whole(dataset):
+    df, ds = dataset
+    pieces = list(ds.sample_pieces(len(df)))
+    assert sum(len(chunk) for _, chunk in pieces) == len(df)
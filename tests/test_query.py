@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_dtypes import optimize_dtypes
+from data_query import compile_query, evaluate
+
+
+def test_many_backquoted_columns_match_pandas():
+    # Twelve placeholders: restoring __col1 must leave __col10 and __col11 alone
+    rng = np.random.default_rng(0)
+    names = [f"col {i}" for i in range(12)]
+    df = pd.DataFrame(rng.integers(0, 10, (200, 12)), columns=names)
+    condition = " and ".join(f"`{name}` < {5 + i % 3}" for i, name in enumerate(names[:6])) \
+        + " or " + " + ".join(f"`{name}`" for name in names[6:]) + " > 40"
+    expected = df.eval(condition).to_numpy()
+    assert np.array_equal(evaluate(df, condition), expected)
+    assert compile_query(condition).reads() == set(names)
+
+
+def test_predicate_text_restores_column_names():
+    names = [f"c {i}" for i in range(11)]
+    condition = " | ".join(f"(`{name}` == 1)" for name in names)
+    texts = set(compile_query(condition).predicates)
+    assert texts == {f"`{name}` == 1" for name in names}
+
+
+@pytest.mark.parametrize("condition", [
+    "q * 100 > 500",
+    "q + r > 200",
+    "-q < -120",
+    "small * 1000 == 7000",
+    "ratio * 1e6 > 500000",
+    "`big value` - q ** 2 > 60000",
+])
+def test_arithmetic_on_compacted_columns_matches_pandas(condition):
+    # Compaction downcasts to int8 / int16 / float32; results must not wrap
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({
+        "q": np.arange(200) % 127,
+        "r": rng.integers(0, 120, 200),
+        "small": np.arange(200) % 10,
+        "ratio": rng.random(200),
+        "big value": rng.integers(0, 70_000, 200),
+    })
+    compact = optimize_dtypes(df)
+    assert compact["q"].dtype == np.int8 and compact["ratio"].dtype == np.float32
+    expected = df.eval(condition).to_numpy()
+    assert np.array_equal(evaluate(compact, condition), expected)
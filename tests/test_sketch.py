@@ -0,0 +1,27 @@
+import pandas as pd
+import pytest
+
+from data_sketch import ColumnSketch
+
+
+def kind(values):
+    s = pd.Series(values, dtype=object)
+    return ColumnSketch(s, None, len(s)).kind
+
+
+@pytest.mark.parametrize("values", [
+    [f"{i:05d}" for i in range(100)],  # zero-padded IDs
+    [str(1990 + i % 30) for i in range(100)],  # years as text
+    [str(20200101 + i) for i in range(100)],
+])
+def test_numeric_text_is_not_a_date(values):
+    assert kind(values) == "categorical"
+
+
+@pytest.mark.parametrize("values", [
+    [f"2020-01-{i % 28 + 1:02d}" for i in range(100)],
+    [f"{i % 12 + 1:02d}/15/2021" for i in range(100)],
+    [f"Jan {i % 28 + 1} 2020" for i in range(100)],
+])
+def test_date_text_is_time(values):
+    assert kind(values) == "time"